@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """
 Audit all downloaded audio files across the workspace to find duplicates
-and map files to song IDs.
+and map files to song IDs. Byte-identical files are found across both
+directories by size, edge hash and full hash, with the hashes cached in
+suno_library.db.
 """
 
 import os
@@ -10,6 +12,8 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+from suno_dedup import FileHashCache, find_duplicate_files
+
 AUDIO_DIR = Path("suno_library/audio")
 DOWNLOADS_DIR = Path("suno_downloads")
 
@@ -65,6 +69,14 @@ def main():
     print(f"Song IDs ONLY in audio/: {len(only_audio)}")
     print(f"Song IDs ONLY in downloads/: {len(only_downloads)}")
     
+    # Byte-identical files, whatever their names
+    cache = FileHashCache('suno_library.db')
+    identical = find_duplicate_files(list(AUDIO_DIR.glob('*')) + list(DOWNLOADS_DIR.glob('*')), cache)
+    wasted = sum(group[0].stat().st_size * (len(group) - 1) for group in identical)
+    print("\n=== Identical Contents ===")
+    print(f"Groups of byte-identical files: {len(identical)}")
+    print(f"Space used by extra copies: {wasted / 1024 / 1024:.1f} MB")
+    
     # Save audit report
     report = {
         'audio_dir': {
@@ -84,6 +96,11 @@ def main():
             'shared_count': len(shared_ids),
             'only_audio_count': len(only_audio),
             'only_downloads_count': len(only_downloads),
+        },
+        'identical_files': {
+            'group_count': len(identical),
+            'wasted_bytes': wasted,
+            'groups': [[str(f) for f in group] for group in identical[:100]],
         }
     }
     
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: decode-once feature extraction vs. one decode per feature
+
+The legacy path mirrors what analysis, waveform, spectrogram and fingerprint
+generation used to do: four separate librosa.load calls (one at the native
+rate, three resampled to 22050 Hz) and a fresh STFT inside each feature.
+The new path is a single AudioAnalyzer.extract_features call.
+
+Requires librosa and numpy.
+
+Usage:
+    python benchmarks/bench_decode_once.py file1.mp3 [file2.mp3 ...] [--runs 3]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from suno_audio import AudioAnalyzer, FEATURES, LIBROSA_AVAILABLE
+
+if LIBROSA_AVAILABLE:
+    import librosa
+
+
+def legacy_all_features(path: str) -> float:
+    """Returns seconds spent inside librosa.load"""
+    decode = 0.0
+
+    start = time.perf_counter()
+    y, sr = librosa.load(path, sr=None, mono=True)
+    decode += time.perf_counter() - start
+    librosa.beat.beat_track(y=y, sr=sr)
+    librosa.feature.chroma_cqt(y=y, sr=sr)  # key detection at the native rate
+    librosa.feature.rms(y=y)
+    librosa.feature.spectral_centroid(y=y, sr=sr)
+    librosa.feature.zero_crossing_rate(y)
+    librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+
+    start = time.perf_counter()
+    y, sr = librosa.load(path, sr=22050, mono=True)             # waveform
+    decode += time.perf_counter() - start
+    np.abs(y).max()
+
+    start = time.perf_counter()
+    y, sr = librosa.load(path, sr=22050, mono=True)             # spectrogram
+    decode += time.perf_counter() - start
+    librosa.power_to_db(librosa.feature.melspectrogram(y=y, sr=sr, n_mels=128), ref=np.max)
+
+    start = time.perf_counter()
+    y, sr = librosa.load(path, sr=22050, mono=True, duration=30)  # fingerprint
+    decode += time.perf_counter() - start
+    librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13).mean(axis=1)
+    return decode
+
+
+def timed(fn, runs):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode-once feature extraction benchmark")
+    parser.add_argument('files', nargs='+', help='Audio files to analyze')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per file (best is reported)')
+    args = parser.parse_args()
+
+    if not LIBROSA_AVAILABLE:
+        sys.exit("librosa is required: pip install librosa")
+
+    analyzer = AudioAnalyzer(use_cache=False)
+    print(f"{'file':<32} {'legacy s':>9} {'(decode)':>9} {'once s':>8} {'(decode)':>9} {'speedup':>8}")
+    totals = [0.0, 0.0]
+    for path in args.files:
+        decode_legacy = []
+        legacy_s = timed(lambda: decode_legacy.append(legacy_all_features(path)), args.runs)
+        once_s = timed(lambda: analyzer.extract_features(path, FEATURES), args.runs)
+        decode_once = timed(lambda: librosa.load(path, sr=22050, mono=True), args.runs)
+        totals[0] += legacy_s
+        totals[1] += once_s
+        print(f"{Path(path).name[:32]:<32} {legacy_s:>9.2f} {min(decode_legacy):>9.2f} "
+              f"{once_s:>8.2f} {decode_once:>9.2f} {legacy_s / once_s:>7.1f}x")
+
+    print(f"\nTotal: legacy {totals[0]:.2f}s, decode-once {totals[1]:.2f}s "
+          f"({totals[0] / totals[1]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
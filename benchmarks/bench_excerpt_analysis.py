@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: excerpt analysis vs. full analysis
+
+Analyzes each file in both modes and reports the speed-up and how often the
+excerpt estimate agrees with the full one: BPM within 4% (and allowing
+half/double-tempo errors) and identical key. Per-mode throughput is turned
+into an estimate of wall time for libraries of 1k/10k/100k songs, so the
+mode can be chosen per library size.
+
+Without --fixtures, structured synthetic tracks are generated (a drumless
+intro, verses, and louder choruses with a kick pattern at a known tempo).
+With --fixtures DIR, every audio file in DIR is used.
+
+Requires librosa and numpy.
+
+Usage:
+    python benchmarks/bench_excerpt_analysis.py [--fixtures DIR] [--tracks 12] [--workers 4]
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from suno_audio import AudioAnalyzer, ANALYSIS_SR, LIBROSA_AVAILABLE, TEMPO_TOLERANCE
+
+if not LIBROSA_AVAILABLE:
+    sys.exit("librosa is required: pip install librosa")
+
+import soundfile
+from bench_key_detection import PROGRESSIONS, synthesize
+
+AUDIO_EXTENSIONS = ('.mp3', '.m4a', '.wav', '.flac', '.ogg')
+
+
+def kick_track(bpm, seconds, sr=ANALYSIS_SR):
+    t = np.arange(int(seconds * sr)) / sr
+    phase = np.mod(t, 60.0 / bpm)
+    return np.sin(2 * np.pi * 60 * phase) * np.exp(-phase * 30)
+
+
+def build_track(path: Path, seed: int, sr=ANALYSIS_SR):
+    """Intro (pad) - verse - chorus - verse - chorus - outro, 2.5-3.5 minutes"""
+    rng = np.random.default_rng(seed)
+    bpm = float(rng.integers(80, 160))
+    tonic, mode = int(rng.integers(0, 12)), ('major', 'minor')[seed % 2]
+    bar = 4 * 60.0 / bpm
+    progression = PROGRESSIONS[mode][seed % 2]
+
+    def section(bars, drums, gain):
+        harmony = synthesize(tonic, mode, progression, sr=sr, chord_seconds=bar, seed=seed)
+        harmony = np.tile(harmony, -(-bars // 4))[:int(bars * bar * sr)]
+        if drums:
+            harmony = harmony + kick_track(bpm, len(harmony) / sr, sr)[:len(harmony)] * 0.5
+        return harmony * gain
+
+    signal = np.concatenate([section(8, False, 0.3), section(16, True, 0.5), section(16, True, 0.9),
+                             section(16, True, 0.5), section(16, True, 0.9), section(8, False, 0.3)])
+    signal = (signal / np.abs(signal).max() * 0.9).astype(np.float32)
+    soundfile.write(str(path), signal, sr)
+
+
+def bpm_agrees(a, b, octave=False):
+    if not a or not b:
+        return False
+    ratios = (1.0, 0.5, 2.0) if octave else (1.0,)
+    return any(abs(a * r - b) <= TEMPO_TOLERANCE * b for r in ratios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excerpt vs. full analysis benchmark")
+    parser.add_argument('--fixtures', help='Directory of audio files (default: synthetic)')
+    parser.add_argument('--tracks', type=int, default=12, help='Synthetic tracks to generate')
+    parser.add_argument('--workers', type=int, default=4, help='Parallel workers for the estimates')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            files = sorted(p for p in Path(args.fixtures).iterdir()
+                           if p.suffix.lower() in AUDIO_EXTENSIONS)
+        else:
+            files = []
+            for seed in range(args.tracks):
+                path = Path(tmp) / f"track_{seed:02d}.wav"
+                build_track(path, seed)
+                files.append(path)
+
+        analyzers = {
+            mode: AudioAnalyzer(cache_dir=str(Path(tmp) / ".audio_cache"), use_cache=False,
+                                stream_threshold_bytes=None, analysis_mode=mode)
+            for mode in ('full', 'excerpt')
+        }
+        analyzers['full'].analyze_file(files[0])  # warm up (numba JIT)
+
+        times = {'full': 0.0, 'excerpt': 0.0}
+        agree = {'bpm': 0, 'bpm_octave': 0, 'key': 0}
+        confidence = []
+        print(f"{'file':<20} {'full s':>7} {'excerpt s':>9} {'bpm full/excerpt':>17} {'conf':>5}  key")
+        for path in files:
+            results, seconds = {}, {}
+            for mode, analyzer in analyzers.items():
+                start = time.perf_counter()
+                results[mode] = analyzer.analyze_file(path)
+                seconds[mode] = time.perf_counter() - start
+                times[mode] += seconds[mode]
+            full, excerpt = results['full'], results['excerpt']
+            agree['bpm'] += bpm_agrees(excerpt.get('bpm'), full.get('bpm'))
+            agree['bpm_octave'] += bpm_agrees(excerpt.get('bpm'), full.get('bpm'), octave=True)
+            agree['key'] += excerpt.get('key') == full.get('key')
+            confidence.append(excerpt.get('bpm_confidence', 1.0))
+            key_note = 'same' if excerpt.get('key') == full.get('key') else \
+                f"{full.get('key')} / {excerpt.get('key')}"
+            print(f"{path.name[:20]:<20} {seconds['full']:>7.2f} {seconds['excerpt']:>9.2f} "
+                  f"{full.get('bpm') or 0:>8.1f}/{excerpt.get('bpm') or 0:<8.1f} "
+                  f"{excerpt.get('bpm_confidence', 1.0):>5.2f}  {key_note}")
+
+    n = len(files)
+    speedup = times['full'] / times['excerpt']
+    print(f"\n{n} files: full {times['full'] / n:.2f} s/file, excerpt {times['excerpt'] / n:.2f} s/file "
+          f"({speedup:.1f}x faster)")
+    print(f"Agreement with full analysis: BPM {agree['bpm'] / n:.0%} "
+          f"({agree['bpm_octave'] / n:.0%} allowing half/double tempo), key {agree['key'] / n:.0%}; "
+          f"mean excerpt BPM confidence {np.mean(confidence):.2f}")
+
+    print(f"\nEstimated wall time with {args.workers} workers:")
+    print(f"{'songs':>8} {'full':>10} {'excerpt':>10}")
+    for songs in (1000, 10000, 100000):
+        hours = {mode: times[mode] / n * songs / args.workers / 3600 for mode in times}
+        print(f"{songs:>8,} {hours['full']:>9.1f}h {hours['excerpt']:>9.1f}h")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark: key detection speed and accuracy
+
+Compares the previous detector (full-rate chroma_cqt, tonic fixed at the
+loudest pitch class, binary major/minor scale templates) with the profile
+correlation in suno_keys on a labelled fixture set, and times scoring a
+large batch of chroma vectors in one matrix product against a per-song
+Python loop.
+
+Without --fixtures, a synthetic set is generated: two chord progressions
+(with bass line and a stepwise melody) in each of the 24 keys. With
+--fixtures DIR, DIR/labels.csv must list ``filename,key`` rows such as
+``track01.wav,F#/Gb minor``.
+
+Accuracy is reported as exact matches and as the MIREX weighted score
+(1.0 exact, 0.5 perfect fifth, 0.3 relative, 0.2 parallel).
+
+Requires librosa and numpy.
+
+Usage:
+    python benchmarks/bench_key_detection.py [--fixtures DIR] [--batch 100000]
+"""
+
+import csv
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from suno_audio import AudioAnalyzer, ANALYSIS_SR, HOP_LENGTH, KEY_SR
+from suno_keys import PITCH_NAMES, PROFILES, detect_keys
+from suno_similarity import parse_key
+
+try:
+    import librosa
+    import soundfile
+except ImportError:
+    sys.exit("librosa (with soundfile) is required: pip install librosa")
+
+MAJOR_SCALE = (0, 2, 4, 5, 7, 9, 11)
+MINOR_SCALE = (0, 2, 3, 5, 7, 8, 11)  # harmonic minor (raised leading tone)
+PROGRESSIONS = {
+    'major': [(0, 3, 4, 0), (0, 5, 3, 4)],   # I-IV-V-I, I-vi-IV-V
+    'minor': [(0, 3, 4, 0), (0, 5, 3, 4)],   # i-iv-V-i, i-VI-iv-V
+}
+
+
+def _tone(freq, seconds, sr):
+    t = np.arange(int(seconds * sr)) / sr
+    tone = sum(np.sin(2 * np.pi * freq * h * t) / h for h in range(1, 6))
+    return tone * np.exp(-t * 1.5)
+
+
+def synthesize(tonic, mode, progression, sr=ANALYSIS_SR, chord_seconds=2.0, seed=0):
+    """Chords built on scale degrees, a root bass and a stepwise melody"""
+    rng = np.random.default_rng(seed)
+    scale = MAJOR_SCALE if mode == 'major' else MINOR_SCALE
+    base = 130.81 * 2 ** (tonic / 12)  # C3 + tonic
+    out = []
+    for degree in progression:
+        chord = [scale[(degree + step) % 7] + 12 * ((degree + step) // 7) for step in (0, 2, 4)]
+        audio = sum(_tone(base * 2 ** (semi / 12), chord_seconds, sr) for semi in chord) * 0.2
+        audio += _tone(base / 2 * 2 ** (chord[0] / 12), chord_seconds, sr) * 0.3
+        n = len(audio) // 4
+        for i in range(4):
+            semi = scale[(degree + i) % 7] + 12
+            audio[i * n:(i + 1) * n] += _tone(base * 2 ** (semi / 12), n / sr, sr)[:n] * 0.15
+        out.append(audio)
+    signal = np.concatenate(out)
+    signal += rng.normal(0, 0.01, len(signal))
+    return (signal / np.abs(signal).max() * 0.8).astype(np.float32)
+
+
+def build_fixtures(directory: Path):
+    labels = []
+    for mode in ('major', 'minor'):
+        for tonic in range(12):
+            for n, progression in enumerate(PROGRESSIONS[mode]):
+                name = f"{PITCH_NAMES[tonic].split('/')[0].replace('#', 's')}_{mode}_{n}.wav"
+                y = synthesize(tonic, mode, progression, seed=tonic * 10 + n)
+                soundfile.write(str(directory / name), y, ANALYSIS_SR)
+                labels.append((name, f"{PITCH_NAMES[tonic]} {mode}"))
+    return labels
+
+
+def load_labels(directory: Path):
+    with open(directory / 'labels.csv', newline='', encoding='utf-8') as f:
+        return [(row[0], row[1]) for row in csv.reader(f) if row and not row[0].startswith('#')]
+
+
+def legacy_key(chroma_avg):
+    """The previous AudioAnalyzer._detect_key decision rule"""
+    key_idx = int(chroma_avg.argmax())
+    major_template = [1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 1]
+    minor_template = [1, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0]
+    major_rotated = major_template[key_idx:] + major_template[:key_idx]
+    minor_rotated = minor_template[key_idx:] + minor_template[:key_idx]
+    major_corr = sum(c * t for c, t in zip(chroma_avg, major_rotated))
+    minor_corr = sum(c * t for c, t in zip(chroma_avg, minor_rotated))
+    return f"{PITCH_NAMES[key_idx]} {'major' if major_corr >= minor_corr else 'minor'}"
+
+
+def mirex_score(predicted: str, truth: str) -> float:
+    p, t = parse_key(predicted), parse_key(truth)
+    if p is None or t is None:
+        return 0.0
+    (p_pc, p_mode), (t_pc, t_mode) = p, t
+    if p == t:
+        return 1.0
+    if p_mode == t_mode and (p_pc - t_pc) % 12 in (5, 7):
+        return 0.5
+    if p_mode != t_mode:
+        relative = (t_pc + 9) % 12 if t_mode == 'major' else (t_pc + 3) % 12
+        if p_pc == relative:
+            return 0.3
+        if p_pc == t_pc:
+            return 0.2
+    return 0.0
+
+
+def report(name, predictions, truths, seconds):
+    exact = sum(p == t for p, t in zip(predictions, truths)) / len(truths)
+    weighted = sum(mirex_score(p, t) for p, t in zip(predictions, truths)) / len(truths)
+    print(f"{name:<34} {exact:>7.1%} {weighted:>9.3f} {seconds * 1000 / len(truths):>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Key detection benchmark")
+    parser.add_argument('--fixtures', help='Directory with audio files and labels.csv')
+    parser.add_argument('--batch', type=int, default=100000, help='Chroma vectors for the batch timing')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            directory = Path(args.fixtures)
+            labels = load_labels(directory)
+        else:
+            directory = Path(tmp)
+            labels = build_fixtures(directory)
+        print(f"{len(labels)} labelled files\n")
+
+        signals = [librosa.load(str(directory / name), sr=ANALYSIS_SR, mono=True)[0]
+                   for name, _ in labels]
+        truths = [truth for _, truth in labels]
+
+        # Chroma at the analysis rate (previous) and downsampled (current)
+        start = time.perf_counter()
+        chroma_full = np.stack([librosa.feature.chroma_cqt(y=y, sr=ANALYSIS_SR).mean(axis=1)
+                                for y in signals])
+        full_s = time.perf_counter() - start
+        start = time.perf_counter()
+        chroma_down = np.stack([
+            librosa.feature.chroma_cqt(y=librosa.resample(y, orig_sr=ANALYSIS_SR, target_sr=KEY_SR),
+                                       sr=KEY_SR, hop_length=HOP_LENGTH).mean(axis=1)
+            for y in signals])
+        down_s = time.perf_counter() - start
+
+        print(f"{'method':<34} {'exact':>7} {'weighted':>9} {'ms per file':>12}")
+        report("legacy (full chroma, templates)", [legacy_key(c) for c in chroma_full], truths, full_s)
+        for profile in PROFILES:
+            report(f"{profile} (full chroma)",
+                   [k['key'] for k in detect_keys(chroma_full, profile)], truths, full_s)
+            report(f"{profile} (chroma @ {KEY_SR} Hz)",
+                   [k['key'] for k in detect_keys(chroma_down, profile)], truths, down_s)
+
+        analyzer = AudioAnalyzer(cache_dir=str(Path(tmp) / ".audio_cache"), use_cache=False)
+        start = time.perf_counter()
+        predictions = [analyzer._detect_key(y, ANALYSIS_SR)['key'] for y in signals]
+        report("AudioAnalyzer._detect_key", predictions, truths, time.perf_counter() - start)
+
+    rng = np.random.default_rng(0)
+    batch = rng.random((args.batch, 12))
+    start = time.perf_counter()
+    for vector in batch:
+        legacy_key(vector)
+    loop_s = time.perf_counter() - start
+    start = time.perf_counter()
+    detect_keys(batch)
+    batch_s = time.perf_counter() - start
+    print(f"\nScoring {args.batch:,} chroma vectors: legacy loop {loop_s:.2f}s "
+          f"(2 templates), batch {batch_s:.2f}s (24 profiles)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SmartPlaylistGenerator on a synthetic library
+
+Builds an N-song library (default 50,000) and times the SQL-backed
+generators against the previous approach of loading every song (plus a
+tag query per song) and filtering in Python.
+
+Usage:
+    python benchmarks/bench_smart_playlists.py [--songs 50000] [--runs 3]
+"""
+
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from suno_core import SunoDatabase
+from suno_api import SmartPlaylistGenerator
+
+TAGS = ['rock', 'pop', 'dance', 'electronic', 'ambient', 'chill', 'lofi', 'sad', 'ballad',
+        'happy', 'uplifting', 'metal', 'heavy', 'jazz', 'folk', 'emotional', 'fun', 'upbeat']
+KEYS = [f"{note} {mode}" for note in ['C', 'C#/Db', 'D', 'D#/Eb', 'E', 'F', 'F#/Gb', 'G',
+                                        'G#/Ab', 'A', 'A#/Bb', 'B'] for mode in ('major', 'minor')]
+
+
+def build_library(db_path: Path, n: int, seed: int = 0) -> SunoDatabase:
+    rng = random.Random(seed)
+    db = SunoDatabase(str(db_path))
+    songs = [{
+        'title': f"Song {i}",
+        'url': f"https://suno.com/song/{i:08x}-0000-0000-0000-000000000000",
+        'tags': rng.sample(TAGS, rng.randint(1, 4)),
+        'duration': f"{rng.randint(1, 5)}:{rng.randint(0, 59):02d}",
+    } for i in range(n)]
+    db.add_songs(songs)
+
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany('UPDATE songs SET bpm = ?, musical_key = ? WHERE id = ?', [
+        (round(rng.uniform(60, 190), 1), rng.choice(KEYS), f"{i:08x}-0000-0000-0000-000000000000")
+        for i in range(n)
+    ])
+    conn.commit()
+    conn.close()
+    return db
+
+
+def legacy_by_mood(db, mood):
+    """The pre-SQL implementation (bpm None treated as 0 to avoid TypeError)"""
+    songs = db.get_all_songs()
+    keywords = {
+        'energetic': ['energetic', 'upbeat', 'dance', 'electronic'],
+        'melancholic': ['sad', 'melancholic', 'emotional', 'ballad'],
+    }[mood]
+    if mood == 'energetic':
+        return [s for s in songs if (s.get('bpm') or 0) > 120 or any(
+            t in str(s.get('tags', [])).lower() for t in keywords)]
+    return [s for s in songs if any(t in str(s.get('tags', [])).lower() for t in keywords)
+            or (s.get('musical_key') or '').lower().endswith('minor')]
+
+
+def legacy_by_bpm_range(db, lo, hi):
+    songs = db.get_all_songs()
+    return sorted([s for s in songs if s.get('bpm') and lo <= s['bpm'] <= hi], key=lambda x: x['bpm'])
+
+
+def legacy_by_key(db, key):
+    songs = db.get_all_songs()
+    return [s for s in songs if s.get('musical_key') and key.lower() in s['musical_key'].lower()]
+
+
+def timed(fn, runs):
+    best, result = float('inf'), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart playlist benchmark")
+    parser.add_argument('--songs', type=int, default=50000, help='Synthetic library size')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per query (best is reported)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building {args.songs:,}-song library...")
+        db = build_library(Path(tmp) / "bench.db", args.songs)
+        generator = SmartPlaylistGenerator(db)
+
+        cases = [
+            ('by_bpm_range(120, 130)', lambda: legacy_by_bpm_range(db, 120, 130),
+             lambda: generator.by_bpm_range(120, 130)),
+            ("by_key('A minor')", lambda: legacy_by_key(db, 'A minor'),
+             lambda: generator.by_key('A minor')),
+            ("by_mood('energetic')", lambda: legacy_by_mood(db, 'energetic'),
+             lambda: generator.by_mood('energetic')),
+            ("by_mood('melancholic')", lambda: legacy_by_mood(db, 'melancholic'),
+             lambda: generator.by_mood('melancholic')),
+        ]
+
+        print(f"\n{'query':<26} {'legacy ms':>10} {'sql ms':>10} {'speedup':>8} {'rows':>8}")
+        for name, legacy, new in cases:
+            legacy_s, legacy_rows = timed(legacy, args.runs)
+            new_s, new_rows = timed(new, args.runs)
+            flag = '' if legacy_rows == new_rows else f'  (rows differ: {legacy_rows})'
+            print(f"{name:<26} {legacy_s * 1000:>10.1f} {new_s * 1000:>10.1f} "
+                  f"{legacy_s / new_s:>7.1f}x {new_rows:>8}{flag}")
+
+        workout_s, _ = timed(lambda: generator.workout_playlist(60), args.runs)
+        print(f"{'workout_playlist(60)':<26} {'':>10} {workout_s * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: iter_content(8192) vs suno_stream.stream_to_file
+
+Serves a generated file from a local HTTP server and downloads it with
+both writers, reporting throughput (MB/s) and CPU seconds per GB.
+
+Usage:
+    python benchmarks/bench_stream_writer.py [--size-mb 200] [--runs 3]
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from suno_stream import stream_to_file
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(directory, port_queue):
+    """Runs in a child process so server CPU is not counted against the writers"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=directory))
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def legacy_writer(response, path):
+    """What the download paths did before suno_stream"""
+    hasher = hashlib.sha256()
+    with open(path, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=8192):
+            if chunk:
+                f.write(chunk)
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def streamed_writer(response, path):
+    return stream_to_file(response, path).digest
+
+
+def measure(writer, session, url, out_path, size_bytes, runs):
+    """Best-of-N wall time and mean CPU time for one writer"""
+    walls, cpus = [], []
+    digest = None
+    for _ in range(runs):
+        if out_path.exists():
+            out_path.unlink()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        response = session.get(url, stream=True, timeout=60)
+        response.raise_for_status()
+        digest = writer(response, out_path)
+        walls.append(time.perf_counter() - wall_start)
+        cpus.append(time.process_time() - cpu_start)
+
+    gigabytes = size_bytes / 1024 ** 3
+    return {
+        'mb_per_s': size_bytes / 1024 ** 2 / min(walls),
+        'cpu_per_gb': (sum(cpus) / len(cpus)) / gigabytes,
+        'digest': digest,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download writer microbenchmark")
+    parser.add_argument('--size-mb', type=int, default=200, help='Test file size')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per writer')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        served = tmp / "serve"
+        served.mkdir()
+        source = served / "song.bin"
+        size_bytes = args.size_mb * 1024 * 1024
+        with open(source, 'wb') as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+        port_queue = multiprocessing.Queue()
+        server = multiprocessing.Process(target=serve, args=(str(served), port_queue), daemon=True)
+        server.start()
+        url = f"http://127.0.0.1:{port_queue.get(timeout=10)}/song.bin"
+
+        session = requests.Session()
+        try:
+            results = {
+                'iter_content(8192)': measure(legacy_writer, session, url, tmp / "a.bin", size_bytes, args.runs),
+                'stream_to_file': measure(streamed_writer, session, url, tmp / "b.bin", size_bytes, args.runs),
+            }
+        finally:
+            server.terminate()
+
+    print(f"\n{args.size_mb} MB over loopback, best of {args.runs} runs\n")
+    print(f"{'writer':<22} {'MB/s':>10} {'CPU s/GB':>10}")
+    for name, r in results.items():
+        print(f"{name:<22} {r['mb_per_s']:>10.1f} {r['cpu_per_gb']:>10.2f}")
+
+    digests = {r['digest'] for r in results.values()}
+    print("\nDigests match" if len(digests) == 1 else "\n✗ Digest mismatch!")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,17 +17,32 @@ Usage:
        - Copy the token value (everything after 'Bearer ')
     
     2. Run script:
-       python suno_downloader.py
+       python suno_downloader.py [--output DIR] [--workers N]
+       
+       Re-runs skip files recorded in the local manifest
+       (suno_library/.suno_index.db) without contacting the server.
+       Use --verify (or --verify-ttl DAYS) to re-check against the CDN and
+       --repair-manifest to rebuild it from the files on disk.
+       
+       Page walks stop at the first page of already-downloaded clips
+       (state in suno_library/.sync_state.json); --full walks everything.
+       
+       Clip metadata is kept in one table of the same index database;
+       --write-sidecars / --export-sidecars produce *_metadata.json files
+       and --import-sidecars folds old ones into the store.
     
     3. Paste the Bearer token when prompted
 
 Features:
     - Automatic pagination through entire library
+    - Downloads start while later pages are still being fetched
+    - WAV conversion in a separate process pool (skips up-to-date WAVs)
     - Parallel downloads with connection pooling
     - Resume capability for interrupted downloads
     - Comprehensive error handling and retry logic
     - Progress bars for tracking
     - Organized output by date
+    - Clip metadata in one compressed, indexed table (sidecars optional)
 """
 
 import os
@@ -37,9 +52,12 @@ import time
 import sys
 import subprocess
 import shutil
+import queue
+import argparse
+import threading
 from pathlib import Path
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, as_completed, wait
 from typing import List, Dict, Optional, Tuple
 
 try:
@@ -50,6 +68,55 @@ except ImportError:
     print("Install with: pip install requests tqdm")
     sys.exit(1)
 
+# Shared helpers live in the project root (stdlib-only)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from suno_ratelimit import get_rate_controller
+from suno_manifest import DownloadManifest, hash_file
+from suno_watermark import SyncWatermark
+from suno_metadata_store import ClipMetadataStore, SIDECAR_SUFFIX
+from suno_stream import stream_to_file
+
+# Marks the end of the page feed in the producer/consumer pipeline
+_END_OF_FEED = object()
+
+
+def convert_file_to_wav(audio_path: str) -> Tuple[str, str]:
+    """
+    Convert one audio file to WAV next to it (runs in a worker process).
+    
+    Skips the work when the WAV is newer than its source. ffmpeg writes to
+    a temporary name that is renamed into place, so a crash or a racing
+    worker never leaves a truncated WAV that later looks up to date.
+    
+    Args:
+        audio_path: Source audio file
+        
+    Returns:
+        Tuple of (audio_path, status) where status is 'converted',
+        'up-to-date' or 'failed'
+    """
+    source = Path(audio_path)
+    wav_path = source.with_suffix('.wav')
+    tmp_path = wav_path.with_name(f"{wav_path.stem}.{os.getpid()}.converting.wav")
+    try:
+        if wav_path.exists() and wav_path.stat().st_size > 0 \
+                and wav_path.stat().st_mtime >= source.stat().st_mtime:
+            return audio_path, 'up-to-date'
+        
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-i", str(source), str(tmp_path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        os.replace(tmp_path, wav_path)
+        return audio_path, 'converted'
+    except Exception:
+        # Conversion failures should not fail the whole download
+        if tmp_path.exists():
+            tmp_path.unlink()
+        return audio_path, 'failed'
+
 
 class SunoDownloader:
     """Main downloader class for Suno library management."""
@@ -57,18 +124,43 @@ class SunoDownloader:
     BASE_URL = "https://studio-api.prod.suno.com"
     CLIPS_ENDPOINT = "/api/feed/v3"
     
-    def __init__(self, token: str, output_dir: str = "suno_library", convert_to_wav: bool = True):
+    def __init__(self, token: str, output_dir: str = "suno_library", convert_to_wav: bool = True,
+                 verify: bool = False, verify_ttl_days: Optional[float] = None,
+                 full_sync: bool = False, write_sidecars: bool = False):
         """
         Initialize downloader with Bearer token.
         
         Args:
             token: Bearer token from Suno API (from Authorization header)
             output_dir: Directory to save downloaded files
+            convert_to_wav: Convert downloaded audio to WAV with ffmpeg
+            verify: Re-check every existing file against the server (HEAD)
+            verify_ttl_days: Re-check files last verified longer ago than this
+            full_sync: Page through the whole feed instead of stopping at
+                the first page of already-downloaded clips
+            write_sidecars: Also write a *_metadata.json next to each clip
         """
         self.token = token
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.convert_to_wav = convert_to_wav
+        self.verify = verify
+        self.verify_ttl_days = verify_ttl_days
+        
+        # Local record of downloaded files (re-runs skip without HEAD requests)
+        self.manifest = DownloadManifest(self.output_dir)
+        
+        # Clip metadata lives in one table next to the manifest
+        self.metadata_store = ClipMetadataStore(self.manifest.db_path)
+        self.write_sidecars = write_sidecars
+        
+        # Incremental sync: clips already downloaded end the page walk early
+        self.full_sync = full_sync
+        self.watermark = SyncWatermark(self.output_dir / '.sync_state.json', feed='liked')
+        if self.watermark.is_empty:
+            # Only clips whose audio arrived count as synced (not e.g. a lone cover)
+            audio_ids = self.manifest.get_clip_ids(kind='audio')
+            self.watermark.observe({'id': clip_id} for clip_id in audio_ids)
         
         # Configure session with connection pooling
         self.session = requests.Session()
@@ -77,17 +169,33 @@ class SunoDownloader:
             'Authorization': f'Bearer {token}'
         })
         
-        # Retry configuration
+        # Retry configuration; pacing and backoff come from the shared
+        # adaptive rate controller (per host, honours Retry-After)
         self.max_retries = 3
-        self.retry_delay = 2
+        self.rate = get_rate_controller()
         
         # Download statistics
         self.stats = {
             'total': 0,
             'downloaded': 0,
             'skipped': 0,
-            'failed': 0
+            'failed': 0,
+            'verified': 0,
+            'pages': 0,
+            'converted': 0,
+            'convert_failed': 0
         }
+        self._stats_lock = threading.Lock()
+        
+        # Transcoding stage (process pool, set up by run())
+        self._convert_pool: Optional[ProcessPoolExecutor] = None
+        self._convert_futures: List[Future] = []
+        self._convert_bar = None
+    
+    def _count(self, key: str) -> None:
+        """Thread-safe stats increment"""
+        with self._stats_lock:
+            self.stats[key] += 1
     
     def _make_browser_token(self) -> str:
         """Generate a browser-token payload similar to the web client."""
@@ -120,34 +228,31 @@ class SunoDownloader:
             },
         }
         
-        for attempt in range(self.max_retries):
-            try:
-                headers = self.session.headers.copy()
-                headers['browser-token'] = self._make_browser_token()
-                response = self.session.post(url, json=payload, headers=headers, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                clips = data.get('clips', [])
+        try:
+            headers = self.session.headers.copy()
+            headers['browser-token'] = self._make_browser_token()
+            response = self.rate.request(
+                self.session, 'POST', url,
+                max_attempts=self.max_retries,
+                json=payload, headers=headers, timeout=30
+            )
+            response.raise_for_status()
+            
+            data = response.json()
+            clips = data.get('clips', [])
 
-                # Cursor-based pagination: if API returns a new cursor, we have more pages
-                next_cursor = (
-                    data.get('cursor')
-                    or data.get('next_cursor')
-                    or data.get('nextCursor')
-                )
+            # Cursor-based pagination: if API returns a new cursor, we have more pages
+            next_cursor = (
+                data.get('cursor')
+                or data.get('next_cursor')
+                or data.get('nextCursor')
+            )
 
-                return clips, next_cursor
-                
-            except requests.exceptions.RequestException as e:
-                if attempt < self.max_retries - 1:
-                    print(f"\n⚠ Retry {attempt + 1}/{self.max_retries} for page: {e}")
-                    time.sleep(self.retry_delay * (attempt + 1))
-                else:
-                    print(f"\n✗ Failed to fetch page: {e}")
-                    return [], None
-        
-        return [], None
+            return clips, next_cursor
+            
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"\n✗ Failed to fetch page: {e}")
+            return [], None
     
     def sanitize_filename(self, filename: str) -> str:
         """
@@ -164,80 +269,142 @@ class SunoDownloader:
             filename = filename.replace(char, '_')
         return filename.strip()
     
-    def download_file(self, url: str, filepath: Path) -> bool:
+    def _remote_matches(self, url: str, filepath: Path, entry: Optional[Dict]) -> bool:
+        """
+        Compare a local file with the server copy using a HEAD request.
+        
+        Prefers ETag when both sides have one, otherwise Content-Length.
+        """
+        try:
+            response = self.rate.request(self.session, 'HEAD', url, timeout=10)
+            remote_etag = response.headers.get('etag')
+            remote_size = int(response.headers.get('content-length', 0))
+        except Exception:
+            return False
+        
+        local_etag = entry.get('etag') if entry else None
+        if remote_etag and local_etag:
+            return remote_etag == local_etag
+        return remote_size > 0 and filepath.stat().st_size == remote_size
+    
+    def is_downloaded(self, url: str, filepath: Path) -> bool:
+        """
+        Decide whether a file is already present and complete.
+        
+        Files known to the manifest are trusted from local state alone; the
+        server is only asked when --verify is set, the TTL has expired, or
+        the file predates the manifest.
+        """
+        if not filepath.exists():
+            return False
+        
+        entry = self.manifest.lookup(filepath)
+        if self.manifest.is_current(entry, filepath, url):
+            if not self.verify and not self.manifest.needs_verification(entry, self.verify_ttl_days):
+                return True
+            if self._remote_matches(url, filepath, entry):
+                self.manifest.mark_verified(filepath, url=url)
+                self._count('verified')
+                return True
+            return False
+        
+        # Legacy file (or changed on disk): one HEAD, then remember it
+        if self._remote_matches(url, filepath, entry):
+            self.manifest.record(filepath, clip_id=entry.get('clip_id') if entry else None,
+                                 url=url, sha256=hash_file(filepath))
+            return True
+        return False
+    
+    def download_file(self, url: str, filepath: Path, clip_id: Optional[str] = None) -> bool:
         """
         Download a single file with resume capability.
         
         Args:
             url: Direct download URL
             filepath: Destination file path
+            clip_id: Clip the file belongs to (recorded in the manifest)
             
         Returns:
             True if successful, False otherwise
         """
         # Check if file already exists and is complete
-        if filepath.exists():
-            try:
-                # Verify file size matches
-                response = self.session.head(url, timeout=10)
-                remote_size = int(response.headers.get('content-length', 0))
-                local_size = filepath.stat().st_size
-                
-                if remote_size > 0 and local_size == remote_size:
-                    return True  # File already downloaded
-            except Exception:
-                pass  # Continue with download attempt
+        if self.is_downloaded(url, filepath):
+            self._count('skipped')
+            return True
         
         # Download with retry logic
         for attempt in range(self.max_retries):
             try:
-                response = self.session.get(url, stream=True, timeout=60)
-                response.raise_for_status()
-                
-                total_size = int(response.headers.get('content-length', 0))
-                
-                # Write file with progress tracking
-                filepath.parent.mkdir(parents=True, exist_ok=True)
-                with open(filepath, 'wb') as f:
-                    if total_size == 0:
-                        f.write(response.content)
-                    else:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
+                # The slot is held for the whole transfer so the controller's
+                # concurrency limit applies to CDN bandwidth, not just requests
+                with self.rate.slot(url) as slot:
+                    response = self.session.get(url, stream=True, timeout=60)
+                    slot.record(response)
+                    response.raise_for_status()
+                    
+                    # Write file, hashing as we go for the manifest
+                    result = stream_to_file(response, filepath)
                 
+                self.manifest.record(
+                    filepath,
+                    clip_id=clip_id,
+                    url=url,
+                    etag=response.headers.get('etag'),
+                    sha256=result.digest
+                )
                 return True
                 
             except Exception as e:
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                else:
+                # Retry pacing comes from the rate controller on the next slot
+                if attempt == self.max_retries - 1:
                     print(f"\n✗ Failed to download {filepath.name}: {e}")
                     # Clean up partial download
                     if filepath.exists():
                         filepath.unlink()
+                    self.manifest.remove(filepath)
                     return False
         
         return False
     
     def convert_audio_to_wav(self, audio_path: Path) -> None:
-        if not self.convert_to_wav:
+        """
+        Queue (or, outside run(), perform) WAV conversion of a download.
+        
+        During run() the download thread only submits the job; transcoding
+        happens in a separate process pool so the network keeps flowing.
+        """
+        if not self.convert_to_wav or shutil.which("ffmpeg") is None:
             return
-        try:
-            if shutil.which("ffmpeg") is None:
-                return
-            wav_path = audio_path.with_suffix('.wav')
-            if wav_path.exists():
-                return
-            subprocess.run(
-                ["ffmpeg", "-y", "-i", str(audio_path), str(wav_path)],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=True,
-            )
-        except Exception:
-            # Conversion failures should not fail the whole download
-            pass
+        
+        if self._convert_pool is None:
+            self._on_converted(convert_file_to_wav(str(audio_path)))
+            return
+        
+        future = self._convert_pool.submit(convert_file_to_wav, str(audio_path))
+        future.add_done_callback(self._on_conversion_done)
+        with self._stats_lock:
+            self._convert_futures.append(future)
+            if self._convert_bar is not None:
+                self._convert_bar.total = len(self._convert_futures)
+                self._convert_bar.refresh()
+    
+    def _on_conversion_done(self, future: Future) -> None:
+        """Pool callback; a crashed worker counts as a failed conversion"""
+        if future.cancelled() or future.exception() is not None:
+            self._on_converted(('', 'failed'))
+        else:
+            self._on_converted(future.result())
+    
+    def _on_converted(self, result: Tuple[str, str]) -> None:
+        """Record the outcome of one conversion job."""
+        _, status = result
+        if status == 'converted':
+            self._count('converted')
+        elif status == 'failed':
+            self._count('convert_failed')
+        with self._stats_lock:
+            if self._convert_bar is not None:
+                self._convert_bar.update(1)
     
     def process_clip(self, clip: Dict) -> Optional[Dict]:
         """
@@ -301,7 +468,7 @@ class SunoDownloader:
         if clip_info['audio_url']:
             audio_ext = Path(clip_info['audio_url']).suffix or '.mp3'
             audio_path = date_folder / f"{base_filename}{audio_ext}"
-            if self.download_file(clip_info['audio_url'], audio_path):
+            if self.download_file(clip_info['audio_url'], audio_path, clip_info['clip_id']):
                 success = True
             if audio_path.exists():
                 self.convert_audio_to_wav(audio_path)
@@ -310,112 +477,228 @@ class SunoDownloader:
         if clip_info['video_url']:
             video_ext = Path(clip_info['video_url']).suffix or '.mp4'
             video_path = date_folder / f"{base_filename}{video_ext}"
-            self.download_file(clip_info['video_url'], video_path)
+            self.download_file(clip_info['video_url'], video_path, clip_info['clip_id'])
         
         # Download cover image (optional)
         if clip_info['image_url']:
             image_ext = Path(clip_info['image_url']).suffix or '.jpg'
             image_path = date_folder / f"{base_filename}_cover{image_ext}"
-            self.download_file(clip_info['image_url'], image_path)
+            self.download_file(clip_info['image_url'], image_path, clip_info['clip_id'])
         
-        # Save metadata JSON
-        metadata_path = date_folder / f"{base_filename}_metadata.json"
+        # Save metadata (consolidated store; sidecar only on request)
         try:
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(clip_info['metadata'], f, indent=2, ensure_ascii=False)
+            self.metadata_store.put(clip_info['metadata'])
+            if self.write_sidecars:
+                self._write_sidecar(clip_info)
         except Exception as e:
             print(f"\n⚠ Failed to save metadata for {base_filename}: {e}")
         
         return success
     
-    def run(self, max_workers: int = 5):
-        """
-        Main execution method to download entire library.
+    def _sidecar_path(self, clip_info: Dict) -> Path:
+        """Legacy per-clip metadata path next to the audio file."""
+        return (self.output_dir / clip_info['date_folder'] /
+                f"{clip_info['base_filename']}{SIDECAR_SUFFIX}")
+    
+    def _write_sidecar(self, clip_info: Dict) -> None:
+        metadata_path = self._sidecar_path(clip_info)
+        metadata_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(metadata_path, 'w', encoding='utf-8') as f:
+            json.dump(clip_info['metadata'], f, indent=2, ensure_ascii=False)
+    
+    def export_sidecars(self, overwrite: bool = False) -> int:
+        """Write *_metadata.json sidecars for every clip in the metadata store."""
+        def path_for(clip: Dict) -> Optional[Path]:
+            clip_info = self.process_clip(clip)
+            return self._sidecar_path(clip_info) if clip_info else None
         
-        Args:
-            max_workers: Number of parallel download threads
+        return self.metadata_store.export_sidecars(path_for, overwrite=overwrite)
+    
+    def import_sidecars(self, delete: bool = False) -> int:
+        """Fold existing *_metadata.json sidecars into the metadata store."""
+        return self.metadata_store.import_sidecars(self.output_dir, delete=delete)
+    
+    def repair_manifest(self) -> Dict[str, int]:
+        """Rebuild the download manifest from files on disk."""
+        print("🔧 Reconciling download manifest with files on disk...")
+        counts = self.manifest.repair()
+        print(f"✓ Manifest: +{counts['added']} added, {counts['updated']} updated, "
+              f"-{counts['removed']} removed\n")
+        return counts
+    
+    def _produce_clips(self, clip_queue: "queue.Queue", page_bar, stop: threading.Event) -> None:
         """
-        print("=" * 60)
-        print("Suno Library Bulk Downloader")
-        print("=" * 60)
-        print(f"Output directory: {self.output_dir.absolute()}\n")
+        Producer stage: page through the feed and enqueue downloadable clips.
         
-        # Phase 1: Fetch all clips
-        print("📡 Fetching library metadata...")
-        all_clips = []
-        cursor = None
+        ``clip_queue`` is bounded, so ``put`` blocks (backpressure) whenever
+        the download workers fall behind. Always ends with the sentinel.
         
-        with tqdm(desc="Fetching pages", unit="page") as pbar:
-            while True:
+        Queued clips are marked pending in the watermark until they download,
+        and the walk continues past known pages until every clip left pending
+        by earlier runs has come round again.
+        """
+        cursor = None
+        seen_ids = set()
+        outstanding = set(self.watermark.pending_ids)
+        try:
+            while not stop.is_set():
                 clips, cursor = self.fetch_clips(cursor)
                 if not clips:
                     break
+                self.stats['pages'] += 1
+                outstanding.difference_update(clip.get('id') for clip in clips)
                 
-                all_clips.extend(clips)
-                pbar.update(1)
-                pbar.set_postfix({'clips': len(all_clips)})
+                # Newest-first feed: a page of known clips means we're caught up
+                # (unless older pages still hold clips pending from earlier runs)
+                if not self.full_sync and not outstanding and self.watermark.page_is_known(clips):
+                    page_bar.update(1)
+                    tqdm.write("✓ Reached already-synced clips, stopping page walk")
+                    break
+                
+                for clip in clips:
+                    if not self.full_sync and self.watermark.is_known(clip):
+                        continue
+                    clip_info = self.process_clip(clip)
+                    if not clip_info or clip_info['clip_id'] in seen_ids:
+                        continue
+                    seen_ids.add(clip_info['clip_id'])
+                    self.watermark.mark_pending([clip_info['metadata']])
+                    with self._stats_lock:
+                        self.stats['total'] += 1
+                    while not stop.is_set():
+                        try:
+                            clip_queue.put(clip_info, timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+                
+                page_bar.update(1)
+                page_bar.set_postfix({'clips': self.stats['total'], 'queued': clip_queue.qsize()})
                 
                 if not cursor:
+                    if outstanding:
+                        # Walked the whole feed without meeting them: unliked or deleted
+                        self.watermark.drop_pending(outstanding)
                     break
-                
-                time.sleep(0.5)  # Rate limiting
-        
-        print(f"\n✓ Found {len(all_clips)} clips in library\n")
-        
-        # Phase 2: Process clip metadata
-        print("📋 Processing clip metadata...")
-        download_queue = []
-        
-        for clip in all_clips:
-            clip_info = self.process_clip(clip)
-            if clip_info:
-                download_queue.append(clip_info)
-        
-        self.stats['total'] = len(download_queue)
-        print(f"✓ {self.stats['total']} clips ready for download\n")
+        finally:
+            clip_queue.put(_END_OF_FEED)
+    
+    def _consume_clips(self, clip_queue: "queue.Queue", download_bar) -> None:
+        """Consumer stage: download clips until the producer's sentinel arrives."""
+        while True:
+            clip_info = clip_queue.get()
+            if clip_info is _END_OF_FEED:
+                clip_queue.put(_END_OF_FEED)  # Let sibling workers see it too
+                return
+            
+            try:
+                success = self.download_clip_files(clip_info)
+            except Exception as e:
+                success = False
+                tqdm.write(f"✗ Error processing {clip_info['title']}: {e}")
+            self._count('downloaded' if success else 'failed')
+            if success:
+                # Failed clips stay pending, so the next run pages back to them
+                self.watermark.observe([clip_info['metadata']])
+            
+            with self._stats_lock:
+                # Total grows while pages are still arriving
+                download_bar.total = max(self.stats['total'], download_bar.n + 1)
+                download_bar.update(1)
+                download_bar.set_postfix({
+                    'OK': self.stats['downloaded'],
+                    'Fail': self.stats['failed'],
+                    'Throttled': sum(h['throttled'] for h in self.rate.snapshot().values())
+                })
+    
+    def run(self, max_workers: int = 5, queue_size: Optional[int] = None,
+            convert_workers: Optional[int] = None):
+        """
+        Main execution method to download entire library.
         
-        if not download_queue:
-            print("⚠ No clips to download. Exiting.")
-            return
+        Page fetching, downloading and WAV conversion run concurrently: the
+        first page's clips start downloading while later pages are still
+        being fetched, and finished downloads are transcoded in a process
+        pool while the next ones are on the wire.
         
-        # Phase 3: Download files in parallel
-        print(f"⬇️  Downloading files (using {max_workers} threads)...\n")
+        Args:
+            max_workers: Number of parallel download threads
+            queue_size: Max clips buffered between stages (default 4x workers)
+            convert_workers: Transcoding processes (default: CPU count)
+        """
+        print("=" * 60)
+        print("Suno Library Bulk Downloader")
+        print("=" * 60)
+        print(f"Output directory: {self.output_dir.absolute()}\n")
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all download tasks
-            future_to_clip = {
-                executor.submit(self.download_clip_files, clip): clip
-                for clip in download_queue
-            }
+        # Existing library without a manifest: index it from disk once
+        if self.manifest.count() == 0 and any(self.output_dir.glob('*/*')):
+            self.repair_manifest()
+        
+        print(f"📡 Fetching library pages and ⬇️  downloading (using {max_workers} threads)...\n")
+        
+        clip_queue = queue.Queue(maxsize=queue_size or max_workers * 4)
+        stop = threading.Event()
+        
+        converting = self.convert_to_wav and shutil.which("ffmpeg") is not None
+        if converting:
+            self._convert_pool = ProcessPoolExecutor(max_workers=convert_workers or os.cpu_count() or 1)
+        
+        with tqdm(desc="Fetching pages", unit="page", position=0) as page_bar, \
+                tqdm(total=0, desc="Downloading", unit="clip", position=1) as download_bar, \
+                tqdm(total=0, desc="Converting", unit="file", position=2,
+                     disable=not converting) as convert_bar:
+            self._convert_bar = convert_bar
+            producer = threading.Thread(
+                target=self._produce_clips,
+                args=(clip_queue, page_bar, stop),
+                name="suno-page-producer",
+                daemon=True
+            )
+            producer.start()
             
-            # Process completed downloads with progress bar
-            with tqdm(total=self.stats['total'], desc="Overall progress", unit="clip") as pbar:
-                for future in as_completed(future_to_clip):
-                    clip_info = future_to_clip[future]
-                    try:
-                        success = future.result()
-                        if success:
-                            self.stats['downloaded'] += 1
-                        else:
-                            self.stats['failed'] += 1
-                    except Exception as e:
-                        self.stats['failed'] += 1
-                        print(f"\n✗ Error processing {clip_info['title']}: {e}")
-                    
-                    pbar.update(1)
-                    pbar.set_postfix({
-                        'OK': self.stats['downloaded'],
-                        'Fail': self.stats['failed']
-                    })
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    workers = [
+                        executor.submit(self._consume_clips, clip_queue, download_bar)
+                        for _ in range(max_workers)
+                    ]
+                    for worker in as_completed(workers):
+                        worker.result()
+            finally:
+                stop.set()
+                producer.join(timeout=5)
+                self.watermark.save()
+                
+                # Let queued transcodes finish before summarising
+                if self._convert_pool is not None:
+                    wait(list(self._convert_futures))
+                    self._convert_pool.shutdown()
+                    self._convert_pool = None
+                self._convert_bar = None
         
-        # Phase 4: Summary
+        if self.stats['total'] == 0:
+            print("\n⚠ No clips to download.")
+        
+        # Summary
         print("\n" + "=" * 60)
         print("Download Summary")
         print("=" * 60)
+        print(f"Pages fetched:    {self.stats['pages']}" + ("" if self.full_sync else " (incremental)"))
+        if self.watermark.newest_created_at:
+            print(f"Newest synced:    {self.watermark.newest_created_at}")
         print(f"Total clips:      {self.stats['total']}")
         print(f"✓ Downloaded:     {self.stats['downloaded']}")
+        print(f"↷ Files present:  {self.stats['skipped']} (remote-verified: {self.stats['verified']})")
         print(f"✗ Failed:         {self.stats['failed']}")
+        if self.convert_to_wav:
+            print(f"♪ Converted WAV:  {self.stats['converted']} (failed: {self.stats['convert_failed']})")
         print(f"\nFiles saved to:   {self.output_dir.absolute()}")
+        print("\nRate control (per host):")
+        for host, state in sorted(self.rate.snapshot().items()):
+            print(f"  {host}: {state['rate']}/s x{state['concurrency']}, "
+                  f"{state['requests']} req, {state['throttled']} throttled, "
+                  f"{state['server_errors'] + state['network_errors']} errors")
         print("=" * 60)
 
 
@@ -451,15 +734,63 @@ def get_token_input() -> str:
     return token
 
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Bulk download your Suno library")
+    parser.add_argument('--output', default='suno_library', help='Output directory')
+    parser.add_argument('--workers', type=int, default=5, help='Parallel download threads')
+    parser.add_argument('--no-wav', action='store_true', help='Skip WAV conversion')
+    parser.add_argument('--convert-workers', type=int, default=None,
+                        help='WAV conversion processes (default: CPU count)')
+    parser.add_argument('--verify', action='store_true',
+                        help='Re-check existing files against the server (HEAD per file)')
+    parser.add_argument('--verify-ttl', type=float, default=None, metavar='DAYS',
+                        help='Re-check files not verified in the last DAYS days')
+    parser.add_argument('--repair-manifest', action='store_true',
+                        help='Rebuild the download manifest from files on disk first')
+    parser.add_argument('--full', action='store_true',
+                        help='Page through the entire feed instead of stopping at known clips')
+    parser.add_argument('--write-sidecars', action='store_true',
+                        help='Also write a *_metadata.json file next to each clip')
+    parser.add_argument('--export-sidecars', action='store_true',
+                        help='Write sidecars for all stored metadata and exit (no token needed)')
+    parser.add_argument('--import-sidecars', action='store_true',
+                        help='Move existing *_metadata.json files into the metadata store and exit')
+    return parser.parse_args()
+
+
 def main():
     """Main entry point for script execution."""
+    args = parse_args()
+    
+    # Offline metadata maintenance doesn't talk to the API
+    if args.export_sidecars or args.import_sidecars:
+        downloader = SunoDownloader(token='', output_dir=args.output)
+        if args.import_sidecars:
+            count = downloader.import_sidecars(delete=True)
+            print(f"✓ Imported {count} sidecars into {downloader.manifest.db_path}")
+        if args.export_sidecars:
+            count = downloader.export_sidecars()
+            print(f"✓ Exported {count} sidecars under {downloader.output_dir}")
+        return
+    
     try:
         # Get token from user
         token = get_token_input()
         
         # Initialize and run downloader
-        downloader = SunoDownloader(token=token)
-        downloader.run(max_workers=5)
+        downloader = SunoDownloader(
+            token=token,
+            output_dir=args.output,
+            convert_to_wav=not args.no_wav,
+            verify=args.verify,
+            verify_ttl_days=args.verify_ttl,
+            full_sync=args.full,
+            write_sidecars=args.write_sidecars
+        )
+        if args.repair_manifest:
+            downloader.repair_manifest()
+        downloader.run(max_workers=args.workers, convert_workers=args.convert_workers)
         
     except KeyboardInterrupt:
         print("\n\n⚠ Download interrupted by user")
@@ -1,32 +1,31 @@
 #!/usr/bin/env python3
-import io, sys, sqlite3, subprocess
+import io, sys, sqlite3, argparse, subprocess
 from pathlib import Path
 
+from suno_batch import BatchTask, OutputManifest, run_batch, DONE, FAILED, MANIFEST_FILENAME
+
 if sys.platform == "win32":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
 
 AUDIO_DIR = Path("suno_library/audio")
+WAV_PARAMS = {"codec": "pcm_s16le", "rate": 44100, "channels": 2}
 
-def convert_mp3_to_wav(mp3_path):
-    wav_path = mp3_path.with_suffix(".wav")
-    if wav_path.exists():
-        print("  WAV already exists, skipping: %s" % wav_path.name)
-        return wav_path
+def ffmpeg_to_wav(mp3_path, wav_path, params):
+    """suno_batch worker: runs in a pool process"""
     cmd = [
-        "ffmpeg", "-y", "-i", str(mp3_path), "-acodec", "pcm_s16le", "-ar", "44100",
-        "-ac", "2", str(wav_path)
+        "ffmpeg", "-y", "-i", mp3_path, "-acodec", params["codec"], "-ar", str(params["rate"]),
+        "-ac", str(params["channels"]), wav_path
     ]
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        if result.returncode == 0 and wav_path.exists():
-            return wav_path
-        else:
-            print("  FFmpeg failed for %s: %s" % (mp3_path.name, result.stderr[:200]))
-            return None
+        if result.returncode == 0 and Path(wav_path).exists():
+            return True
+        print("  FFmpeg failed for %s: %s" % (Path(mp3_path).name, result.stderr[:200]))
+        return False
     except Exception as e:
-        print("  Error converting %s: %s" % (mp3_path.name, e))
-        return None
+        print("  Error converting %s: %s" % (Path(mp3_path).name, e))
+        return False
 
 def update_db(conn, song_id, wav_path):
     c = conn.cursor()
@@ -42,41 +41,55 @@ def extract_song_id_from_filename(filename):
     return None
 
 def main():
+    parser = argparse.ArgumentParser(description="Convert library MP3s to WAV (in parallel, skipping current WAVs)")
+    parser.add_argument("--dry-run", action="store_true", help="Only show how many files would be converted")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel ffmpeg processes (default: CPU count)")
+    args = parser.parse_args()
+
     mp3_files = sorted(AUDIO_DIR.glob("*.mp3"))
-    print("Found %d MP3 files to convert" % len(mp3_files))
-    converted = 0
-    failed = 0
-    skipped = 0
+    tasks = [BatchTask(mp3, mp3.with_suffix(".wav"), WAV_PARAMS) for mp3 in mp3_files]
+    manifest = OutputManifest(AUDIO_DIR / MANIFEST_FILENAME)
+    print("Found %d MP3 files" % len(mp3_files))
+
+    if args.dry_run:
+        report = run_batch(tasks, ffmpeg_to_wav, manifest, dry_run=True)
+        print("Dry run: %d to convert (%.1f MB), %d already have a current WAV"
+              % (report["pending"], report["pending_bytes"] / 1024 / 1024, report["up_to_date"]))
+        return
 
     conn = sqlite3.connect("suno_library.db", timeout=30.0)
     c = conn.cursor()
+    counts = {"converted": 0, "failed": 0, "skipped": 0}
+
+    def on_result(task, status):
+        # Runs in this process as each file finishes (or is found up to date)
+        mp3_path, wav_path = task.source, task.output
+        if status == FAILED:
+            counts["failed"] += 1
+            return
+        print("%s %s" % ("Converted" if status == DONE else "WAV up to date:", mp3_path.name))
+        # Find song_id in DB by matching the old MP3 path
+        c.execute("SELECT id FROM songs WHERE local_audio_path LIKE ?", ("%" + mp3_path.name + "%",))
+        row = c.fetchone()
+        if row:
+            update_db(conn, row[0], wav_path)
+            print("  Updated DB for %s" % row[0])
+        # Delete original MP3
+        try:
+            mp3_path.unlink()
+            print("  Deleted original MP3")
+            counts["converted" if status == DONE else "skipped"] += 1
+        except Exception as e:
+            print("  Could not delete MP3: %s" % e)
 
-    for i, mp3_path in enumerate(mp3_files, 1):
-        print("[%d/%d] %s..." % (i, len(mp3_files), mp3_path.name))
-        wav_path = convert_mp3_to_wav(mp3_path)
-        if wav_path:
-            if wav_path.exists() and mp3_path.exists():
-                # Find song_id in DB by matching the old MP3 path
-                c.execute("SELECT id FROM songs WHERE local_audio_path LIKE ?", ("%" + mp3_path.name + "%",))
-                row = c.fetchone()
-                if row:
-                    update_db(conn, row[0], wav_path)
-                    print("  Updated DB for %s" % row[0])
-                # Delete original MP3
-                try:
-                    mp3_path.unlink()
-                    print("  Deleted original MP3")
-                    converted += 1
-                except Exception as e:
-                    print("  Could not delete MP3: %s" % e)
-            else:
-                skipped += 1
-        else:
-            failed += 1
+    report = run_batch(tasks, ffmpeg_to_wav, manifest, max_workers=args.workers, on_result=on_result,
+                       label="Converted")
 
     conn.commit()
     conn.close()
-    print("\nDone: %d converted, %d failed, %d skipped" % (converted, failed, skipped))
+    print("\nDone: %d converted, %d failed, %d skipped (%.1fs, %.2f files/s)"
+          % (counts["converted"], counts["failed"], counts["skipped"],
+             report["seconds"], report["files_per_sec"]))
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,32 @@
 #!/usr/bin/env python3
-"""Extract liked songs with larger page size."""
+"""Extract liked songs with larger page size.
+
+By default only new likes are fetched: paging stops at the first page made
+entirely of already-synced clips (state in suno_songs/.sync_state.json).
+Use --full to walk the whole feed and rebuild the is_liked flags.
+"""
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+import argparse
+import os
 import requests
 import json
 import sqlite3
 import time
 
+from suno_watermark import SyncWatermark
+
+OUTPUT_JSON = 'suno_songs/all_liked_songs.json'
+
+parser = argparse.ArgumentParser(description='Extract liked songs via the Suno API')
+parser.add_argument('--full', action='store_true',
+                    help='Walk the entire liked feed (also clears stale is_liked flags)')
+args = parser.parse_args()
+
+watermark = SyncWatermark('suno_songs/.sync_state.json', feed='liked')
+full = args.full or watermark.is_empty
+print('Mode: ' + ('full' if full else f'incremental ({len(watermark.known_ids)} known clips)'))
+
 options = Options()
 options.add_experimental_option('debuggerAddress', '127.0.0.1:9222')
 driver = webdriver.Chrome(options=options)
@@ -35,8 +55,11 @@ headers = {
 
 conn = sqlite3.connect('suno_library.db')
 c = conn.cursor()
-c.execute('UPDATE songs SET is_liked=0')
-conn.commit()
+if full:
+    # Only a full walk can see unlikes, so only it may reset the flags
+    c.execute('UPDATE songs SET is_liked=0')
+    conn.commit()
+    watermark.reset()
 
 seen_ids = set()
 all_clips = []
@@ -68,6 +91,10 @@ while True:
         if not clips:
             break
         
+        if not full and watermark.page_is_known(clips):
+            print(f'Page {page}: all {len(clips)} clips already synced, stopping')
+            break
+        
         # Check for duplicates
         new_clips = []
         dup_count = 0
@@ -98,6 +125,7 @@ while True:
                     (song_id, title, f'https://suno.com/song/{song_id}')
                 )
         conn.commit()
+        watermark.observe(new_clips)
         
         print(f'Page {page}: +{len(new_clips)} new ({dup_count} dups) = {len(all_clips)} total')
         
@@ -112,12 +140,19 @@ while True:
         print(f'Error: {e}')
         break
 
+watermark.save()
+
 print(f'\nDone! Total unique: {len(all_clips)}')
 c.execute('SELECT COUNT(*) FROM songs WHERE is_liked=1')
 print(f'DB liked: {c.fetchone()[0]}')
 conn.close()
 
-# Save
-with open('suno_songs/all_liked_songs.json', 'w', encoding='utf-8') as f:
+# Save (incremental runs prepend new clips to the previous dump)
+if not full and os.path.exists(OUTPUT_JSON):
+    with open(OUTPUT_JSON, 'r', encoding='utf-8') as f:
+        previous = json.load(f).get('songs', [])
+    all_clips += [clip for clip in previous if clip.get('id') not in seen_ids]
+
+with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
     json.dump({'songs': all_clips}, f, indent=2, ensure_ascii=False)
-print('Saved to suno_songs/all_liked_songs.json')
+print(f'Saved {len(all_clips)} clips to {OUTPUT_JSON}')
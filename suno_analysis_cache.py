@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Suno Analysis Cache - Content-addressed store for audio analysis results
+
+Results are keyed by a BLAKE2 hash of the file's bytes plus the analyzer
+version and parameters, so a renamed or re-downloaded copy of the same audio
+is still a hit while an edited file (or a new analyzer version) is a miss.
+Hashing a file is far cheaper than decoding it, and the hash itself is
+memoised by (path, size, mtime) so unchanged files are not even re-read.
+
+Scalar results are stored as JSON; per-frame and per-band arrays (beat
+frames, chroma and MFCC statistics) go into a compressed .npz blob when numpy
+is available. The least recently used entries are evicted once the store
+grows past its size budget.
+
+Usage:
+    from suno_analysis_cache import AnalysisCache
+
+    cache = AnalysisCache('.audio_cache', max_bytes=128 * 1024 * 1024)
+    result = cache.get(path, params)
+    if result is None:
+        result = analyze(path)
+        cache.put(path, params, result)
+"""
+
+import io
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# Stored in the .npz blob rather than the JSON text
+ARRAY_FIELDS = ('beat_frames', 'chroma_mean', 'mfcc_mean', 'mfcc_std')
+
+# Describe where the file is, not what it contains; re-attached on lookup
+_LOCATION_FIELDS = ('filepath', 'filename')
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def hash_file(filepath: Path) -> str:
+    """BLAKE2b (128-bit) of a file's contents"""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def entry_key(content_hash: str, params: Dict) -> str:
+    """Key for one (file contents, analyzer version/parameters) pair"""
+    spec = json.dumps(params, sort_keys=True)
+    return hashlib.sha1(f"{content_hash}:{spec}".encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """SQLite-backed analysis result cache with a size budget"""
+
+    def __init__(self, cache_dir: str = ".audio_cache", max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Directory holding analysis.db
+            max_bytes: Stored result size above which old entries are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "analysis.db"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize cache schema"""
+        with self._get_connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    content_hash TEXT
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    content_hash TEXT,
+                    result TEXT,
+                    arrays BLOB,
+                    size INTEGER,
+                    created_at REAL,
+                    accessed_at REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed_at)')
+            conn.commit()
+
+    @contextmanager
+    def _get_connection(self):
+        """Get database connection with context manager"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    # ------------------------------------------------------------------
+    # Content hashes
+    # ------------------------------------------------------------------
+
+    def content_hash(self, filepath) -> str:
+        """Hash of a file's contents, re-read only if its size or mtime changed"""
+        filepath = Path(filepath).resolve()
+        stat = filepath.stat()
+        with self._get_connection() as conn:
+            row = conn.execute('SELECT size, mtime_ns, content_hash FROM file_hashes WHERE path = ?',
+                               (str(filepath),)).fetchone()
+            if row and row['size'] == stat.st_size and row['mtime_ns'] == stat.st_mtime_ns:
+                return row['content_hash']
+
+            digest = hash_file(filepath)
+            conn.execute('INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, content_hash) '
+                         'VALUES (?, ?, ?, ?)', (str(filepath), stat.st_size, stat.st_mtime_ns, digest))
+            conn.commit()
+        return digest
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def get(self, filepath, params: Dict) -> Optional[Dict]:
+        """Cached result for this file and analyzer parameters, or None"""
+        filepath = Path(filepath)
+        try:
+            key = entry_key(self.content_hash(filepath), params)
+        except OSError:
+            return None
+
+        with self._get_connection() as conn:
+            row = conn.execute('SELECT result, arrays FROM results WHERE key = ?', (key,)).fetchone()
+            if row:
+                conn.execute('UPDATE results SET accessed_at = ? WHERE key = ?', (time.time(), key))
+                conn.commit()
+
+        # An .npz written by a numpy-enabled process cannot be read without it
+        if not row or (row['arrays'] and not NUMPY_AVAILABLE):
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        result = _unpack(row['result'], row['arrays'])
+        result['filepath'] = str(filepath)
+        result['filename'] = filepath.name
+        return result
+
+    def put(self, filepath, params: Dict, result: Dict) -> bool:
+        """
+        Store a successful result
+
+        Returns:
+            True if stored (failed or partial analyses are not)
+        """
+        if not result.get('analyzed') or result.get('error'):
+            return False
+        try:
+            content_hash = self.content_hash(filepath)
+        except OSError:
+            return False
+
+        text, blob = _pack(result)
+        size = len(text) + len(blob or b'')
+        now = time.time()
+        with self._get_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO results (key, content_hash, result, arrays, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (entry_key(content_hash, params), content_hash, text, blob, size, now, now))
+            conn.commit()
+        self._count('stored')
+
+        if self.max_bytes and self.total_bytes() > self.max_bytes:
+            self.evict()
+        return True
+
+    def total_bytes(self) -> int:
+        """Size of all stored results"""
+        with self._get_connection() as conn:
+            return conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Drop least recently used results until the store fits the budget
+
+        Returns:
+            Number of entries evicted
+        """
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        with self._get_connection() as conn:
+            excess = conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0] - budget
+            if excess <= 0:
+                return 0
+
+            victims = []
+            for row in conn.execute('SELECT key, size FROM results ORDER BY accessed_at'):
+                victims.append((row['key'],))
+                excess -= row['size']
+                if excess <= 0:
+                    break
+            conn.executemany('DELETE FROM results WHERE key = ?', victims)
+            # Hash memos for files whose results are all gone are dead weight
+            conn.execute('DELETE FROM file_hashes WHERE content_hash NOT IN '
+                         '(SELECT content_hash FROM results)')
+            conn.commit()
+
+        self._count('evicted', len(victims))
+        logger.debug(f"Analysis cache: evicted {len(victims)} entries")
+        return len(victims)
+
+    def clear(self) -> None:
+        """Remove every cached result and hash"""
+        with self._get_connection() as conn:
+            conn.execute('DELETE FROM results')
+            conn.execute('DELETE FROM file_hashes')
+            conn.commit()
+
+    def log_summary(self) -> None:
+        """Log cache effectiveness for this process"""
+        with self._lock:
+            stats = dict(self.stats)
+        logger.info(
+            f"Analysis cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['stored']} stored, {stats['evicted']} evicted"
+        )
+
+
+def _pack(result: Dict) -> Tuple[str, Optional[bytes]]:
+    """Split a result into JSON text and (with numpy) an .npz blob of its arrays"""
+    scalars = {k: v for k, v in result.items() if k not in _LOCATION_FIELDS}
+    if not NUMPY_AVAILABLE:
+        return json.dumps(scalars), None
+
+    arrays = {k: scalars.pop(k) for k in ARRAY_FIELDS if scalars.get(k) is not None}
+    if not arrays:
+        return json.dumps(scalars), None
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **{
+        k: np.asarray(v, dtype=np.int32 if k == 'beat_frames' else np.float32)
+        for k, v in arrays.items()
+    })
+    return json.dumps(scalars), buffer.getvalue()
+
+
+def _unpack(text: str, blob: Optional[bytes]) -> Dict:
+    """Inverse of _pack; arrays come back as plain lists"""
+    result = json.loads(text)
+    if blob:
+        with np.load(io.BytesIO(blob)) as arrays:
+            for k in arrays.files:
+                result[k] = arrays[k].tolist()
+    return result
@@ -10,7 +10,7 @@ import time
 import logging
 import hashlib
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Tuple
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -18,8 +18,23 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from suno_ratelimit import get_rate_controller, AdaptiveRateController
+from suno_stream import stream_to_file
+from suno_http_cache import HTTPCache, get_http_cache
+from suno_utils import SingleFlight
+from suno_pagination import ParallelPaginator, DEFAULT_PAGE_SIZES
+
+try:
+    from suno_similarity import SimilarityIndex, NUMPY_AVAILABLE
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Shared by every SunoAPI instance so the downloader, sync and backfill
+# asking for the same song at once cost one lookup
+_song_flights = SingleFlight()
+
 
 class SunoAPI:
     """
@@ -34,27 +49,54 @@ class SunoAPI:
         "https://audiopipe.suno.ai"
     ]
     
-    def __init__(self, cookie: str = None, session_id: str = None):
+    # Candidate endpoints, tried memoised-winner first
+    SONG_ENDPOINTS = [
+        "{base}/api/song/{song_id}",
+        "{base}/api/clip/{song_id}",
+        "https://suno.com/api/song/{song_id}",
+    ]
+    AUDIO_URL_PATTERNS = [
+        "https://cdn1.suno.ai/{song_id}.mp3",
+        "https://cdn2.suno.ai/{song_id}.mp3",
+        "https://audiopipe.suno.ai/item_id/{song_id}",
+        "https://cdn1.suno.ai/{song_id}.m4a",
+    ]
+    
+    # Cache lifetimes (seconds) before a conditional revalidation
+    SONG_TTL = 24 * 3600
+    USER_TTL = 300
+    FEED_TTL = 0  # Always revalidate; unchanged feeds cost a 304
+    
+    def __init__(self, cookie: str = None, session_id: str = None,
+                 rate_controller: AdaptiveRateController = None,
+                 cache: Optional[HTTPCache] = None, use_cache: bool = True):
         """
         Initialize API client
         
         Args:
             cookie: Full cookie string from browser session
             session_id: Suno session ID (alternative to cookie)
+            rate_controller: Shared rate controller (process-wide default if None)
+            cache: Response cache (process-wide default if None)
+            use_cache: Disable to always hit the network
         """
         self.session = self._create_session()
+        self.rate = rate_controller or get_rate_controller()
+        self.cache = (cache or get_http_cache()) if use_cache else None
         self.cookie = cookie
         self.session_id = session_id
         self._auth_token = None
         
     def _create_session(self) -> requests.Session:
-        """Create session with retry logic"""
+        """Create session with connection-level retry logic"""
         session = requests.Session()
         
+        # 429/5xx handling lives in the rate controller so throttling
+        # feeds back into pacing instead of being retried blindly here
         retry_strategy = Retry(
             total=3,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[],
             allowed_methods=["HEAD", "GET", "OPTIONS", "POST"]
         )
         
@@ -73,6 +115,44 @@ class SunoAPI:
         
         return session
     
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request paced by the shared rate controller"""
+        return self.rate.request(self.session, method, url, **kwargs)
+    
+    def _get(self, url: str, params: Optional[Dict] = None,
+             ttl: Optional[float] = None, **kwargs) -> Any:
+        """GET through the response cache (if enabled) and rate controller"""
+        if self.cache is None:
+            return self._request('GET', url, params=params, **kwargs)
+        return self.cache.fetch(self._request, 'GET', url, params=params,
+                                ttl=ttl, scope=self._cache_scope(), **kwargs)
+    
+    def _cache_scope(self) -> str:
+        """Cache namespace for the current credentials"""
+        credentials = self.cookie or self.session_id or ''
+        return hashlib.sha1(credentials.encode('utf-8')).hexdigest()[:12] if credentials else ''
+    
+    def _ordered_candidates(self, kind: str, templates: List[str]) -> List[str]:
+        """Candidate templates with the memoised winner first"""
+        preferred = self.cache.preferred_endpoint(kind) if self.cache else None
+        if preferred in templates:
+            return [preferred] + [t for t in templates if t != preferred]
+        return list(templates)
+    
+    def _remember_candidate(self, kind: str, template: str) -> None:
+        if self.cache and self.cache.preferred_endpoint(kind) != template:
+            self.cache.remember_endpoint(kind, template)
+    
+    def rate_state(self) -> Dict[str, Dict]:
+        """Current per-host rate controller state (for monitoring)"""
+        return self.rate.snapshot()
+    
+    def log_summary(self) -> None:
+        """Log rate controller state and cache hit rate"""
+        self.rate.log_summary()
+        if self.cache:
+            self.cache.log_summary()
+    
     def set_cookie(self, cookie: str):
         """Set authentication cookie"""
         self.cookie = cookie
@@ -88,8 +168,9 @@ class SunoAPI:
     def get_user_info(self) -> Optional[Dict]:
         """Get current user information"""
         try:
-            response = self.session.get(
+            response = self._get(
                 f"{self.BASE_URL}/api/user",
+                ttl=self.USER_TTL,
                 timeout=30
             )
             if response.status_code == 200:
@@ -102,25 +183,64 @@ class SunoAPI:
         """
         Get detailed song information by ID
         
+        Concurrent calls for the same ID (from any SunoAPI instance with the
+        same credentials) share a single network lookup.
+        
         Args:
             song_id: Suno song UUID
             
         Returns:
             Song data dictionary
         """
-        try:
-            # Try multiple API endpoints
-            endpoints = [
-                f"{self.BASE_URL}/api/song/{song_id}",
-                f"{self.BASE_URL}/api/clip/{song_id}",
-                f"https://suno.com/api/song/{song_id}",
-            ]
+        return _song_flights.do((self._cache_scope(), song_id),
+                                lambda: self._fetch_song_by_id(song_id))
+    
+    def get_songs_by_ids(self, song_ids: Iterable[str],
+                         max_workers: int = 8) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        Fetch details for many songs concurrently
+        
+        Results are yielded as each lookup completes (not in input order);
+        duplicate IDs are fetched once. Overall pacing still comes from the
+        shared rate controller, so max_workers only bounds how many lookups
+        may be queued on it at once.
+        
+        Args:
+            song_ids: Song UUIDs
+            max_workers: Concurrent lookups
             
-            for endpoint in endpoints:
+        Yields:
+            (song_id, song data or None if not found)
+        """
+        unique_ids = list(dict.fromkeys(i for i in song_ids if i))
+        if not unique_ids:
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(unique_ids)))
+        try:
+            futures = {executor.submit(self.get_song_by_id, i): i for i in unique_ids}
+            for future in as_completed(futures):
+                song_id = futures[future]
+                try:
+                    yield song_id, future.result()
+                except Exception as e:
+                    logger.error(f"Failed to get song {song_id}: {e}")
+                    yield song_id, None
+        finally:
+            # Consumer stopped early: drop lookups that have not started
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _fetch_song_by_id(self, song_id: str) -> Optional[Dict]:
+        """Uncoalesced lookup behind get_song_by_id"""
+        try:
+            # Try multiple API endpoints, last known-good one first
+            for template in self._ordered_candidates('song', self.SONG_ENDPOINTS):
+                endpoint = template.format(base=self.BASE_URL, song_id=song_id)
                 try:
-                    response = self.session.get(endpoint, timeout=30)
+                    response = self._get(endpoint, ttl=self.SONG_TTL, timeout=30)
                     if response.status_code == 200:
                         data = response.json()
+                        self._remember_candidate('song', template)
                         return self._normalize_song_data(data)
                 except Exception:
                     continue
@@ -130,21 +250,18 @@ class SunoAPI:
         
         return None
     
-    def get_liked_songs(self, page: int = 0, limit: int = 50) -> List[Dict]:
+    def _fetch_feed_page(self, feed: str, page: int, limit: int) -> Optional[List[Dict]]:
         """
-        Get user's liked songs
+        One page of a feed endpoint
         
-        Args:
-            page: Page number
-            limit: Songs per page
-            
         Returns:
-            List of song dictionaries
+            Normalized songs, or None if the request failed or was rejected
         """
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}/api/feed/liked",
+            response = self._get(
+                f"{self.BASE_URL}/api/feed/{feed}",
                 params={'page': page, 'limit': limit},
+                ttl=self.FEED_TTL,
                 timeout=30
             )
             
@@ -152,50 +269,102 @@ class SunoAPI:
                 data = response.json()
                 songs = data.get('clips', data.get('songs', []))
                 return [self._normalize_song_data(s) for s in songs]
+            logger.debug(f"Feed {feed} page {page} (limit {limit}): HTTP {response.status_code}")
                 
         except Exception as e:
-            logger.error(f"Failed to get liked songs: {e}")
+            logger.error(f"Failed to get {feed} feed: {e}")
         
-        return []
+        return None
+    
+    def get_liked_songs(self, page: int = 0, limit: int = 50) -> List[Dict]:
+        """
+        Get user's liked songs
+        
+        Args:
+            page: Page number
+            limit: Songs per page
+            
+        Returns:
+            List of song dictionaries
+        """
+        return self._fetch_feed_page('liked', page, limit) or []
     
     def get_user_creations(self, page: int = 0, limit: int = 50) -> List[Dict]:
         """Get user's created songs"""
-        try:
-            response = self.session.get(
-                f"{self.BASE_URL}/api/feed/my_creations",
-                params={'page': page, 'limit': limit},
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                songs = data.get('clips', data.get('songs', []))
-                return [self._normalize_song_data(s) for s in songs]
-                
-        except Exception as e:
-            logger.error(f"Failed to get creations: {e}")
+        return self._fetch_feed_page('my_creations', page, limit) or []
+    
+    def iter_feed_pages(self, feed: str, max_pages: int = 100, window: int = 4,
+                        known_ids: Optional[set] = None) -> Iterator[List[Dict]]:
+        """
+        Walk a feed with several pages in flight at once
+        
+        Pages are yielded in order with songs already seen on earlier pages
+        removed. The page size is tuned to the largest limit the endpoint
+        accepts and remembered in the response cache.
         
-        return []
+        Args:
+            feed: Feed path under /api/feed/ ('liked', 'my_creations')
+            max_pages: Safety limit on pages fetched
+            window: Concurrent page requests
+            known_ids: Already-synced song IDs; paging stops at the first
+                page made entirely of known songs (incremental sync)
+        """
+        memo_kind = f"page_size:{feed}"
+        remembered = self.cache.preferred_endpoint(memo_kind) if self.cache else None
+        
+        stop_when = None
+        if known_ids is not None:
+            stop_when = lambda songs: all(s.get('id') in known_ids for s in songs)
+        
+        paginator = ParallelPaginator(
+            lambda page, limit: self._fetch_feed_page(feed, page, limit),
+            page_size=int(remembered) if remembered else None,
+            window=window,
+            max_pages=max_pages,
+            page_sizes=DEFAULT_PAGE_SIZES,
+            stop_when=stop_when
+        )
+        
+        total = 0
+        for page_number, songs in enumerate(paginator.pages(), 1):
+            total += len(songs)
+            logger.info(f"Fetched {feed} page {page_number}, total: {total} songs")
+            yield songs
+        
+        # Only a walk past its first non-empty page shows the size works
+        # for a longer feed; a walk that ended on page 0 proves nothing
+        if self.cache and not remembered and paginator.stats['used'] > 1:
+            self.cache.remember_endpoint(memo_kind, str(paginator.page_size))
+        logger.debug(f"{feed} pagination: {paginator.stats}")
+    
+    def get_all_liked_songs(self, max_pages: int = 100,
+                            known_ids: Optional[set] = None,
+                            window: int = 4) -> List[Dict]:
+        """
+        Get all liked songs with pagination
+        
+        Args:
+            max_pages: Safety limit on pages fetched
+            known_ids: Already-synced song IDs; paging stops at the first
+                page made entirely of known songs (incremental sync)
+            window: Concurrent page requests
+        
+        Returns:
+            Songs from every page fetched (may include known songs from
+            the last partially-new page)
+        """
+        all_songs = []
+        for songs in self.iter_feed_pages('liked', max_pages, window, known_ids):
+            all_songs.extend(songs)
+        return all_songs
     
-    def get_all_liked_songs(self, max_pages: int = 100) -> List[Dict]:
-        """Get all liked songs with pagination"""
+    def get_all_user_creations(self, max_pages: int = 100,
+                               known_ids: Optional[set] = None,
+                               window: int = 4) -> List[Dict]:
+        """Get all of the user's creations with pagination (see get_all_liked_songs)"""
         all_songs = []
-        page = 0
-        
-        while page < max_pages:
-            songs = self.get_liked_songs(page=page, limit=50)
-            if not songs:
-                break
-            
+        for songs in self.iter_feed_pages('my_creations', max_pages, window, known_ids):
             all_songs.extend(songs)
-            logger.info(f"Fetched page {page + 1}, total: {len(all_songs)} songs")
-            
-            if len(songs) < 50:  # Last page
-                break
-            
-            page += 1
-            time.sleep(0.5)  # Rate limiting
-        
         return all_songs
     
     def _normalize_song_data(self, data: Dict) -> Dict:
@@ -277,18 +446,13 @@ class SunoAPI:
         Returns:
             Audio URL or None
         """
-        # Try CDN patterns
-        cdn_patterns = [
-            f"https://cdn1.suno.ai/{song_id}.mp3",
-            f"https://cdn2.suno.ai/{song_id}.mp3",
-            f"https://audiopipe.suno.ai/item_id/{song_id}",
-            f"https://cdn1.suno.ai/{song_id}.m4a",
-        ]
-        
-        for url in cdn_patterns:
+        # Try CDN patterns, last known-good one first
+        for template in self._ordered_candidates('audio_url', self.AUDIO_URL_PATTERNS):
+            url = template.format(song_id=song_id)
             try:
-                response = self.session.head(url, timeout=10, allow_redirects=True)
+                response = self._request('HEAD', url, timeout=10, allow_redirects=True)
                 if response.status_code == 200:
+                    self._remember_candidate('audio_url', template)
                     return url
             except Exception:
                 continue
@@ -320,27 +484,24 @@ class SunoAPI:
         
         for attempt in range(retry_count):
             try:
-                response = self.session.get(
-                    audio_url,
-                    stream=True,
-                    timeout=60
-                )
-                response.raise_for_status()
-                
-                output_path = Path(output_path)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                with open(output_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                # Hold the slot for the whole transfer; a 429 here blocks
+                # the CDN host for every other downloader until Retry-After
+                with self.rate.slot(audio_url) as slot:
+                    response = self.session.get(
+                        audio_url,
+                        stream=True,
+                        timeout=60
+                    )
+                    slot.record(response)
+                    response.raise_for_status()
+                    
+                    stream_to_file(response, output_path, hash_name=None)
                 
                 logger.info(f"Downloaded: {output_path}")
                 return True
                 
             except Exception as e:
                 logger.warning(f"Attempt {attempt + 1} failed: {e}")
-                if attempt < retry_count - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
         
         return False
     
@@ -380,6 +541,7 @@ class SunoAPI:
         
         successful = sum(1 for v in results.values() if v)
         logger.info(f"Downloaded {successful}/{len(songs)} songs")
+        self.log_summary()
         
         return results
 
@@ -388,61 +550,85 @@ class SunoSync:
     """
     Real-time sync watcher for Suno library
     Monitors for new songs and auto-extracts
+    
+    Each poll walks a feed only until it reaches a page of already-known
+    songs, so bursts larger than one page are picked up while a quiet feed
+    costs a single (usually 304) request. The interval shrinks after
+    activity and backs off exponentially while nothing changes.
     """
     
-    def __init__(self, api: SunoAPI, db=None, check_interval: int = 300):
+    FEEDS = ('liked', 'my_creations')
+    
+    def __init__(self, api: SunoAPI, db=None, check_interval: int = 300,
+                 min_interval: int = 60, max_interval: int = 3600,
+                 backoff: float = 2.0, max_pages: int = 20):
         """
         Initialize sync watcher
         
         Args:
             api: SunoAPI instance
             db: Database instance
-            check_interval: Seconds between checks
+            check_interval: Seconds before the first re-check
+            min_interval: Interval right after new songs were found
+            max_interval: Ceiling for the idle back-off
+            backoff: Interval multiplier after each idle check
+            max_pages: Safety limit on pages walked per feed per check
         """
         self.api = api
         self.db = db
         self.check_interval = check_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_pages = max_pages
+        self.current_interval = check_interval
         self._running = False
         self._known_ids = set()
     
     def load_known_ids(self):
         """Load existing song IDs from database"""
         if self.db:
-            songs = self.db.get_all_songs()
-            self._known_ids = {s.get('id') for s in songs if s.get('id')}
+            if hasattr(self.db, 'get_song_ids'):
+                self._known_ids = set(self.db.get_song_ids())
+            else:
+                songs = self.db.get_all_songs()
+                self._known_ids = {s.get('id') for s in songs if s.get('id')}
         logger.info(f"Loaded {len(self._known_ids)} known song IDs")
     
     def check_for_new_songs(self) -> List[Dict]:
-        """Check for new songs since last sync"""
+        """Check each feed for songs newer than the known-ID watermark"""
         new_songs = []
         
-        # Check liked songs
-        liked = self.api.get_liked_songs(page=0, limit=20)
-        for song in liked:
-            if song.get('id') not in self._known_ids:
-                new_songs.append(song)
-                self._known_ids.add(song.get('id'))
-        
-        # Check creations
-        creations = self.api.get_user_creations(page=0, limit=20)
-        for song in creations:
-            if song.get('id') not in self._known_ids:
-                new_songs.append(song)
-                self._known_ids.add(song.get('id'))
+        for feed in self.FEEDS:
+            # One page at a time: polls are expected to end on page 0
+            for page in self.api.iter_feed_pages(feed, max_pages=self.max_pages,
+                                                 window=1, known_ids=self._known_ids):
+                for song in page:
+                    if song.get('id') and song['id'] not in self._known_ids:
+                        new_songs.append(song)
+                        self._known_ids.add(song['id'])
         
         return new_songs
     
     def sync_once(self) -> List[Dict]:
-        """Run single sync check"""
+        """Run single sync check and adapt the poll interval"""
         new_songs = self.check_for_new_songs()
         
         if new_songs:
             logger.info(f"Found {len(new_songs)} new songs")
             
-            # Add to database
+            # Add to database in one transaction
             if self.db:
-                for song in new_songs:
-                    self.db.add_song(song)
+                if hasattr(self.db, 'add_songs'):
+                    self.db.add_songs(new_songs)
+                else:
+                    for song in new_songs:
+                        self.db.add_song(song)
+            
+            self.current_interval = self.min_interval
+        else:
+            self.current_interval = min(self.max_interval,
+                                        max(self.min_interval, self.current_interval * self.backoff))
         
         return new_songs
     
@@ -456,7 +642,7 @@ class SunoSync:
         self._running = True
         self.load_known_ids()
         
-        logger.info(f"Starting sync watcher (interval: {self.check_interval}s)")
+        logger.info(f"Starting sync watcher (interval: {self.min_interval}-{self.max_interval}s)")
         
         while self._running:
             try:
@@ -465,7 +651,8 @@ class SunoSync:
                 if new_songs and callback:
                     callback(new_songs)
                 
-                time.sleep(self.check_interval)
+                logger.debug(f"Next check in {self.current_interval:.0f}s")
+                time.sleep(self.current_interval)
                 
             except KeyboardInterrupt:
                 break
@@ -483,8 +670,35 @@ class SunoSync:
 class SmartPlaylistGenerator:
     """Generate smart playlists based on audio features"""
     
-    def __init__(self, db=None):
+    # Mood rules; a song matches if any rule holds. Tag keywords match
+    # case-insensitively anywhere in a tag.
+    MOODS = {
+        'energetic': {'bpm_above': 120, 'tags': ['energetic', 'upbeat', 'dance', 'electronic']},
+        'chill': {'bpm_below': 100, 'tags': ['chill', 'ambient', 'relaxing', 'lofi']},
+        'melancholic': {'tags': ['sad', 'melancholic', 'emotional', 'ballad'], 'mode': 'minor'},
+        'happy': {'tags': ['happy', 'uplifting', 'joyful', 'fun'], 'mode': 'major'},
+        'aggressive': {'bpm_above': 140, 'tags': ['metal', 'rock', 'aggressive', 'heavy']},
+    }
+    
+    def __init__(self, db=None, moods: Optional[Dict[str, Dict]] = None):
+        """
+        Args:
+            db: SunoDatabase instance
+            moods: Extra or overriding mood definitions (see MOODS)
+        """
         self.db = db
+        self.moods = {**self.MOODS, **(moods or {})}
+        self._index = None
+    
+    @property
+    def index(self) -> Optional['SimilarityIndex']:
+        """Feature-vector index over the same database (None without numpy)"""
+        if self._index is None and NUMPY_AVAILABLE and getattr(self.db, 'db_path', None):
+            self._index = SimilarityIndex(str(self.db.db_path))
+            stale = self._index.stale_song_ids()
+            if stale:
+                self._index.rebuild(stale)
+        return self._index
     
     def by_bpm_range(self, min_bpm: float, max_bpm: float,
                      name: str = None) -> List[Dict]:
@@ -492,102 +706,133 @@ class SmartPlaylistGenerator:
         if not self.db:
             return []
         
-        songs = self.db.get_all_songs()
-        filtered = [
-            s for s in songs
-            if s.get('bpm') and min_bpm <= s['bpm'] <= max_bpm
-        ]
+        return self.db.query_songs('s.bpm BETWEEN ? AND ?', (min_bpm, max_bpm), order_by='s.bpm')
+    
+    def _key_condition(self, predicate) -> Tuple[str, Tuple]:
+        """
+        SQL condition selecting songs whose key satisfies predicate
         
-        return sorted(filtered, key=lambda x: x.get('bpm', 0))
+        There are only a couple of dozen distinct keys, so matching them in
+        Python and querying with IN keeps the lookup on the key index.
+        """
+        keys = [k for k in self.db.get_musical_keys() if predicate(k.lower())]
+        if not keys:
+            return '0', ()
+        return f"s.musical_key IN ({','.join('?' * len(keys))})", tuple(keys)
     
     def by_key(self, musical_key: str) -> List[Dict]:
         """Get songs in a specific key"""
         if not self.db:
             return []
         
-        songs = self.db.get_all_songs()
         key_lower = musical_key.lower()
+        where, params = self._key_condition(lambda k: key_lower in k)
+        return self.db.query_songs(where, params)
+    
+    def mood_query(self, mood: str) -> Tuple[str, Tuple]:
+        """
+        Compile a mood definition to a SQL condition
         
-        return [
-            s for s in songs
-            if s.get('musical_key') and key_lower in s['musical_key'].lower()
-        ]
+        A song matches if any rule of the mood holds: BPM above/below a
+        threshold, a tag containing one of the keywords, or the key's mode.
+        """
+        definition = self.moods.get(mood.lower())
+        if definition is None:
+            return '', ()
+        
+        clauses, params = [], []
+        if 'bpm_above' in definition:
+            clauses.append('s.bpm > ?')
+            params.append(definition['bpm_above'])
+        if 'bpm_below' in definition:
+            clauses.append('(s.bpm > 0 AND s.bpm < ?)')
+            params.append(definition['bpm_below'])
+        if definition.get('tags'):
+            likes = ' OR '.join('tag LIKE ?' for _ in definition['tags'])
+            clauses.append(f's.id IN (SELECT song_id FROM tags WHERE {likes})')
+            params.extend(f"%{t}%" for t in definition['tags'])
+        if definition.get('mode'):
+            mode = definition['mode'].lower()
+            where, key_params = self._key_condition(lambda k: k.endswith(mode))
+            clauses.append(where)
+            params.extend(key_params)
+        
+        return ' OR '.join(f'({c})' for c in clauses) or '0', tuple(params)
     
     def by_mood(self, mood: str) -> List[Dict]:
         """
-        Get songs by mood (based on tags and BPM)
+        Get songs by mood (based on tags, BPM and key)
         
-        Moods: energetic, chill, melancholic, happy, aggressive
+        Moods are defined in MOODS: energetic, chill, melancholic, happy,
+        aggressive. Unknown moods return every song.
         """
         if not self.db:
             return []
         
-        songs = self.db.get_all_songs()
-        
-        mood_filters = {
-            'energetic': lambda s: s.get('bpm', 0) > 120 or any(
-                t in str(s.get('tags', [])).lower() 
-                for t in ['energetic', 'upbeat', 'dance', 'electronic']
-            ),
-            'chill': lambda s: s.get('bpm', 0) < 100 or any(
-                t in str(s.get('tags', [])).lower()
-                for t in ['chill', 'ambient', 'relaxing', 'lofi']
-            ),
-            'melancholic': lambda s: any(
-                t in str(s.get('tags', [])).lower()
-                for t in ['sad', 'melancholic', 'emotional', 'ballad']
-            ) or (s.get('musical_key', '').lower().endswith('minor')),
-            'happy': lambda s: any(
-                t in str(s.get('tags', [])).lower()
-                for t in ['happy', 'uplifting', 'joyful', 'fun']
-            ) or (s.get('musical_key', '').lower().endswith('major')),
-            'aggressive': lambda s: s.get('bpm', 0) > 140 or any(
-                t in str(s.get('tags', [])).lower()
-                for t in ['metal', 'rock', 'aggressive', 'heavy']
-            ),
-        }
-        
-        filter_func = mood_filters.get(mood.lower(), lambda s: True)
-        return [s for s in songs if filter_func(s)]
+        where, params = self.mood_query(mood)
+        return self.db.query_songs(where, params)
     
     def workout_playlist(self, duration_minutes: int = 60) -> List[Dict]:
         """Generate workout playlist with high BPM songs"""
-        energetic = self.by_bpm_range(120, 200)
+        if not self.db:
+            return []
         
-        # Sort by BPM to build intensity
         playlist = []
+        chosen = set()
         total_duration = 0
         target_seconds = duration_minutes * 60
+        # Upper bound on songs the main block could need (30s minimum each)
+        main_limit = target_seconds // 30 + 1
+        
+        def add(song):
+            nonlocal total_duration
+            playlist.append(song)
+            chosen.add(song['id'])
+            total_duration += song.get('duration_seconds') or 180
         
         # Warmup: lower BPM
-        warmup = [s for s in energetic if 120 <= s.get('bpm', 0) <= 130]
-        for s in warmup[:3]:
+        warmup = self.db.query_songs('s.bpm BETWEEN 120 AND 130', order_by='s.bpm', limit=3)
+        for s in warmup:
             if total_duration < target_seconds * 0.1:
-                playlist.append(s)
-                total_duration += s.get('duration_seconds', 180)
+                add(s)
         
         # Main: high BPM
-        main = sorted(energetic, key=lambda x: x.get('bpm', 0), reverse=True)
+        main = self.db.query_songs('s.bpm BETWEEN 120 AND 200', order_by='s.bpm DESC',
+                                   limit=main_limit + len(chosen))
         for s in main:
-            if total_duration < target_seconds * 0.85:
-                if s not in playlist:
-                    playlist.append(s)
-                    total_duration += s.get('duration_seconds', 180)
+            if total_duration >= target_seconds * 0.85:
+                break
+            if s['id'] not in chosen:
+                add(s)
         
         # Cooldown: lower BPM
-        cooldown = self.by_bpm_range(80, 110)
-        for s in cooldown[:3]:
+        cooldown = self.db.query_songs('s.bpm BETWEEN 80 AND 110', order_by='s.bpm', limit=3)
+        for s in cooldown:
             if total_duration < target_seconds:
-                playlist.append(s)
-                total_duration += s.get('duration_seconds', 180)
+                add(s)
         
         return playlist
     
     def similar_songs(self, song_id: str, limit: int = 10) -> List[Dict]:
-        """Find songs similar to a given song"""
+        """
+        Find songs similar to a given song
+        
+        Uses the feature-vector index (tempo, key, tags, MFCC/chroma) when
+        numpy is available, otherwise scores metadata song by song.
+        """
         if not self.db:
             return []
         
+        if self.index is not None:
+            songs = []
+            for similar_id, score in self.index.top_k(song_id, k=limit):
+                song = self.db.get_song(similar_id)
+                if song:
+                    song['similarity'] = round(score, 4)
+                    songs.append(song)
+            if songs:
+                return songs
+        
         target = self.db.get_song(song_id)
         if not target:
             return []
@@ -640,14 +885,15 @@ def main():
     logging.basicConfig(level=logging.INFO)
     
     parser = argparse.ArgumentParser(description="Suno API Tools")
-    parser.add_argument('command', choices=['test', 'liked', 'creations', 'sync', 'download'])
+    parser.add_argument('command', choices=['test', 'liked', 'creations', 'sync', 'download', 'details', 'rate'])
     parser.add_argument('--cookie', help='Browser cookie string')
-    parser.add_argument('--song-id', help='Song ID for specific operations')
+    parser.add_argument('--song-id', help='Song ID for specific operations (comma-separated for details)')
     parser.add_argument('--output', default='suno_downloads', help='Output directory')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the HTTP response cache')
     
     args = parser.parse_args()
     
-    api = SunoAPI()
+    api = SunoAPI(use_cache=not args.no_cache)
     
     if args.cookie:
         api.set_cookie(args.cookie)
@@ -676,9 +922,19 @@ def main():
         success = api.download_audio(args.song_id, f"{args.output}/{args.song_id}.mp3")
         print(f"Download {'successful' if success else 'failed'}")
     
+    elif args.command == 'details' and args.song_id:
+        for song_id, song in api.get_songs_by_ids(args.song_id.split(',')):
+            print(f"  - {song_id}: {song.get('title') if song else 'not found'}")
+    
     elif args.command == 'sync':
         sync = SunoSync(api)
         sync.sync_once()
+    
+    elif args.command == 'rate':
+        api.get_user_info()
+        print(json.dumps(api.rate_state(), indent=2))
+    
+    api.log_summary()
 
 
 if __name__ == "__main__":
@@ -62,6 +62,7 @@ def dump_liked(browser: str = "chrome", port: int = 9222, output_dir: str = "sun
     logger.info("Fetching ALL liked songs via API...")
     songs = api.get_all_liked_songs(max_pages=200)
     logger.info("API returned %d liked songs", len(songs))
+    api.log_summary()
 
     wrapped = []
     for idx, s in enumerate(songs, 1):
@@ -7,13 +7,30 @@ Advanced audio features: BPM detection, key detection, waveform, normalization
 import os
 import json
 import logging
+import threading
+import multiprocessing
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import hashlib
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor, as_completed,
+                                wait, FIRST_COMPLETED)
+import contextlib
+
+from suno_analysis_cache import AnalysisCache, DEFAULT_MAX_BYTES as DEFAULT_CACHE_BYTES
+from suno_peaks import build_levels, write_peaks
+from suno_keys import describe_key, detect_key, key_scores
+from suno_loudness import file_signature, measure_file
+from suno_batch import BatchTask, OutputManifest, run_batch, MANIFEST_FILENAME as BATCH_MANIFEST
+from suno_dedup import FileHashCache, find_duplicate_files, find_similar_titles
+from suno_fingerprint import (FingerprintIndex, fingerprint_file, file_signature as fingerprint_signature,
+                              MIN_SCORE as FINGERPRINT_MIN_SCORE)
 
 logger = logging.getLogger(__name__)
 
+# Native thread pools that oversubscribe cores when analysis runs in parallel
+_NATIVE_THREAD_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                       'NUMEXPR_NUM_THREADS', 'NUMBA_NUM_THREADS')
+
 # Audio analysis with librosa
 try:
     import librosa
@@ -50,38 +67,109 @@ except ImportError:
     MATPLOTLIB_AVAILABLE = False
 
 
+# Shared analysis front end: every feature is computed from one decode at
+# this rate and one STFT with these parameters (librosa's defaults)
+ANALYSIS_SR = 22050
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+FINGERPRINT_SECONDS = 30
+
+# Key detection: chroma from a further-downsampled copy, scored against
+# all 24 rotated profiles (see suno_keys)
+KEY_SR = 11025
+KEY_PROFILE = 'temperley'
+
+# Files larger than this are analyzed block by block (see analyze_stream)
+STREAM_THRESHOLD_BYTES = 32 * 1024 * 1024
+STREAM_BLOCK_FRAMES = 256
+STREAM_FEATURES = ('bpm', 'key', 'energy', 'timbre')
+
+# Excerpt mode: analyze a few windows instead of the whole track
+ANALYSIS_MODES = ('full', 'excerpt')
+EXCERPT_SECONDS = 20.0
+EXCERPT_PROBES = 8          # short loudness probes to locate the chorus
+EXCERPT_PROBE_SECONDS = 2.0
+TEMPO_TOLERANCE = 0.04      # relative BPM difference still counted as agreement
+
+FEATURES = ('bpm', 'key', 'energy', 'timbre', 'peaks', 'peak_levels', 'spectrogram',
+            'fingerprint')
+
+
+def waveform_peaks(y, n_buckets: int):
+    """(min, max) sample value per bucket, as an N x 2 float32 array"""
+    n_buckets = max(1, min(n_buckets, len(y)))
+    if len(y) == 0:
+        return np.zeros((0, 2), dtype=np.float32)
+    starts = np.linspace(0, len(y), n_buckets + 1).astype(np.int64)[:-1]
+    return np.stack([np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)],
+                    axis=1).astype(np.float32)
+
+
 class AudioAnalyzer:
     """Analyze audio files for BPM, key, and other features"""
     
-    # Key mappings (Camelot wheel)
-    KEY_NAMES = {
-        0: 'C', 1: 'C#/Db', 2: 'D', 3: 'D#/Eb', 4: 'E', 5: 'F',
-        6: 'F#/Gb', 7: 'G', 8: 'G#/Ab', 9: 'A', 10: 'A#/Bb', 11: 'B'
-    }
-    
-    CAMELOT_WHEEL = {
-        ('C', 'major'): '8B', ('A', 'minor'): '8A',
-        ('G', 'major'): '9B', ('E', 'minor'): '9A',
-        ('D', 'major'): '10B', ('B', 'minor'): '10A',
-        ('A', 'major'): '11B', ('F#', 'minor'): '11A',
-        ('E', 'major'): '12B', ('C#', 'minor'): '12A',
-        ('B', 'major'): '1B', ('G#', 'minor'): '1A',
-        ('F#', 'major'): '2B', ('D#', 'minor'): '2A',
-        ('Db', 'major'): '3B', ('Bb', 'minor'): '3A',
-        ('Ab', 'major'): '4B', ('F', 'minor'): '4A',
-        ('Eb', 'major'): '5B', ('C', 'minor'): '5A',
-        ('Bb', 'major'): '6B', ('G', 'minor'): '6A',
-        ('F', 'major'): '7B', ('D', 'minor'): '7A',
-    }
-    
-    def __init__(self, cache_dir: str = ".audio_cache"):
+    # Bump whenever analysis output changes so cached results are recomputed
+    ANALYZER_VERSION = 4
+    
+    def __init__(self, cache_dir: str = ".audio_cache", use_cache: bool = True,
+                 cache_max_bytes: int = DEFAULT_CACHE_BYTES,
+                 stream_threshold_bytes: Optional[int] = STREAM_THRESHOLD_BYTES,
+                 analysis_mode: str = 'full'):
+        """
+        Args:
+            cache_dir: Directory for the analysis cache
+            use_cache: Reuse results for files whose contents were analyzed before
+            cache_max_bytes: Size budget for cached results
+            stream_threshold_bytes: Analyze larger files in bounded memory
+                (None = never stream)
+            analysis_mode: 'full' or 'excerpt' (a few windows per track; see
+                analyze_excerpts)
+        """
+        if analysis_mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode: {analysis_mode}")
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self.use_cache = use_cache
+        self.cache_max_bytes = cache_max_bytes
+        self.stream_threshold_bytes = stream_threshold_bytes
+        self.analysis_mode = analysis_mode
+        self.cache = AnalysisCache(self.cache_dir, max_bytes=cache_max_bytes) if use_cache else None
+    
+    def _cache_params(self, detect_bpm: bool = True, detect_key: bool = True,
+                      calculate_energy: bool = True, extract_timbre: bool = True,
+                      streaming: bool = False) -> Dict:
+        """Everything besides the file contents that determines a result"""
+        return {'version': self.ANALYZER_VERSION, 'bpm': detect_bpm, 'key': detect_key,
+                'energy': calculate_energy, 'timbre': extract_timbre, 'stream': streaming,
+                'mode': self.analysis_mode}
+    
+    def _worker_kwargs(self) -> Dict:
+        """Constructor arguments that recreate this analyzer in a worker process"""
+        return {'cache_dir': str(self.cache_dir), 'use_cache': self.use_cache,
+                'cache_max_bytes': self.cache_max_bytes,
+                'stream_threshold_bytes': self.stream_threshold_bytes,
+                'analysis_mode': self.analysis_mode}
+    
+    def _should_stream(self, filepath: Path) -> bool:
+        """Whether a file is big enough to analyze block by block"""
+        if self.stream_threshold_bytes is None:
+            return False
+        try:
+            return filepath.stat().st_size > self.stream_threshold_bytes
+        except OSError:
+            return False
+    
+    def _uses_streaming(self, filepath: Path) -> bool:
+        """Default for analyze_file(streaming=None); excerpts are short loads already"""
+        return self.analysis_mode == 'full' and self._should_stream(filepath)
     
     def analyze_file(self, filepath: str, 
                      detect_bpm: bool = True,
                      detect_key: bool = True,
-                     calculate_energy: bool = True) -> Dict:
+                     calculate_energy: bool = True,
+                     extract_timbre: bool = True,
+                     streaming: Optional[bool] = None) -> Dict:
         """
         Analyze an audio file for various features
         
@@ -90,19 +178,32 @@ class AudioAnalyzer:
             detect_bpm: Whether to detect tempo/BPM
             detect_key: Whether to detect musical key
             calculate_energy: Whether to calculate energy levels
+            extract_timbre: Whether to summarise MFCCs (for similarity search)
+            streaming: Analyze block by block in bounded memory (None =
+                only for files over stream_threshold_bytes)
             
         Returns:
             Dict with analysis results
         """
-        if not LIBROSA_AVAILABLE:
-            logger.warning("librosa not available")
-            return {}
-        
         filepath = Path(filepath)
         if not filepath.exists():
             logger.error(f"File not found: {filepath}")
             return {}
         
+        if streaming is None:
+            streaming = self._uses_streaming(filepath)
+        params = self._cache_params(detect_bpm, detect_key, calculate_energy, extract_timbre,
+                                    streaming)
+        if self.cache is not None:
+            cached = self.cache.get(filepath, params)
+            if cached is not None:
+                logger.debug(f"Cached analysis: {filepath.name}")
+                return cached
+        
+        if not LIBROSA_AVAILABLE:
+            logger.warning("librosa not available")
+            return {}
+        
         results = {
             'filepath': str(filepath),
             'filename': filepath.name,
@@ -110,92 +211,362 @@ class AudioAnalyzer:
         }
         
         try:
-            # Load audio file
             logger.info(f"Analyzing: {filepath.name}")
-            y, sr = librosa.load(str(filepath), sr=None, mono=True)
-            
-            results['duration'] = librosa.get_duration(y=y, sr=sr)
-            results['sample_rate'] = sr
+            wanted = [name for name, enabled in (('bpm', detect_bpm), ('key', detect_key),
+                                                 ('energy', calculate_energy),
+                                                 ('timbre', extract_timbre)) if enabled]
+            if self.analysis_mode == 'excerpt':
+                results.update(self.analyze_excerpts(filepath, wanted))
+            elif streaming:
+                results.update(self._analyze_stream_or_load(filepath, wanted))
+            else:
+                results.update(self.extract_features(filepath, wanted))
             results['analyzed'] = True
             
-            # BPM Detection
-            if detect_bpm:
-                tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
-                # Handle both scalar and array returns
-                if hasattr(tempo, '__len__'):
-                    tempo = float(tempo[0]) if len(tempo) > 0 else 0.0
-                results['bpm'] = round(float(tempo), 1)
-                results['beat_frames'] = beats.tolist() if hasattr(beats, 'tolist') else []
-                logger.debug(f"BPM: {results['bpm']}")
-            
-            # Key Detection
-            if detect_key:
-                key_info = self._detect_key(y, sr)
-                results.update(key_info)
-                logger.debug(f"Key: {results.get('key', 'Unknown')}")
-            
-            # Energy Analysis
-            if calculate_energy:
-                energy_info = self._calculate_energy(y, sr)
-                results.update(energy_info)
-            
             logger.info(f"✓ Analyzed: {filepath.name} - BPM: {results.get('bpm')}, Key: {results.get('key')}")
             
         except Exception as e:
             logger.error(f"Analysis failed for {filepath}: {e}")
             results['error'] = str(e)
         
+        if self.cache is not None:
+            self.cache.put(filepath, params, results)
+        
         return results
     
-    def _detect_key(self, y, sr) -> Dict:
-        """Detect musical key using chroma features"""
-        try:
-            # Compute chromagram
-            chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
-            
-            # Average chroma across time
-            chroma_avg = chroma.mean(axis=1)
+    def extract_features(self, filepath: str, features=FEATURES,
+                         duration: Optional[float] = None,
+                         peaks_width: int = 800,
+                         offset: float = 0.0) -> Dict:
+        """
+        Decode a file once and compute the requested features from it
+        
+        The audio is decoded and resampled to ANALYSIS_SR a single time. One
+        magnitude STFT, and the mel spectrogram derived from it, then feed
+        the onset envelope (BPM), energy metrics, MFCCs (timbre and
+        fingerprint) and the spectrogram image. Only the representations
+        the requested features need are computed.
+        
+        Args:
+            filepath: Path to audio file
+            features: Subset of FEATURES: 'bpm', 'key', 'energy', 'timbre',
+                'peaks', 'peak_levels', 'spectrogram', 'fingerprint'
+            duration: Only decode this many seconds
+            peaks_width: Number of (min, max) buckets for 'peaks'
+            offset: Start decoding this many seconds in
             
-            # Find the most prominent pitch class
-            key_idx = int(chroma_avg.argmax())
-            key_name = self.KEY_NAMES.get(key_idx, 'Unknown')
+        Returns:
+            Dict with 'duration' and 'sample_rate' plus each feature's fields.
+            'peaks' (N x 2), 'mel_db' and 'fingerprint' are numpy arrays and
+            'peak_levels' is suno_peaks.build_levels() output; the rest are
+            JSON-friendly.
+        
+        Raises:
+            ValueError: For unknown feature names
+        """
+        features = set(features)
+        unknown = features - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown features: {', '.join(sorted(unknown))}")
+        
+        y, sr = librosa.load(str(filepath), sr=ANALYSIS_SR, mono=True,
+                             offset=offset, duration=duration)
+        out = {'duration': librosa.get_duration(y=y, sr=sr), 'sample_rate': sr}
+        
+        S = log_mel = None
+        if features & {'bpm', 'energy', 'timbre', 'spectrogram', 'fingerprint'}:
+            S = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+            mel = librosa.feature.melspectrogram(S=S ** 2, sr=sr, n_mels=N_MELS)
+            log_mel = librosa.power_to_db(mel)
+        
+        # BPM Detection (same onset envelope beat_track would compute from y)
+        if 'bpm' in features:
+            onset_env = librosa.onset.onset_strength(S=log_mel, sr=sr)
+            tempo, beats = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr,
+                                                   hop_length=HOP_LENGTH)
+            # Handle both scalar and array returns
+            if hasattr(tempo, '__len__'):
+                tempo = float(tempo[0]) if len(tempo) > 0 else 0.0
+            out['bpm'] = round(float(tempo), 1)
+            out['beat_frames'] = beats.tolist() if hasattr(beats, 'tolist') else []
+            logger.debug(f"BPM: {out['bpm']}")
+        
+        # Key Detection
+        if 'key' in features:
+            out.update(self._detect_key(y, sr))
+            logger.debug(f"Key: {out.get('key', 'Unknown')}")
+        
+        # Energy Analysis
+        if 'energy' in features:
+            out.update(self._calculate_energy(y, sr, S=S))
+        
+        # Timbre summary and fingerprint share one MFCC matrix
+        if features & {'timbre', 'fingerprint'}:
+            mfcc = librosa.feature.mfcc(S=log_mel, n_mfcc=13)
+            if 'timbre' in features:
+                out['mfcc_mean'] = [float(v) for v in mfcc.mean(axis=1)]
+                out['mfcc_std'] = [float(v) for v in mfcc.std(axis=1)]
+            if 'fingerprint' in features:
+                frames = int(FINGERPRINT_SECONDS * sr / HOP_LENGTH) + 1
+                out['fingerprint'] = mfcc[:, :frames].mean(axis=1)
+        
+        if 'peaks' in features:
+            out['peaks'] = waveform_peaks(y, peaks_width)
+        
+        if 'peak_levels' in features:
+            out['peak_levels'] = build_levels(y, sr)
+        
+        if 'spectrogram' in features:
+            out['mel_db'] = log_mel - log_mel.max()  # power_to_db(ref=np.max)
+        
+        return out
+    
+    def analyze_excerpts(self, filepath: str, features=STREAM_FEATURES,
+                         window_seconds: float = EXCERPT_SECONDS) -> Dict:
+        """
+        Estimate features from three windows instead of the whole track
+        
+        The windows are the intro (from 5% in, past any leading silence), the
+        middle, and the loudest part of the second half or so, which in most
+        songs is a chorus. The loudest part is found by decoding a few short
+        probes. Only these windows are decoded, using offset/duration loads.
+        
+        Per-window estimates are merged:
+            - BPM: the tempo most windows agree on (within TEMPO_TOLERANCE),
+              with 'bpm_confidence' the share of windows that agree
+            - key: the key with the highest mean profile correlation across
+              windows, with 'key_agreement' the share of windows whose own
+              best key matches
+            - energy and timbre: averaged across windows
+        
+        Tracks shorter than three windows are analyzed in full.
+        
+        Returns:
+            Same fields as extract_features() (without beat_frames), plus
+            'analysis_mode', 'excerpt_offsets' and the confidence fields
+        """
+        features = set(features)
+        unsupported = features - set(STREAM_FEATURES)
+        if unsupported:
+            raise ValueError(f"Cannot estimate from excerpts: {', '.join(sorted(unsupported))}")
+        
+        total = librosa.get_duration(path=str(filepath))
+        if total < 3 * window_seconds:
+            return self.extract_features(filepath, features)
+        
+        offsets = self._excerpt_offsets(filepath, total, window_seconds)
+        windows = [self.extract_features(filepath, features, offset=offset, duration=window_seconds)
+                   for offset in offsets]
+        
+        out = {'duration': total, 'sample_rate': windows[0]['sample_rate'],
+               'analysis_mode': 'excerpt', 'excerpt_offsets': [round(o, 2) for o in offsets]}
+        
+        if 'bpm' in features:
+            bpm, agreement = _merge_tempos([w['bpm'] for w in windows])
+            out['bpm'] = round(bpm, 1)
+            out['bpm_confidence'] = agreement
+        
+        if 'key' in features:
+            chroma = np.array([w['chroma_mean'] for w in windows if 'chroma_mean' in w])
+            if len(chroma):
+                scores = key_scores(chroma, KEY_PROFILE)
+                mean_scores = scores.mean(axis=0)
+                best = int(mean_scores.argmax())
+                out.update(describe_key(best, float(mean_scores[best])))
+                out['key_agreement'] = float((scores.argmax(axis=1) == best).mean())
+                out['chroma_mean'] = [float(v) for v in chroma.mean(axis=0)]
+        
+        averaged = ['energy_mean', 'energy_std', 'brightness', 'percussiveness',
+                    'dynamic_range', 'mfcc_mean', 'mfcc_std']
+        for name in averaged:
+            values = [w[name] for w in windows if name in w]
+            if values:
+                mean = np.mean(np.asarray(values, dtype=np.float64), axis=0)
+                out[name] = [float(v) for v in mean] if mean.ndim else float(mean)
+        
+        return out
+    
+    def _excerpt_offsets(self, filepath: Path, total: float, window: float) -> List[float]:
+        """Start times of the intro, middle and loudest-probe windows"""
+        intro = 0.05 * total
+        middle = (total - window) / 2
+        
+        # Probe positions whose window would not overlap the other two
+        candidates = [p for p in np.linspace(0.25, 0.9, EXCERPT_PROBES) * total - window / 2
+                      if abs(p - middle) >= window and p >= intro + window
+                      and p + window <= total]
+        loudest, loudest_rms = None, -1.0
+        for start in candidates:
+            probe_offset = start + (window - EXCERPT_PROBE_SECONDS) / 2
+            y, _ = librosa.load(str(filepath), sr=ANALYSIS_SR, mono=True,
+                                offset=probe_offset, duration=EXCERPT_PROBE_SECONDS)
+            rms = float(np.sqrt(np.mean(y ** 2))) if len(y) else 0.0
+            if rms > loudest_rms:
+                loudest, loudest_rms = start, rms
+        
+        if loudest is None:
+            loudest = total - window  # Outro as a last resort
+        return [intro, middle, float(loudest)]
+    
+    def _analyze_stream_or_load(self, filepath: Path, features: List[str]) -> Dict:
+        """Stream if the format allows it, otherwise fall back to a full decode"""
+        try:
+            return self.analyze_stream(filepath, features)
+        except Exception as e:
+            logger.debug(f"Streaming unavailable for {filepath.name} ({e}), decoding fully")
+            return self.extract_features(filepath, features)
+    
+    def analyze_stream(self, filepath: str, features=STREAM_FEATURES,
+                       block_frames: int = STREAM_BLOCK_FRAMES) -> Dict:
+        """
+        Analyze a file block by block with memory independent of its length
+        
+        Blocks of ``block_frames`` STFT frames are read at the native sample
+        rate with librosa.stream (so the format must be readable by
+        soundfile, e.g. WAV/FLAC/OGG). Per block, onset strengths are
+        appended to the tempo envelope (one float per hop, carrying the last
+        mel frame across block boundaries) and folded into a running mean
+        tempogram, while chroma, RMS, centroid, zero-crossing and MFCC
+        statistics are folded into running sums.
+        Chroma comes from the STFT rather than a CQT, which cannot be
+        computed block-wise.
+        
+        Args:
+            filepath: Path to audio file
+            features: Subset of STREAM_FEATURES
+            block_frames: STFT frames per block (memory per block is about
+                block_frames * HOP_LENGTH samples)
             
-            # Determine major/minor using correlation with templates
-            major_template = [1, 0, 1, 0, 1, 1, 0, 1, 0, 1, 0, 1]  # Major scale
-            minor_template = [1, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 0]  # Minor scale
+        Returns:
+            Same fields as extract_features() for these features
+        
+        Raises:
+            ValueError: For features that need the whole signal
+        """
+        features = set(features)
+        unsupported = features - set(STREAM_FEATURES)
+        if unsupported:
+            raise ValueError(f"Cannot stream features: {', '.join(sorted(unsupported))}")
+        
+        sr = librosa.get_samplerate(str(filepath))
+        blocks = librosa.stream(str(filepath), block_length=block_frames,
+                                frame_length=N_FFT, hop_length=HOP_LENGTH, mono=True)
+        
+        n_samples = 0
+        tempo_acc = _TempoAccumulator(sr, HOP_LENGTH)
+        prev_log_mel = None
+        sums = {}
+        rms_min, rms_max = float('inf'), float('-inf')
+        
+        def accumulate(name, values):
+            """Fold (n_features x n_frames) values into running sum, sum of squares and count"""
+            total, squares, count = sums.get(name, (0.0, 0.0, 0))
+            sums[name] = (total + values.sum(axis=-1, dtype=np.float64),
+                          squares + (values.astype(np.float64) ** 2).sum(axis=-1),
+                          count + values.shape[-1])
+        
+        for block in blocks:
+            # Consecutive blocks overlap by N_FFT - HOP_LENGTH samples
+            n_samples += len(block) if n_samples == 0 else len(block) - (N_FFT - HOP_LENGTH)
+            if len(block) < N_FFT:
+                continue
             
-            # Rotate templates to detected key
-            major_rotated = major_template[key_idx:] + major_template[:key_idx]
-            minor_rotated = minor_template[key_idx:] + minor_template[:key_idx]
+            S = np.abs(librosa.stft(block, n_fft=N_FFT, hop_length=HOP_LENGTH, center=False))
             
-            major_corr = sum(c * t for c, t in zip(chroma_avg, major_rotated))
-            minor_corr = sum(c * t for c, t in zip(chroma_avg, minor_rotated))
+            if features & {'bpm', 'timbre'}:
+                mel = librosa.feature.melspectrogram(S=S ** 2, sr=sr, n_mels=N_MELS)
+                log_mel = librosa.power_to_db(mel, top_db=None)
             
-            mode = 'major' if major_corr >= minor_corr else 'minor'
+            if 'bpm' in features:
+                frames = log_mel if prev_log_mel is None else np.hstack([prev_log_mel, log_mel])
+                onset = np.maximum(0.0, np.diff(frames, axis=1)).mean(axis=0)
+                tempo_acc.add(onset.astype(np.float32))
+                prev_log_mel = log_mel[:, -1:]
             
-            # Get Camelot notation
-            key_simple = key_name.split('/')[0]
-            camelot = self.CAMELOT_WHEEL.get((key_simple, mode), '')
+            if 'key' in features:
+                accumulate('chroma', librosa.feature.chroma_stft(S=S ** 2, sr=sr))
             
-            return {
-                'key': f"{key_name} {mode}",
-                'key_confidence': float(max(major_corr, minor_corr) / sum(chroma_avg)),
-                'camelot': camelot,
-                'mode': mode
-            }
+            if 'energy' in features:
+                rms = librosa.feature.rms(S=S, frame_length=N_FFT)
+                accumulate('rms', rms[0])
+                rms_min, rms_max = min(rms_min, float(rms.min())), max(rms_max, float(rms.max()))
+                accumulate('centroid', librosa.feature.spectral_centroid(S=S, sr=sr)[0])
+                accumulate('zcr', librosa.feature.zero_crossing_rate(
+                    block, frame_length=N_FFT, hop_length=HOP_LENGTH, center=False)[0])
             
+            if 'timbre' in features:
+                accumulate('mfcc', librosa.feature.mfcc(S=log_mel, n_mfcc=13))
+        
+        out = {'duration': n_samples / sr, 'sample_rate': sr}
+        
+        def mean(name):
+            total, _, count = sums[name]
+            return total / max(count, 1)
+        
+        def std(name):
+            total, squares, count = sums[name]
+            count = max(count, 1)
+            return np.sqrt(np.maximum(squares / count - (total / count) ** 2, 0.0))
+        
+        if 'bpm' in features:
+            # With the tempo known, beat tracking is a linear pass over the envelope
+            tempo = tempo_acc.tempo()
+            _, beats = librosa.beat.beat_track(onset_envelope=tempo_acc.envelope(), sr=sr,
+                                               hop_length=HOP_LENGTH, bpm=tempo)
+            out['bpm'] = round(tempo, 1)
+            out['beat_frames'] = beats.tolist() if hasattr(beats, 'tolist') else []
+        
+        if 'key' in features and 'chroma' in sums:
+            out.update(self._key_from_chroma(mean('chroma')))
+        
+        if 'energy' in features and 'rms' in sums:
+            out.update({
+                'energy_mean': float(mean('rms')),
+                'energy_std': float(std('rms')),
+                'brightness': float(mean('centroid')),
+                'percussiveness': float(mean('zcr')),
+                'dynamic_range': rms_max - rms_min
+            })
+        
+        if 'timbre' in features and 'mfcc' in sums:
+            out['mfcc_mean'] = [float(v) for v in mean('mfcc')]
+            out['mfcc_std'] = [float(v) for v in std('mfcc')]
+        
+        return out
+    
+    def _detect_key(self, y, sr) -> Dict:
+        """Detect musical key from a chromagram of the signal downsampled to KEY_SR"""
+        try:
+            # Pitch classes only need the fundamentals and first few partials
+            if sr > KEY_SR:
+                y, sr = librosa.resample(y, orig_sr=sr, target_sr=KEY_SR), KEY_SR
+            chroma = librosa.feature.chroma_cqt(y=y, sr=sr, hop_length=HOP_LENGTH)
+            return self._key_from_chroma(chroma.mean(axis=1))
+        except Exception as e:
+            logger.error(f"Key detection failed: {e}")
+            return {'key': 'Unknown', 'mode': 'unknown'}
+    
+    def _key_from_chroma(self, chroma_avg) -> Dict:
+        """Key, mode and Camelot code from a 12-bin mean chroma vector"""
+        try:
+            result = detect_key(chroma_avg, KEY_PROFILE)
+            result['chroma_mean'] = [float(v) for v in chroma_avg]
+            return result
         except Exception as e:
             logger.error(f"Key detection failed: {e}")
             return {'key': 'Unknown', 'mode': 'unknown'}
     
-    def _calculate_energy(self, y, sr) -> Dict:
-        """Calculate energy and loudness metrics"""
+    def _calculate_energy(self, y, sr, S=None) -> Dict:
+        """Calculate energy and loudness metrics (from magnitude STFT S if given)"""
         try:
+            if S is None:
+                S = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+            
             # RMS energy
-            rms = librosa.feature.rms(y=y)[0]
+            rms = librosa.feature.rms(S=S, frame_length=N_FFT)[0]
             
             # Spectral centroid (brightness)
-            centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
+            centroid = librosa.feature.spectral_centroid(S=S, sr=sr)[0]
             
             # Zero crossing rate (noisiness/percussiveness)
             zcr = librosa.feature.zero_crossing_rate(y)[0]
@@ -215,7 +586,8 @@ class AudioAnalyzer:
     def generate_waveform(self, filepath: str, output_path: str = None,
                           width: int = 800, height: int = 200,
                           color: str = '#3498db',
-                          bg_color: str = '#1a1a2e') -> Optional[Path]:
+                          bg_color: str = '#1a1a2e',
+                          features: Optional[Dict] = None) -> Optional[Path]:
         """
         Generate waveform image for an audio file
         
@@ -226,6 +598,8 @@ class AudioAnalyzer:
             height: Image height in pixels
             color: Waveform color (hex)
             bg_color: Background color (hex)
+            features: extract_features() output containing 'peaks', to
+                reuse a decode already done for other features
             
         Returns:
             Path to generated image or None
@@ -245,19 +619,21 @@ class AudioAnalyzer:
         output_path = Path(output_path)
         
         try:
-            # Load audio
-            y, sr = librosa.load(str(filepath), sr=22050, mono=True)
+            if features is None or 'peaks' not in features:
+                features = self.extract_features(filepath, ['peaks'], peaks_width=width)
+            peaks = features['peaks']
             
             # Create figure
             fig, ax = plt.subplots(figsize=(width/100, height/100), dpi=100)
             fig.patch.set_facecolor(bg_color)
             ax.set_facecolor(bg_color)
             
-            # Plot waveform
-            librosa.display.waveshow(y, sr=sr, ax=ax, color=color, alpha=0.8)
+            # Plot waveform envelope (one min/max bucket per pixel column)
+            x = np.linspace(0, features['duration'], len(peaks))
+            ax.fill_between(x, peaks[:, 0], peaks[:, 1], color=color, alpha=0.8, linewidth=0)
             
             # Remove axes
-            ax.set_xlim(0, len(y)/sr)
+            ax.set_xlim(0, features['duration'])
             ax.axis('off')
             
             # Save
@@ -276,9 +652,44 @@ class AudioAnalyzer:
             logger.error(f"Waveform generation failed: {e}")
             return None
     
+    def generate_peaks(self, filepath: str, output_path: str = None,
+                       features: Optional[Dict] = None) -> Optional[Path]:
+        """
+        Write multi-resolution waveform peaks for client-side drawing
+        
+        Args:
+            filepath: Path to audio file
+            output_path: Output .dat path (next to the audio if None)
+            features: extract_features() output containing 'peak_levels'
+            
+        Returns:
+            Path to the peaks file or None
+        """
+        if not LIBROSA_AVAILABLE:
+            logger.warning("librosa required for peak generation")
+            return None
+        
+        filepath = Path(filepath)
+        if not filepath.exists():
+            logger.error(f"File not found: {filepath}")
+            return None
+        
+        output_path = Path(output_path) if output_path else filepath.with_suffix('.dat')
+        
+        try:
+            if features is None or 'peak_levels' not in features:
+                features = self.extract_features(filepath, ['peak_levels'])
+            write_peaks(output_path, features['sample_rate'], features['peak_levels'])
+            logger.info(f"✓ Peaks saved: {output_path}")
+            return output_path
+        except Exception as e:
+            logger.error(f"Peak generation failed: {e}")
+            return None
+    
     def generate_spectrogram(self, filepath: str, output_path: str = None,
-                             width: int = 800, height: int = 300) -> Optional[Path]:
-        """Generate spectrogram image"""
+                             width: int = 800, height: int = 300,
+                             features: Optional[Dict] = None) -> Optional[Path]:
+        """Generate spectrogram image (reusing extract_features() output if given)"""
         if not LIBROSA_AVAILABLE or not MATPLOTLIB_AVAILABLE:
             return None
         
@@ -289,15 +700,13 @@ class AudioAnalyzer:
         output_path = Path(output_path)
         
         try:
-            y, sr = librosa.load(str(filepath), sr=22050, mono=True)
-            
-            # Compute mel spectrogram
-            S = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=128)
-            S_dB = librosa.power_to_db(S, ref=np.max)
+            if features is None or 'mel_db' not in features:
+                features = self.extract_features(filepath, ['spectrogram'])
             
             fig, ax = plt.subplots(figsize=(width/100, height/100), dpi=100)
             
-            librosa.display.specshow(S_dB, sr=sr, x_axis='time', 
+            librosa.display.specshow(features['mel_db'], sr=features['sample_rate'],
+                                     hop_length=HOP_LENGTH, x_axis='time',
                                      y_axis='mel', ax=ax, cmap='magma')
             
             ax.axis('off')
@@ -314,14 +723,21 @@ class AudioAnalyzer:
     
     def batch_analyze(self, audio_dir: str, 
                       output_json: str = None,
-                      max_workers: int = 4) -> List[Dict]:
+                      max_workers: int = 4,
+                      mode: str = 'process',
+                      on_result: Optional[Callable[[Dict], None]] = None,
+                      cancel_event: Optional[threading.Event] = None) -> List[Dict]:
         """
         Analyze all audio files in a directory
         
         Args:
             audio_dir: Directory containing audio files
             output_json: Optional path to save results
-            max_workers: Parallel analysis threads
+            max_workers: Parallel analysis workers
+            mode: 'process' (one BLAS thread per worker process) or 'thread'
+            on_result: Called with each successful result as soon as it is
+                ready (e.g. to write it to the database)
+            cancel_event: Set to stop scheduling; running files finish
             
         Returns:
             List of analysis results
@@ -340,21 +756,15 @@ class AudioAnalyzer:
         logger.info(f"Analyzing {len(audio_files)} audio files...")
         
         results = []
+        for result in self.iter_analyze(audio_files, max_workers=max_workers,
+                                        mode=mode, cancel_event=cancel_event):
+            if result.get('analyzed'):
+                results.append(result)
+                if on_result:
+                    on_result(result)
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(self.analyze_file, str(f)): f
-                for f in audio_files
-            }
-            
-            for future in as_completed(futures):
-                filepath = futures[future]
-                try:
-                    result = future.result()
-                    if result.get('analyzed'):
-                        results.append(result)
-                except Exception as e:
-                    logger.error(f"Analysis failed for {filepath}: {e}")
+        if self.cache is not None:
+            self.cache.log_summary()
         
         # Save results if requested
         if output_json:
@@ -363,6 +773,216 @@ class AudioAnalyzer:
             logger.info(f"Results saved to {output_json}")
         
         return results
+    
+    def iter_analyze(self, audio_files: List[Path], max_workers: int = 4,
+                     mode: str = 'process',
+                     cancel_event: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """
+        Analyze files in parallel, yielding each result as it finishes
+        
+        Files are dispatched largest first so one long track does not end
+        up alone at the tail of the run. Only about two tasks per worker are
+        queued at a time, which keeps cancellation (via cancel_event,
+        KeyboardInterrupt or closing the generator) prompt: queued files are
+        dropped and only files already being analyzed run to completion.
+        
+        Files with a cached result are yielded up front without starting a
+        worker, so a re-run only decodes new or changed files.
+        """
+        if mode not in ('process', 'thread'):
+            raise ValueError(f"Unknown analysis mode: {mode}")
+        
+        audio_files = [Path(f) for f in audio_files]
+        if self.cache is not None:
+            uncached = []
+            for filepath in audio_files:
+                params = self._cache_params(streaming=self._uses_streaming(filepath))
+                cached = self.cache.get(filepath, params)
+                if cached is not None:
+                    yield cached
+                else:
+                    uncached.append(filepath)
+            audio_files = uncached
+        
+        # Ascending by size; pop() from the end takes the largest next
+        pending = sorted(audio_files, key=lambda f: f.stat().st_size if f.exists() else 0)
+        
+        with contextlib.ExitStack() as stack:
+            if mode == 'process':
+                stack.enter_context(_single_threaded_native_env())
+                executor = _analysis_process_pool(max_workers)
+                analyzer_kwargs = self._worker_kwargs()
+                submit = lambda f: executor.submit(_analyze_in_worker, analyzer_kwargs, str(f))
+            else:
+                executor = ThreadPoolExecutor(max_workers=max_workers)
+                submit = lambda f: executor.submit(self.analyze_file, str(f))
+            
+            in_flight = {}
+            try:
+                while pending or in_flight:
+                    while pending and len(in_flight) < max_workers * 2 and not (
+                            cancel_event and cancel_event.is_set()):
+                        filepath = pending.pop()
+                        in_flight[submit(filepath)] = filepath
+                    
+                    if not in_flight:
+                        break
+                    
+                    done, _ = wait(in_flight, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        filepath = in_flight.pop(future)
+                        try:
+                            yield future.result()
+                        except Exception as e:
+                            logger.error(f"Analysis failed for {filepath}: {e}")
+                            yield {'filepath': str(filepath), 'filename': filepath.name,
+                                   'analyzed': False, 'error': str(e)}
+                    
+                    if cancel_event and cancel_event.is_set() and pending:
+                        logger.info(f"Analysis cancelled, skipping {len(pending)} queued files")
+                        pending.clear()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+                executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _merge_tempos(tempos: List[float]) -> Tuple[float, float]:
+    """
+    Consensus of per-window tempo estimates
+    
+    Returns:
+        (mean of the largest group of mutually agreeing tempos, share of
+        windows in that group)
+    """
+    tempos = [t for t in tempos if t and t > 0]
+    if not tempos:
+        return 0.0, 0.0
+    groups = [[t for t in tempos if abs(t - anchor) <= TEMPO_TOLERANCE * anchor]
+              for anchor in tempos]
+    best = max(groups, key=lambda g: (len(g), -np.std(g)))
+    return float(np.mean(best)), len(best) / len(tempos)
+
+
+class _TempoAccumulator:
+    """
+    Onset envelope plus a running mean of its autocorrelation tempogram
+    
+    librosa's tempo estimate averages a tempogram over the whole track,
+    which for a long file is the largest allocation in beat tracking. Here
+    the tempogram is computed over chunks of the envelope as it grows
+    (overlapping by one window) and only its column sum is kept.
+    """
+    
+    def __init__(self, sr: int, hop_length: int, ac_size: float = 8.0, chunk: int = 1024):
+        self.sr = sr
+        self.hop_length = hop_length
+        # Same autocorrelation window librosa.feature.tempo uses
+        self.win_length = int(librosa.time_to_frames(ac_size, sr=sr, hop_length=hop_length))
+        self.chunk = chunk
+        self.blocks = []
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.tg_sum = None
+        self.tg_count = 0
+    
+    def add(self, onset) -> None:
+        self.blocks.append(onset)
+        self.pending = np.concatenate([self.pending, onset])
+        if len(self.pending) >= self.win_length + self.chunk:
+            self._fold()
+    
+    def _fold(self) -> None:
+        tg = librosa.feature.tempogram(onset_envelope=self.pending, sr=self.sr,
+                                       hop_length=self.hop_length,
+                                       win_length=self.win_length, center=False)
+        self.tg_sum = tg.sum(axis=1) if self.tg_sum is None else self.tg_sum + tg.sum(axis=1)
+        self.tg_count += tg.shape[1]
+        # Keep the last win_length - 1 frames for the next window
+        self.pending = self.pending[tg.shape[1]:]
+    
+    def envelope(self):
+        return np.concatenate(self.blocks) if self.blocks else np.zeros(1, dtype=np.float32)
+    
+    def tempo(self) -> float:
+        if len(self.pending) >= self.win_length:
+            self._fold()
+        if not self.tg_count:
+            # Shorter than one window: the whole envelope is small anyway
+            return float(librosa.feature.tempo(onset_envelope=self.envelope(), sr=self.sr,
+                                               hop_length=self.hop_length)[0])
+        mean_tg = (self.tg_sum / self.tg_count)[:, np.newaxis]
+        return float(librosa.feature.tempo(tg=mean_tg, sr=self.sr, hop_length=self.hop_length)[0])
+
+
+def _limit_native_threads() -> None:
+    """Pin BLAS/OpenMP pools to one thread (workers already run in parallel)"""
+    for var in _NATIVE_THREAD_VARS:
+        os.environ[var] = '1'
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+
+@contextlib.contextmanager
+def _single_threaded_native_env():
+    """
+    Set the native thread-pool variables to 1 for the duration of a run
+    
+    Spawned workers import numpy/librosa with whatever environment is
+    current when they start (which is lazily, on submit), so the variables
+    have to stay set until the pool has shut down.
+    """
+    saved = {var: os.environ.get(var) for var in _NATIVE_THREAD_VARS}
+    try:
+        for var in _NATIVE_THREAD_VARS:
+            os.environ[var] = '1'
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def _analysis_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Worker pool for CPU-bound analysis
+    
+    Uses 'spawn' so each worker imports numpy/librosa fresh under the
+    single-thread environment (a forked child would inherit the parent's
+    already-initialised thread pools).
+    """
+    return ProcessPoolExecutor(max_workers=max_workers,
+                               mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_limit_native_threads)
+
+
+def _analyze_in_worker(analyzer_kwargs: Dict, filepath: str) -> Dict:
+    """Process-pool entry point (module level so it pickles)"""
+    return AudioAnalyzer(**analyzer_kwargs).analyze_file(filepath)
+
+
+def _audio_files(audio_dir: Path) -> List[Path]:
+    audio_files = []
+    for ext in ['*.mp3', '*.m4a', '*.wav', '*.flac']:
+        audio_files.extend(audio_dir.glob(ext))
+    return sorted(audio_files)
+
+
+def _normalize_task(source: str, output: str, params: Dict) -> bool:
+    """suno_batch worker (module level so it pickles)"""
+    processor = AudioProcessor(str(Path(output).parent))
+    return processor.normalize_audio(source, params['target_dbfs'], output) is not None
+
+
+def _convert_task(source: str, output: str, params: Dict) -> bool:
+    """suno_batch worker (module level so it pickles)"""
+    processor = AudioProcessor(str(Path(output).parent))
+    return processor.convert_format(source, params['format'], output_path=output,
+                                    bitrate=params.get('bitrate', '320k')) is not None
 
 
 class AudioProcessor:
@@ -428,7 +1048,8 @@ class AudioProcessor:
     def convert_format(self, filepath: str, 
                        target_format: str,
                        output_dir: str = None,
-                       bitrate: str = "320k") -> Optional[Path]:
+                       bitrate: str = "320k",
+                       output_path: str = None) -> Optional[Path]:
         """
         Convert audio to different format
         
@@ -437,6 +1058,8 @@ class AudioProcessor:
             target_format: Target format (mp3, flac, wav, m4a)
             output_dir: Output directory
             bitrate: Target bitrate for lossy formats
+            output_path: Exact output file (overrides output_dir; default
+                ``{stem}.{target_format}``)
             
         Returns:
             Path to converted file
@@ -455,13 +1078,16 @@ class AudioProcessor:
             audio = AudioSegment.from_file(str(filepath))
             
             # Determine output path
-            if output_dir:
-                out_dir = Path(output_dir)
-                out_dir.mkdir(exist_ok=True)
+            if output_path is not None:
+                output_path = Path(output_path)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
             else:
-                out_dir = self.output_dir
-            
-            output_path = out_dir / f"{filepath.stem}.{target_format}"
+                if output_dir:
+                    out_dir = Path(output_dir)
+                    out_dir.mkdir(exist_ok=True)
+                else:
+                    out_dir = self.output_dir
+                output_path = out_dir / f"{filepath.stem}.{target_format}"
             
             # Export with appropriate settings
             export_format = target_format
@@ -483,41 +1109,127 @@ class AudioProcessor:
     
     def batch_normalize(self, audio_dir: str,
                         target_dbfs: float = -14.0,
-                        in_place: bool = False) -> int:
-        """Normalize all audio files in a directory"""
-        audio_dir = Path(audio_dir)
+                        in_place: bool = False,
+                        max_workers: Optional[int] = None,
+                        dry_run: bool = False) -> int:
+        """
+        Normalize all audio files in a directory
         
-        audio_files = []
-        for ext in ['*.mp3', '*.m4a', '*.wav', '*.flac']:
-            audio_files.extend(audio_dir.glob(ext))
+        Runs in parallel and skips outputs that are already normalized to
+        the same target (see suno_batch).
         
-        count = 0
+        Returns:
+            Files normalized (with dry_run, files that would be)
+        """
+        audio_dir = Path(audio_dir)
+        out_dir = audio_dir if in_place else self.output_dir
+        tasks = [BatchTask(f, out_dir / f.name, {'op': 'normalize', 'target_dbfs': target_dbfs})
+                 for f in _audio_files(audio_dir)]
+        report = run_batch(tasks, _normalize_task, OutputManifest(out_dir / BATCH_MANIFEST),
+                           max_workers=max_workers, dry_run=dry_run, label='Normalized')
+        return report['pending'] if dry_run else report['done']
+    
+    def scan_loudness(self, audio_files: Union[str, Iterable[Union[str, Path]]],
+                      signatures: Optional[Dict[str, Optional[str]]] = None,
+                      max_workers: int = 4,
+                      tag: bool = True,
+                      on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Measure EBU R128 loudness and true peak, and write ReplayGain tags
+    
+        Unlike normalize_audio this never re-encodes: the gain is stored in
+        tags (and by the caller, via on_result, in the database) and applied
+        by the players. Files are measured in parallel worker processes.
+    
+        Args:
+            audio_files: Directory or list of files
+            signatures: path -> suno_loudness.file_signature() from the last
+                scan; files whose size and mtime still match are skipped
+            max_workers: Worker processes
+            tag: Write ReplayGain/R128 tags in place
+            on_result: Called with each successful result as it is ready
+    
+        Returns:
+            Results for the files that were measured
+        """
+        if isinstance(audio_files, (str, Path)) and Path(audio_files).is_dir():
+            audio_dir = Path(audio_files)
+            audio_files = []
+            for ext in ['*.mp3', '*.m4a', '*.wav', '*.flac', '*.ogg', '*.opus']:
+                audio_files.extend(audio_dir.glob(ext))
+        audio_files = [Path(f) for f in audio_files]
+    
+        signatures = signatures or {}
+        pending = []
         for filepath in audio_files:
-            output = str(filepath) if in_place else str(self.output_dir / filepath.name)
-            if self.normalize_audio(str(filepath), target_dbfs, output):
-                count += 1
-        
-        logger.info(f"Normalized {count}/{len(audio_files)} files")
-        return count
+            try:
+                unchanged = signatures.get(str(filepath)) == file_signature(filepath)
+            except OSError:
+                logger.warning(f"File not found: {filepath}")
+                continue
+            if not unchanged:
+                pending.append(filepath)
+        skipped = len(audio_files) - len(pending)
+        logger.info(f"Measuring loudness of {len(pending)} files ({skipped} unchanged, skipped)")
+    
+        results = []
+        if not pending:
+            return results
+        with _single_threaded_native_env():
+            with _analysis_process_pool(max_workers) as executor:
+                futures = {executor.submit(measure_file, str(f), tag): f for f in pending}
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Loudness scan failed for {futures[future]}: {e}")
+                        continue
+                    if 'error' in result:
+                        continue
+                    results.append(result)
+                    if on_result:
+                        on_result(result)
+    
+        logger.info(f"Measured {len(results)}/{len(pending)} files")
+        return results
     
     def batch_convert(self, audio_dir: str,
                       target_format: str,
-                      bitrate: str = "320k") -> int:
-        """Convert all audio files in a directory"""
-        audio_dir = Path(audio_dir)
+                      bitrate: str = "320k",
+                      max_workers: Optional[int] = None,
+                      dry_run: bool = False) -> int:
+        """
+        Convert all audio files in a directory
         
-        audio_files = []
-        for ext in ['*.mp3', '*.m4a', '*.wav', '*.flac']:
-            audio_files.extend(audio_dir.glob(ext))
+        Runs in parallel and skips outputs that are newer than their source
+        and were converted with the same settings (see suno_batch).
         
-        count = 0
-        for filepath in audio_files:
-            if filepath.suffix[1:].lower() != target_format:
-                if self.convert_format(str(filepath), target_format, bitrate=bitrate):
-                    count += 1
+        Sources sharing a stem (``a.mp3``, ``a.wav``) would write the same
+        output, so they get the source format appended (``a_mp3.flac``).
         
-        logger.info(f"Converted {count} files to {target_format}")
-        return count
+        Returns:
+            Files converted (with dry_run, files that would be)
+        """
+        audio_dir = Path(audio_dir)
+        params = {'op': 'convert', 'format': target_format}
+        if target_format in ['mp3', 'm4a', 'ogg']:
+            params['bitrate'] = bitrate
+        sources = [f for f in _audio_files(audio_dir) if f.suffix[1:].lower() != target_format]
+        # Lower-cased: 'A' and 'a' are one file on case-insensitive filesystems
+        stems = Counter(f.stem.lower() for f in sources)
+        tasks, claimed = [], set()
+        for f in sources:
+            stem = f.stem if stems[f.stem.lower()] == 1 else f"{f.stem}_{f.suffix[1:].lower()}"
+            output = self.output_dir / f"{stem}.{target_format}"
+            if output.name.lower() in claimed:
+                logger.warning(f"Skipping {f.name}: {output.name} is already the output of another file")
+                continue
+            claimed.add(output.name.lower())
+            tasks.append(BatchTask(f, output, params))
+        report = run_batch(tasks, _convert_task, OutputManifest(self.output_dir / BATCH_MANIFEST),
+                           max_workers=max_workers, dry_run=dry_run,
+                           label=f"Converted to {target_format}:")
+        return report['pending'] if dry_run else report['done']
 
 
 class CoverArtManager:
@@ -627,107 +1339,129 @@ class CoverArtManager:
 class DuplicateDetector:
     """Detect duplicate songs using various methods"""
     
-    def __init__(self):
-        pass
+    def __init__(self, analyzer: Optional['AudioAnalyzer'] = None,
+                 hash_cache: Optional[FileHashCache] = None,
+                 fingerprint_index: Optional[FingerprintIndex] = None):
+        """
+        Args:
+            analyzer: Shared AudioAnalyzer (optional)
+            hash_cache: Cache of file hashes (None = hash on every run)
+            fingerprint_index: Landmark index (None = the one in suno_library.db)
+        """
+        self.analyzer = analyzer
+        self.hash_cache = hash_cache
+        self._fingerprint_index = fingerprint_index
+    
+    @property
+    def fingerprint_index(self) -> FingerprintIndex:
+        if self._fingerprint_index is None:
+            self._fingerprint_index = FingerprintIndex()
+        return self._fingerprint_index
     
     def find_duplicates_by_hash(self, audio_dir: str) -> List[Tuple[Path, Path]]:
-        """Find exact duplicates by file hash"""
-        audio_dir = Path(audio_dir)
+        """
+        Find exact duplicates by file contents
         
-        hashes = {}
-        duplicates = []
+        Files are compared by size, then by their first and last 64 KB, and
+        only the remaining collisions are hashed in full (see suno_dedup).
         
-        for ext in ['*.mp3', '*.m4a', '*.wav']:
-            for filepath in audio_dir.glob(ext):
-                file_hash = self._calculate_hash(filepath)
-                if file_hash in hashes:
-                    duplicates.append((hashes[file_hash], filepath))
-                else:
-                    hashes[file_hash] = filepath
+        Returns:
+            (first, duplicate) pairs, one per extra copy
+        """
+        audio_dir = Path(audio_dir)
+        files = [f for ext in ['*.mp3', '*.m4a', '*.wav'] for f in audio_dir.glob(ext)]
         
+        duplicates = []
+        for group in find_duplicate_files(files, self.hash_cache):
+            duplicates.extend((group[0], filepath) for filepath in group[1:])
         return duplicates
     
-    def find_duplicates_by_fingerprint(self, audio_dir: str,
-                                       threshold: float = 0.9) -> List[Tuple[Path, Path, float]]:
-        """Find similar songs by audio fingerprint"""
-        if not LIBROSA_AVAILABLE:
-            logger.warning("librosa required for fingerprint detection")
-            return []
-        
-        audio_dir = Path(audio_dir)
+    def index_fingerprints(self, audio_files: Union[str, Iterable[Union[str, Path]]],
+                           max_workers: int = 4) -> List[Path]:
+        """
+        Add new and changed files to the landmark fingerprint index
         
-        # Compute fingerprints
-        fingerprints = {}
+        Files whose size and mtime match what was indexed are skipped, so
+        this can run after every download batch. Fingerprints are extracted
+        in parallel worker processes.
         
-        for ext in ['*.mp3', '*.m4a', '*.wav']:
-            for filepath in audio_dir.glob(ext):
-                try:
-                    y, sr = librosa.load(str(filepath), sr=22050, mono=True, duration=30)
-                    mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-                    fingerprints[filepath] = mfcc.mean(axis=1)
-                except Exception:
-                    continue
+        Args:
+            audio_files: Directory or list of files
+            max_workers: Worker processes
         
-        # Compare fingerprints
-        duplicates = []
-        filepaths = list(fingerprints.keys())
+        Returns:
+            Files that were (re-)indexed
+        """
+        if isinstance(audio_files, (str, Path)) and Path(audio_files).is_dir():
+            audio_files = [f for ext in ['*.mp3', '*.m4a', '*.wav'] for f in Path(audio_files).glob(ext)]
+        audio_files = [Path(f) for f in audio_files]
         
-        for i, fp1 in enumerate(filepaths):
-            for fp2 in filepaths[i+1:]:
-                similarity = self._cosine_similarity(
-                    fingerprints[fp1],
-                    fingerprints[fp2]
-                )
-                if similarity >= threshold:
-                    duplicates.append((fp1, fp2, similarity))
+        signatures = self.fingerprint_index.signatures()
+        pending = []
+        for filepath in audio_files:
+            try:
+                if signatures.get(str(filepath)) != fingerprint_signature(filepath):
+                    pending.append(filepath)
+            except OSError:
+                logger.warning(f"File not found: {filepath}")
+        logger.info(f"Fingerprinting {len(pending)} files ({len(audio_files) - len(pending)} unchanged, skipped)")
         
-        return duplicates
+        indexed = []
+        if not pending:
+            return indexed
+        with _single_threaded_native_env():
+            with _analysis_process_pool(max_workers) as executor:
+                futures = {executor.submit(fingerprint_file, str(f)): f for f in pending}
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Fingerprinting failed for {futures[future]}: {e}")
+                        continue
+                    if 'error' in result:
+                        continue
+                    self.fingerprint_index.add(result['filepath'], result['hashes'],
+                                               result['offsets'], result['signature'])
+                    indexed.append(futures[future])
+        return indexed
     
-    def find_duplicates_by_title(self, songs: List[Dict],
-                                 threshold: float = 0.85) -> List[Tuple[Dict, Dict, float]]:
-        """Find duplicates by similar titles"""
-        duplicates = []
-        
-        for i, song1 in enumerate(songs):
-            for song2 in songs[i+1:]:
-                similarity = self._string_similarity(
-                    song1.get('title', ''),
-                    song2.get('title', '')
-                )
-                if similarity >= threshold:
-                    duplicates.append((song1, song2, similarity))
+    def find_duplicates_by_fingerprint(self, audio_dir: str,
+                                       threshold: float = FINGERPRINT_MIN_SCORE,
+                                       new_only: bool = False,
+                                       max_workers: int = 4) -> List[Tuple[Path, Path, float]]:
+        """
+        Find re-uploads and other copies of the same recording
         
-        return duplicates
-    
-    def _calculate_hash(self, filepath: Path) -> str:
-        """Calculate MD5 hash of file"""
-        hasher = hashlib.md5()
-        with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                hasher.update(chunk)
-        return hasher.hexdigest()
-    
-    def _cosine_similarity(self, a, b) -> float:
-        """Calculate cosine similarity between vectors"""
-        if not NUMPY_AVAILABLE:
-            return 0.0
-        dot = np.dot(a, b)
-        norm_a = np.linalg.norm(a)
-        norm_b = np.linalg.norm(b)
-        return float(dot / (norm_a * norm_b)) if norm_a and norm_b else 0.0
-    
-    def _string_similarity(self, s1: str, s2: str) -> float:
-        """Calculate string similarity (Jaccard)"""
-        if not s1 or not s2:
-            return 0.0
+        The directory is indexed incrementally (see index_fingerprints) and
+        each track is looked up in the landmark index, so only tracks that
+        share hashes are ever compared.
         
-        words1 = set(s1.lower().split())
-        words2 = set(s2.lower().split())
+        Args:
+            audio_dir: Directory of audio files
+            threshold: Minimum share of time-aligned landmarks (re-encodes
+                score near 1, trimmed or noisier copies 0.3-0.7, unrelated
+                songs a few percent)
+            new_only: Only report matches of files indexed by this call
+            max_workers: Worker processes for fingerprinting
         
-        intersection = len(words1 & words2)
-        union = len(words1 | words2)
+        Returns:
+            (path_a, path_b, score) by descending score
+        """
+        if not (NUMPY_AVAILABLE and LIBROSA_AVAILABLE):
+            logger.warning("librosa required for fingerprint detection")
+            return []
         
-        return intersection / union if union > 0 else 0.0
+        audio_dir = Path(audio_dir)
+        files = [f for ext in ['*.mp3', '*.m4a', '*.wav'] for f in audio_dir.glob(ext)]
+        indexed = self.index_fingerprints(files, max_workers=max_workers)
+        self.fingerprint_index.prune()
+        return self.fingerprint_index.find_duplicates(threshold, paths=indexed if new_only else files)
+    
+    def find_duplicates_by_title(self, songs: List[Dict],
+                                 threshold: float = 0.85) -> List[Tuple[Dict, Dict, float]]:
+        """Find duplicates by similar titles (word blocking, see suno_dedup)"""
+        pairs = find_similar_titles({i: song.get('title', '') for i, song in enumerate(songs)}, threshold)
+        return [(songs[i], songs[j], similarity) for i, j, similarity in sorted(pairs)]
 
 
 def main():
@@ -741,9 +1475,14 @@ def main():
         print("\nCommands:")
         print("  python suno_audio.py analyze <file>")
         print("  python suno_audio.py waveform <file>")
+        print("  python suno_audio.py peaks <file>")
         print("  python suno_audio.py normalize <file>")
+        print("  python suno_audio.py loudness <file_or_dir>")
+        print("  python suno_audio.py fingerprint <dir>")
         print("  python suno_audio.py convert <file> <format>")
         print("  python suno_audio.py batch-analyze <dir>")
+        print("  python suno_audio.py batch-normalize <dir> [--dry-run]")
+        print("  python suno_audio.py batch-convert <dir> <format> [--dry-run]")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -758,11 +1497,33 @@ def main():
         output = analyzer.generate_waveform(sys.argv[2])
         print(f"Waveform saved to: {output}")
     
+    elif command == "peaks" and len(sys.argv) > 2:
+        analyzer = AudioAnalyzer()
+        output = analyzer.generate_peaks(sys.argv[2])
+        print(f"Peaks saved to: {output}")
+    
     elif command == "normalize" and len(sys.argv) > 2:
         processor = AudioProcessor()
         output = processor.normalize_audio(sys.argv[2])
         print(f"Normalized: {output}")
     
+    elif command == "loudness" and len(sys.argv) > 2:
+        processor = AudioProcessor()
+        target = sys.argv[2]
+        results = processor.scan_loudness(target if Path(target).is_dir() else [target],
+                                          max_workers=os.cpu_count() or 1)
+        for result in results:
+            print(f"{Path(result['filepath']).name}: {result['loudness_lufs']} LUFS, "
+                  f"{result['true_peak_dbtp']} dBTP, gain {result['replaygain_gain']} dB")
+    
+    elif command == "fingerprint" and len(sys.argv) > 2:
+        detector = DuplicateDetector()
+        pairs = detector.find_duplicates_by_fingerprint(sys.argv[2], new_only=True,
+                                                        max_workers=os.cpu_count() or 1)
+        for path_a, path_b, score in pairs:
+            print(f"{score:.2f}  {path_a.name}  ==  {path_b.name}")
+        print(f"{len(detector.fingerprint_index)} tracks indexed, {len(pairs)} matches for new files")
+    
     elif command == "convert" and len(sys.argv) > 3:
         processor = AudioProcessor()
         output = processor.convert_format(sys.argv[2], sys.argv[3])
@@ -773,6 +1534,16 @@ def main():
         results = analyzer.batch_analyze(sys.argv[2], "analysis_results.json")
         print(f"Analyzed {len(results)} files")
     
+    elif command == "batch-normalize" and len(sys.argv) > 2:
+        processor = AudioProcessor()
+        count = processor.batch_normalize(sys.argv[2], dry_run='--dry-run' in sys.argv)
+        print(f"{'Would normalize' if '--dry-run' in sys.argv else 'Normalized'} {count} files")
+    
+    elif command == "batch-convert" and len(sys.argv) > 3:
+        processor = AudioProcessor()
+        count = processor.batch_convert(sys.argv[2], sys.argv[3], dry_run='--dry-run' in sys.argv)
+        print(f"{'Would convert' if '--dry-run' in sys.argv else 'Converted'} {count} files")
+    
     else:
         # Single file analysis
         analyzer = AudioAnalyzer()
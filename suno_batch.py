@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Suno Batch - Parallel, incremental file-to-file batch jobs
+
+A batch job turns source files into output files with a set of parameters
+(target format, bitrate, loudness target...). Like make, an output is up to
+date when it is at least as new as its source; in addition the manifest
+must record it as built from that source with the same parameters, and the
+output must not have changed since. Up-to-date outputs are skipped, so a
+re-run only does new work. The rest runs on a process pool sized to the
+cores, and a dry run reports the plan without touching anything.
+
+The manifest is a small JSON file keyed by output path, next to the
+outputs.
+
+Usage:
+    from suno_batch import BatchTask, OutputManifest, run_batch
+
+    tasks = [BatchTask(src, out_dir / f"{src.stem}.wav", {'format': 'wav'}) for src in files]
+    report = run_batch(tasks, convert_one, OutputManifest(out_dir / MANIFEST_FILENAME))
+    print(report['files_per_sec'])
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".suno_batch.json"
+
+# Task statuses passed to on_result
+DONE, FAILED, UP_TO_DATE = 'done', 'failed', 'up_to_date'
+
+
+@dataclass
+class BatchTask:
+    """One source -> output step; params are whatever determines the output"""
+    source: Path
+    output: Path
+    params: Dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.source = Path(self.source)
+        self.output = Path(self.output)
+
+
+def _params_key(params: Dict) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class OutputManifest:
+    """Which source and parameters each output was built from, stored as JSON"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Load entries (missing/corrupt files start empty)"""
+        if not self.path.exists():
+            self.entries = {}
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('outputs', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable batch manifest {self.path}: {e}")
+            self.entries = {}
+
+    def is_current(self, task: BatchTask) -> bool:
+        """True if task.output was built from task.source with task.params and is untouched"""
+        entry = self.entries.get(str(task.output))
+        if not entry or entry.get('source') != str(task.source):
+            return False
+        if entry.get('params') != _params_key(task.params):
+            return False
+        try:
+            source, output = task.source.stat(), task.output.stat()
+        except OSError:
+            return False
+        return (output.st_mtime_ns >= source.st_mtime_ns
+                and [output.st_size, output.st_mtime_ns] == entry.get('output'))
+
+    def record(self, task: BatchTask) -> None:
+        """Remember that task.output is now built (call after it was written)"""
+        stat = task.output.stat()
+        with self._lock:
+            self.entries[str(task.output)] = {
+                'source': str(task.source),
+                'params': _params_key(task.params),
+                'output': [stat.st_size, stat.st_mtime_ns],
+            }
+
+    def save(self) -> None:
+        """Write the manifest atomically"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'outputs': self.entries}, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+def plan_batch(tasks: List[BatchTask],
+               manifest: Optional[OutputManifest] = None) -> Dict[str, List[BatchTask]]:
+    """Split tasks into 'pending' and 'up_to_date'"""
+    plan = {'pending': [], UP_TO_DATE: []}
+    for task in tasks:
+        current = manifest is not None and manifest.is_current(task)
+        plan[UP_TO_DATE if current else 'pending'].append(task)
+    return plan
+
+
+def run_batch(tasks: List[BatchTask],
+              worker: Callable[[str, str, Dict], object],
+              manifest: Optional[OutputManifest] = None,
+              max_workers: Optional[int] = None,
+              dry_run: bool = False,
+              on_result: Optional[Callable[[BatchTask, str], None]] = None,
+              label: str = 'Processed') -> Dict:
+    """
+    Run the pending tasks of a batch in parallel
+
+    Args:
+        tasks: Source -> output steps
+        worker: Module-level function (it is pickled to the worker
+            processes) called as worker(source, output, params); a truthy
+            return value means the output was written
+        manifest: Skips up-to-date outputs and records new ones (None =
+            run everything)
+        max_workers: Worker processes (None = CPU count; 1 = run inline)
+        dry_run: Only plan: report what is pending and run nothing
+        on_result: Called in this process as on_result(task, status) with
+            status DONE, FAILED or UP_TO_DATE
+        label: Verb for the summary log line
+
+    Returns:
+        Report dict: total, up_to_date, pending, pending_bytes, done,
+        failed, seconds, files_per_sec, dry_run
+    """
+    plan = plan_batch(tasks, manifest)
+    pending = plan['pending']
+    pending_bytes = sum(t.source.stat().st_size for t in pending if t.source.exists())
+    report = {'total': len(tasks), 'up_to_date': len(plan[UP_TO_DATE]), 'pending': len(pending),
+              'pending_bytes': pending_bytes, 'done': 0, 'failed': 0, 'seconds': 0.0,
+              'files_per_sec': 0.0, 'dry_run': dry_run}
+
+    if dry_run:
+        for task in pending:
+            logger.debug(f"  pending: {task.source} -> {task.output}")
+        logger.info(f"Dry run: {len(pending)} of {len(tasks)} files pending "
+                    f"({pending_bytes / 1024 / 1024:.1f} MB), {report['up_to_date']} up to date")
+        return report
+
+    if on_result:
+        for task in plan[UP_TO_DATE]:
+            on_result(task, UP_TO_DATE)
+
+    def finish(task, ok):
+        if ok and not task.output.exists():
+            logger.error(f"{task.source}: worker reported success but wrote no {task.output.name}")
+            ok = False
+        if ok:
+            report['done'] += 1
+            if manifest is not None:
+                manifest.record(task)
+        else:
+            report['failed'] += 1
+        if on_result:
+            on_result(task, DONE if ok else FAILED)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    try:
+        if max_workers == 1 or len(pending) <= 1:
+            for task in pending:
+                try:
+                    ok = worker(str(task.source), str(task.output), task.params)
+                except Exception as e:
+                    logger.error(f"{task.source}: {e}")
+                    ok = False
+                finish(task, ok)
+        elif pending:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                futures = {executor.submit(worker, str(t.source), str(t.output), t.params): t
+                           for t in pending}
+                for future in as_completed(futures):
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        logger.error(f"{futures[future].source}: {e}")
+                        ok = False
+                    finish(futures[future], ok)
+    finally:
+        if manifest is not None and report['done']:
+            manifest.save()
+
+    report['seconds'] = time.perf_counter() - start
+    if report['seconds'] > 0:
+        report['files_per_sec'] = report['done'] / report['seconds']
+    logger.info(f"{label} {report['done']}/{len(pending)} files in {report['seconds']:.1f}s "
+                f"({report['files_per_sec']:.2f} files/s); {report['up_to_date']} up to date, "
+                f"{report['failed']} failed")
+    return report
@@ -11,7 +11,7 @@ import hashlib
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Set, Tuple
 from contextlib import contextmanager
 
 # Shared utilities
@@ -23,6 +23,7 @@ from suno_utils import (
     DatabaseError,
     ConfigError
 )
+from suno_dedup import TITLE_THRESHOLD, find_similar_titles
 
 # YAML configuration
 try:
@@ -63,6 +64,16 @@ class Config:
             'retry_attempts': 3,
             'retry_delay': 2
         },
+        'rate_limit': {
+            'initial_rate': 2.0,
+            'max_rate': 20.0,
+            'initial_concurrency': 2,
+            'max_concurrency': 16
+        },
+        'api_cache': {
+            'db_path': '.suno_cache/http_cache.db',
+            'default_ttl': 3600
+        },
         'audio_analysis': {
             'enabled': True,
             'detect_bpm': True,
@@ -70,7 +81,11 @@ class Config:
             'generate_waveform': True,
             'waveform_dir': 'suno_waveforms',
             'waveform_width': 800,
-            'waveform_height': 200
+            'waveform_height': 200,
+            'workers': None,  # analysis processes; None = CPU count
+            'cache_max_mb': 128,  # .audio_cache result budget
+            'stream_threshold_mb': 32,  # larger files are analyzed in bounded memory
+            'analysis_mode': 'full'  # 'full' or 'excerpt' (three windows per track)
         },
         'database': {
             'path': 'suno_library.db',
@@ -87,7 +102,9 @@ class Config:
             'backend': 'pygame',
             'default_volume': 0.7,
             'shuffle': False,
-            'repeat': False
+            'repeat': False,
+            'replaygain': True,  # level tracks by their measured loudness
+            'replaygain_preamp_db': 0.0
         },
         'logging': {
             'level': 'INFO',
@@ -156,6 +173,16 @@ class Config:
 class SunoDatabase:
     """SQLite database for persistent storage of songs and metadata"""
     
+    # Columns added to songs after its first release, (name, type); existing
+    # databases gain them when opened
+    SONG_COLUMNS_ADDED = (
+        ('loudness_lufs', 'REAL'),
+        ('true_peak_dbtp', 'REAL'),
+        ('replaygain_gain', 'REAL'),
+        ('replaygain_peak', 'REAL'),
+        ('loudness_signature', 'TEXT'),
+    )
+    
     def __init__(self, db_path: str = "suno_library.db"):
         self.db_path = Path(db_path)
         self.connection = None
@@ -192,9 +219,15 @@ class SunoDatabase:
                     energy REAL,
                     waveform_path TEXT,
                     is_liked INTEGER DEFAULT 0,
-                    is_disliked INTEGER DEFAULT 0
+                    is_disliked INTEGER DEFAULT 0,
+                    loudness_lufs REAL,
+                    true_peak_dbtp REAL,
+                    replaygain_gain REAL,
+                    replaygain_peak REAL,
+                    loudness_signature TEXT
                 )
             ''')
+            self._add_missing_columns(cursor, 'songs', self.SONG_COLUMNS_ADDED)
             
             # Tags table
             cursor.execute('''
@@ -274,13 +307,24 @@ class SunoDatabase:
             # Create indexes
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_songs_title ON songs(title)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_songs_artist ON songs(artist)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_songs_bpm ON songs(bpm)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_songs_key ON songs(musical_key)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_song ON tags(song_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_play_history_song ON play_history(song_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_duplicates_song_2 ON duplicates(song_id_2)')
             
             conn.commit()
             logger.info(f"Database initialized: {self.db_path}")
     
+    @staticmethod
+    def _add_missing_columns(cursor, table: str, columns):
+        """ALTER TABLE ... ADD COLUMN for each (name, type) the table lacks"""
+        existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+        for name, column_type in columns:
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}')
+    
     @contextmanager
     def _get_connection(self):
         """Get database connection with context manager"""
@@ -293,68 +337,82 @@ class SunoDatabase:
     
     def add_song(self, song: Dict) -> bool:
         """Add or update a song in the database"""
-        song_id = extract_song_id(song.get('url', ''))
-        if not song_id:
-            return False
+        return self.add_songs([song]) == 1
+    
+    def add_songs(self, songs: List[Dict]) -> int:
+        """
+        Add or update many songs in a single transaction
         
+        Title duplicates involving the written songs are updated afterwards
+        (see refresh_title_duplicates).
+        
+        Returns:
+            Number of songs written (songs without a valid URL are skipped)
+        """
+        written = []
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Parse duration to seconds
-            duration_seconds = parse_duration(song.get('duration', ''))
-            
-            # Determine suno version from tags
-            suno_version = None
-            for tag in song.get('tags', []):
-                if tag.lower().startswith('v'):
-                    suno_version = tag
-                    break
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO songs 
-                (id, title, artist, description, lyrics, duration, duration_seconds,
-                 url, image_url, source_tab, suno_version, extracted_at, is_liked, is_disliked)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                song_id,
-                song.get('title', ''),
-                song.get('artist', ''),
-                song.get('description', ''),
-                song.get('lyrics', ''),
-                song.get('duration', ''),
-                duration_seconds,
-                song.get('url', ''),
-                song.get('image_url', ''),
-                song.get('source_tab', ''),
-                suno_version,
-                datetime.now().isoformat(),
-                1 if song.get('liked') else 0,
-                1 if song.get('disliked') else 0
-            ))
-            
-            # Add tags
-            for tag in song.get('tags', []):
-                if tag and not tag.lower().startswith('v'):  # Skip version tags
-                    try:
-                        cursor.execute('''
-                            INSERT OR IGNORE INTO tags (song_id, tag) VALUES (?, ?)
-                        ''', (song_id, tag))
-                    except Exception:
-                        pass
+            extracted_at = datetime.now().isoformat()
+            
+            for song in songs:
+                song_id = extract_song_id(song.get('url', ''))
+                if not song_id:
+                    continue
+                
+                # Parse duration to seconds
+                duration_seconds = parse_duration(song.get('duration', ''))
+                
+                # Determine suno version from tags
+                suno_version = None
+                for tag in song.get('tags', []):
+                    if tag.lower().startswith('v'):
+                        suno_version = tag
+                        break
+                
+                cursor.execute('''
+                    INSERT OR REPLACE INTO songs 
+                    (id, title, artist, description, lyrics, duration, duration_seconds,
+                     url, image_url, source_tab, suno_version, extracted_at, is_liked, is_disliked)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    song_id,
+                    song.get('title', ''),
+                    song.get('artist', ''),
+                    song.get('description', ''),
+                    song.get('lyrics', ''),
+                    song.get('duration', ''),
+                    duration_seconds,
+                    song.get('url', ''),
+                    song.get('image_url', ''),
+                    song.get('source_tab', ''),
+                    suno_version,
+                    extracted_at,
+                    1 if song.get('liked') else 0,
+                    1 if song.get('disliked') else 0
+                ))
+                
+                # Add tags
+                for tag in song.get('tags', []):
+                    if tag and not tag.lower().startswith('v'):  # Skip version tags
+                        try:
+                            cursor.execute('''
+                                INSERT OR IGNORE INTO tags (song_id, tag) VALUES (?, ?)
+                            ''', (song_id, tag))
+                        except Exception:
+                            pass
+                written.append(song_id)
             
             conn.commit()
-            return True
+        if written:
+            self.refresh_title_duplicates(written)
+        return len(written)
     
     def import_from_json(self, json_path: str) -> int:
         """Import songs from extraction JSON file"""
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
-        songs = data.get('songs', [])
-        count = 0
-        for song in songs:
-            if self.add_song(song):
-                count += 1
+        count = self.add_songs(data.get('songs', []))
         
         logger.info(f"Imported {count} songs from {json_path}")
         return count
@@ -408,6 +466,32 @@ class SunoDatabase:
                 )
                 conn.commit()
     
+    def update_loudness(self, song_id: str, result: Dict):
+        """Store a suno_loudness.measure_file() result for a song"""
+        with self._get_connection() as conn:
+            conn.execute('''
+                UPDATE songs SET loudness_lufs = ?, true_peak_dbtp = ?, replaygain_gain = ?,
+                                 replaygain_peak = ?, loudness_signature = ?
+                WHERE id = ?
+            ''', (result.get('loudness_lufs'), result.get('true_peak_dbtp'),
+                  result.get('replaygain_gain'), result.get('replaygain_peak'),
+                  result.get('signature'), song_id))
+            conn.commit()
+    
+    def get_loudness_signatures(self) -> Dict[str, Optional[str]]:
+        """local_audio_path -> loudness_signature for every downloaded song"""
+        with self._get_connection() as conn:
+            return {row[0]: row[1] for row in conn.execute(
+                "SELECT local_audio_path, loudness_signature FROM songs "
+                "WHERE local_audio_path IS NOT NULL AND local_audio_path != ''")}
+    
+    def get_song_id_by_path(self, audio_path: str) -> Optional[str]:
+        """ID of the song whose local_audio_path is ``audio_path``"""
+        with self._get_connection() as conn:
+            row = conn.execute('SELECT id FROM songs WHERE local_audio_path = ?',
+                               (audio_path,)).fetchone()
+            return row[0] if row else None
+    
     def get_song(self, song_id: str) -> Optional[Dict]:
         """Get song by ID"""
         with self._get_connection() as conn:
@@ -424,6 +508,11 @@ class SunoDatabase:
             
             return None
     
+    def get_song_ids(self) -> Set[str]:
+        """IDs of every stored song (cheap; no row or tag loading)"""
+        with self._get_connection() as conn:
+            return {row[0] for row in conn.execute('SELECT id FROM songs')}
+    
     def get_all_songs(self, limit: int = None, offset: int = 0) -> List[Dict]:
         """Get all songs with optional pagination"""
         with self._get_connection() as conn:
@@ -444,6 +533,46 @@ class SunoDatabase:
             
             return songs
     
+    def query_songs(self, where: str = '', params: Tuple = (),
+                    order_by: str = 'title', limit: int = None) -> List[Dict]:
+        """
+        Songs matching a SQL condition, with tags, in one query
+        
+        Args:
+            where: Condition on ``songs`` aliased as ``s`` (placeholders only,
+                never interpolated values)
+            params: Placeholder values
+            order_by: ORDER BY expression
+            limit: Maximum rows
+        """
+        query = '''
+            SELECT s.*,
+                   (SELECT group_concat(tag, char(31)) FROM tags t WHERE t.song_id = s.id) AS tag_list
+            FROM songs s
+        '''
+        if where:
+            query += f' WHERE {where}'
+        if order_by:
+            query += f' ORDER BY {order_by}'
+        if limit:
+            query += ' LIMIT ?'
+            params = tuple(params) + (int(limit),)
+        
+        with self._get_connection() as conn:
+            songs = []
+            for row in conn.execute(query, tuple(params)):
+                song = dict(row)
+                tag_list = song.pop('tag_list')
+                song['tags'] = tag_list.split('\x1f') if tag_list else []
+                songs.append(song)
+            return songs
+    
+    def get_musical_keys(self) -> List[str]:
+        """Distinct musical keys in the library (an index-only scan)"""
+        with self._get_connection() as conn:
+            return [row[0] for row in conn.execute(
+                'SELECT DISTINCT musical_key FROM songs WHERE musical_key IS NOT NULL')]
+    
     def search_songs(self, query: str, fields: List[str] = None) -> List[Dict]:
         """Search songs by query"""
         if fields is None:
@@ -609,48 +738,75 @@ class SunoDatabase:
             ''', (playlist_id,))
             return [dict(row) for row in cursor.fetchall()]
     
-    def find_duplicates_by_title(self) -> List[Tuple[Dict, Dict, float]]:
-        """Find potential duplicates by similar titles"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM songs ORDER BY title')
-            songs = [dict(row) for row in cursor.fetchall()]
-        
-        duplicates = []
-        for i, song1 in enumerate(songs):
-            for song2 in songs[i+1:]:
-                similarity = self._title_similarity(
-                    song1.get('title', ''),
-                    song2.get('title', '')
-                )
-                if similarity > 0.8:
-                    duplicates.append((song1, song2, similarity))
-        
-        return duplicates
+    def find_duplicates_by_title(self, threshold: float = TITLE_THRESHOLD) -> List[Tuple[Dict, Dict, float]]:
+        """Find potential duplicates by similar titles (recomputes and stores all pairs)"""
+        self.refresh_title_duplicates(threshold=threshold)
+        return self.get_duplicates('title')
     
-    def _title_similarity(self, title1: str, title2: str) -> float:
-        """Calculate similarity between two titles"""
-        if not title1 or not title2:
-            return 0.0
-        
-        # Normalize titles
-        t1 = title1.lower().strip()
-        t2 = title2.lower().strip()
-        
-        if t1 == t2:
-            return 1.0
+    def refresh_title_duplicates(self, song_ids: Optional[List[str]] = None,
+                                 threshold: float = TITLE_THRESHOLD) -> int:
+        """
+        Store pairs of songs with similar titles in the duplicates table
         
-        # Simple Jaccard similarity on words
-        words1 = set(t1.split())
-        words2 = set(t2.split())
+        Candidates come from word blocking (see suno_dedup.find_similar_titles),
+        so only titles sharing a rare word are compared.
         
-        if not words1 or not words2:
-            return 0.0
+        Args:
+            song_ids: Only redo pairs involving these songs (e.g. just
+                added or renamed); None = all pairs
+            threshold: Minimum word-set Jaccard similarity
         
-        intersection = len(words1 & words2)
-        union = len(words1 | words2)
+        Returns:
+            Number of pairs stored
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, title FROM songs')
+            titles = {row['id']: row['title'] for row in cursor.fetchall()}
+            pairs = find_similar_titles(titles, threshold, only=song_ids)
+            
+            if song_ids is None:
+                cursor.execute("DELETE FROM duplicates WHERE duplicate_type = 'title'")
+            else:
+                cursor.executemany('''
+                    DELETE FROM duplicates
+                    WHERE duplicate_type = 'title' AND (song_id_1 = ? OR song_id_2 = ?)
+                ''', [(song_id, song_id) for song_id in set(song_ids)])
+            detected_at = datetime.now().isoformat()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO duplicates
+                (song_id_1, song_id_2, similarity_score, duplicate_type, detected_at)
+                VALUES (?, ?, ?, 'title', ?)
+            ''', [(*sorted((id_a, id_b)), score, detected_at) for id_a, id_b, score in pairs])
+            conn.commit()
+        return len(pairs)
+    
+    def get_duplicates(self, duplicate_type: str = 'title',
+                       limit: int = None) -> List[Tuple[Dict, Dict, float]]:
+        """Stored duplicate pairs, most similar first, with both songs"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            query = '''
+                SELECT song_id_1, song_id_2, similarity_score FROM duplicates
+                WHERE duplicate_type = ?
+                ORDER BY similarity_score DESC, song_id_1, song_id_2
+            '''
+            params = [duplicate_type]
+            if limit:
+                query += ' LIMIT ?'
+                params.append(limit)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            
+            song_ids = list({row[column] for row in rows for column in ('song_id_1', 'song_id_2')})
+            songs = {}
+            for i in range(0, len(song_ids), 500):
+                chunk = song_ids[i:i + 500]
+                cursor.execute(f"SELECT * FROM songs WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+                songs.update((row['id'], dict(row)) for row in cursor.fetchall())
         
-        return intersection / union if union > 0 else 0.0
+        return [(songs[row['song_id_1']], songs[row['song_id_2']], row['similarity_score'])
+                for row in rows if row['song_id_1'] in songs and row['song_id_2'] in songs]
     
     def get_statistics(self) -> Dict:
         """Get library statistics"""
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Suno Dedup - Duplicate detection for files and titles
+
+Byte-identical files are found in three tiers, each only looking at the
+files the previous one could not tell apart:
+    1. size (a stat call; most files in a library have a unique size)
+    2. BLAKE2b of the first and last 64 KB
+    3. BLAKE2b of the whole file
+
+Both hashes are cached in the library database keyed by (path, size,
+mtime), so a repeat scan of an unchanged library only stats the files.
+
+Similar titles (word-set Jaccard) are found with prefix-filter blocking:
+words are ordered rarest first, and two titles can only reach the
+threshold if their first few words share one. Only titles that share a
+block are scored, and no qualifying pair is missed.
+
+Usage:
+    from suno_dedup import FileHashCache, find_duplicate_files, find_similar_titles
+
+    cache = FileHashCache('suno_library.db')
+    for group in find_duplicate_files(Path('suno_library/audio').glob('*'), cache):
+        keep, *extra = group
+
+    for id_a, id_b, score in find_similar_titles({song_id: title, ...}, threshold=0.8):
+        ...
+"""
+
+import os
+import math
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+from suno_analysis_cache import hash_file
+
+logger = logging.getLogger(__name__)
+
+EDGE_BYTES = 64 * 1024
+TITLE_THRESHOLD = 0.8
+
+
+def hash_edges(filepath: Union[str, Path], edge_bytes: int = EDGE_BYTES) -> str:
+    """
+    BLAKE2b (128-bit) of the first and last ``edge_bytes`` of a file
+
+    Files no longer than two edges are hashed whole, so for them an equal
+    edge hash already means equal contents.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= 2 * edge_bytes:
+            hasher.update(f.read())
+        else:
+            hasher.update(f.read(edge_bytes))
+            f.seek(-edge_bytes, os.SEEK_END)
+            hasher.update(f.read(edge_bytes))
+    return hasher.hexdigest()
+
+
+class FileHashCache:
+    """Edge and full-content hashes per (path, size, mtime) in the library database"""
+
+    def __init__(self, db_path: str = "suno_library.db"):
+        """
+        Args:
+            db_path: Library database (the one holding ``songs``)
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict] = {}
+        self._dirty: Dict[str, Dict] = {}
+        self._init_db()
+        self.load()
+
+    def _init_db(self):
+        """Initialize hash cache schema"""
+        with self._get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    edge_hash TEXT,
+                    full_hash TEXT
+                )
+            ''')
+            conn.commit()
+
+    @contextmanager
+    def _get_connection(self):
+        """Get database connection with context manager"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def load(self) -> None:
+        """Read every cached row (one query; lookups are then in memory)"""
+        with self._get_connection() as conn:
+            self._rows = {row['path']: dict(row) for row in conn.execute('SELECT * FROM file_hashes')}
+
+    def _row(self, path: str, stat: os.stat_result) -> Dict:
+        """Cached row for the file as it is now (a fresh one if it changed)"""
+        row = self._rows.get(path)
+        if row is None or row['size'] != stat.st_size or row['mtime_ns'] != stat.st_mtime_ns:
+            row = {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                   'edge_hash': None, 'full_hash': None}
+            self._rows[path] = row
+        return row
+
+    def _hash(self, filepath: Path, stat: os.stat_result, column: str) -> str:
+        with self._lock:
+            row = self._row(str(filepath), stat)
+            if row[column] is None:
+                row[column] = hash_edges(filepath) if column == 'edge_hash' else hash_file(filepath)
+                self._dirty[row['path']] = row
+            return row[column]
+
+    def edge_hash(self, filepath: Path, stat: Optional[os.stat_result] = None) -> str:
+        return self._hash(filepath, stat or filepath.stat(), 'edge_hash')
+
+    def full_hash(self, filepath: Path, stat: Optional[os.stat_result] = None) -> str:
+        return self._hash(filepath, stat or filepath.stat(), 'full_hash')
+
+    def save(self) -> int:
+        """Write hashes computed since the last save; returns rows written"""
+        with self._lock:
+            rows = list(self._dirty.values())
+            self._dirty = {}
+        if rows:
+            with self._get_connection() as conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, edge_hash, full_hash)
+                    VALUES (:path, :size, :mtime_ns, :edge_hash, :full_hash)
+                ''', rows)
+                conn.commit()
+        return len(rows)
+
+    def prune(self) -> int:
+        """Drop rows for files that no longer exist"""
+        with self._lock:
+            missing = [path for path in self._rows if not os.path.exists(path)]
+            for path in missing:
+                self._rows.pop(path)
+                self._dirty.pop(path, None)
+        if missing:
+            with self._get_connection() as conn:
+                conn.executemany('DELETE FROM file_hashes WHERE path = ?', [(p,) for p in missing])
+                conn.commit()
+        return len(missing)
+
+
+class _Uncached:
+    """FileHashCache stand-in that always hashes"""
+
+    def edge_hash(self, filepath: Path, stat=None) -> str:
+        return hash_edges(filepath)
+
+    def full_hash(self, filepath: Path, stat=None) -> str:
+        return hash_file(filepath)
+
+    def save(self) -> int:
+        return 0
+
+
+def find_duplicate_files(paths: Iterable[Union[str, Path]],
+                         cache: Optional[FileHashCache] = None,
+                         stats: Optional[Dict[str, int]] = None) -> List[List[Path]]:
+    """
+    Groups of byte-identical files
+
+    Args:
+        paths: Files to compare (directories and empty files are ignored)
+        cache: Hash cache (None = hash without caching)
+        stats: If given, filled with the number of files that reached each
+            tier ('files', 'edge_hashed', 'full_hashed')
+
+    Returns:
+        Groups of two or more identical files, each sorted by path, ordered
+        by their first path
+    """
+    hashes = cache or _Uncached()
+    by_size: Dict[int, List[Tuple[Path, os.stat_result]]] = defaultdict(list)
+    for path in paths:
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if path.is_file() and stat.st_size > 0:
+            by_size[stat.st_size].append((path, stat))
+
+    counts = {'files': sum(len(g) for g in by_size.values()), 'edge_hashed': 0, 'full_hashed': 0}
+    groups = []
+    try:
+        for size, same_size in by_size.items():
+            if len(same_size) < 2:
+                continue
+            by_edge = defaultdict(list)
+            for path, stat in same_size:
+                by_edge[hashes.edge_hash(path, stat)].append((path, stat))
+            counts['edge_hashed'] += len(same_size)
+
+            for same_edges in by_edge.values():
+                if len(same_edges) < 2:
+                    continue
+                if size <= 2 * EDGE_BYTES:
+                    groups.append(sorted(path for path, _ in same_edges))
+                    continue
+                by_content = defaultdict(list)
+                for path, stat in same_edges:
+                    by_content[hashes.full_hash(path, stat)].append(path)
+                counts['full_hashed'] += len(same_edges)
+                groups.extend(sorted(g) for g in by_content.values() if len(g) > 1)
+    finally:
+        hashes.save()
+
+    if stats is not None:
+        stats.update(counts)
+    logger.info(f"Duplicate scan: {counts['files']} files, {counts['edge_hashed']} edge-hashed, "
+                f"{counts['full_hashed']} fully hashed, {len(groups)} duplicate groups")
+    return sorted(groups)
+
+
+def title_words(title: Optional[str]) -> frozenset:
+    """Lower-cased words of a title"""
+    return frozenset((title or '').lower().split())
+
+
+def title_similarity(title1: Optional[str], title2: Optional[str]) -> float:
+    """Jaccard similarity of two titles' word sets"""
+    words1, words2 = title_words(title1), title_words(title2)
+    if not words1 or not words2:
+        return 0.0
+    return len(words1 & words2) / len(words1 | words2)
+
+
+def find_similar_titles(titles: Dict[Hashable, str],
+                        threshold: float = TITLE_THRESHOLD,
+                        only: Optional[Iterable[Hashable]] = None,
+                        stats: Optional[Dict[str, int]] = None) -> List[Tuple[Hashable, Hashable, float]]:
+    """
+    Pairs of titles whose word-set Jaccard similarity is at least threshold
+
+    If J(x, y) >= t then x and y share at least ceil(t * |x|) words, so any
+    |x| - ceil(t * |x|) + 1 of x's words include a shared one. Each title is
+    blocked under that many of its rarest words; candidates are titles in a
+    common block whose lengths are compatible, and only they are scored.
+
+    Args:
+        titles: id -> title
+        threshold: Minimum similarity (0 < threshold <= 1)
+        only: Only return pairs involving these ids (e.g. songs just
+            added); None = all pairs
+        stats: If given, filled with 'titles', 'candidates' and 'pairs'
+
+    Returns:
+        (id_a, id_b, score) with ids in the order they appear in titles,
+        by descending score
+    """
+    words = {key: title_words(title) for key, title in titles.items()}
+    words = {key: w for key, w in words.items() if w}
+    position = {key: i for i, key in enumerate(words)}
+    frequency = Counter(word for w in words.values() for word in w)
+
+    def prefix(w):
+        size = len(w) - math.ceil(threshold * len(w) - 1e-9) + 1
+        return sorted(w, key=lambda word: (frequency[word], word))[:size]
+
+    prefixes = {key: prefix(w) for key, w in words.items()}
+    blocks: Dict[str, List[Hashable]] = defaultdict(list)
+    for key, words_prefix in prefixes.items():
+        for word in words_prefix:
+            blocks[word].append(key)
+
+    probes = words if only is None else [key for key in only if key in words]
+    pairs = {}
+    candidates = 0
+    for key in probes:
+        w = words[key]
+        seen = set()
+        for word in prefixes[key]:
+            for other in blocks[word]:
+                # Over all titles, each pair is probed from its first title only
+                if other == key or other in seen or (only is None and position[other] < position[key]):
+                    continue
+                seen.add(other)
+                pair = (key, other) if position[key] < position[other] else (other, key)
+                if pair in pairs:
+                    continue
+                w2 = words[other]
+                if min(len(w), len(w2)) < threshold * max(len(w), len(w2)) - 1e-9:
+                    continue
+                candidates += 1
+                score = len(w & w2) / len(w | w2)
+                if score >= threshold - 1e-9:
+                    pairs[pair] = score
+
+    if stats is not None:
+        stats.update({'titles': len(words), 'candidates': candidates, 'pairs': len(pairs)})
+    return sorted(((a, b, score) for (a, b), score in pairs.items()),
+                  key=lambda p: (-p[2], position[p[0]], position[p[1]]))
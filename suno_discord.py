@@ -30,6 +30,8 @@ try:
 except ImportError:
     pass
 
+from suno_loudness import playback_gain, read_tags
+
 
 class SunoBot(commands.Bot):
     """Discord bot for playing Suno songs"""
@@ -51,9 +53,14 @@ class SunoBot(commands.Bot):
         self.is_playing = False
         self.voice_client: Optional[discord.VoiceClient] = None
         self.db = None
+        self.replaygain = True
+        self.preamp_db = 0.0
         
         try:
             self.db = get_database()
+            config = get_config()
+            self.replaygain = config.get('player', 'replaygain', default=True)
+            self.preamp_db = config.get('player', 'replaygain_preamp_db', default=0.0)
         except Exception:
             pass
     
@@ -96,6 +103,14 @@ class SunoBot(commands.Bot):
         query = query.lower()
         return [s for s in self.get_songs() if query in s.get('title', '').lower()]
     
+    def track_gain(self, song: Dict) -> float:
+        """Linear ReplayGain factor (database columns first, then file tags)"""
+        if song.get('replaygain_gain') is not None:
+            gain_db, peak = song['replaygain_gain'], song.get('replaygain_peak')
+        else:
+            gain_db, peak = read_tags(song['local_audio_path'])
+        return playback_gain(gain_db, peak, self.preamp_db)
+    
     async def join_voice(self, ctx) -> bool:
         """Join user's voice channel"""
         if not ctx.author.voice:
@@ -121,8 +136,10 @@ class SunoBot(commands.Bot):
         if self.voice_client and self.voice_client.is_playing():
             self.voice_client.stop()
         
-        # Create audio source
+        # Create audio source, levelled by the song's ReplayGain
         source = discord.FFmpegPCMAudio(audio_path)
+        if self.replaygain:
+            source = discord.PCMVolumeTransformer(source, volume=self.track_gain(song))
         
         self.current_song = song
         self.is_playing = True
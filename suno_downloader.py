@@ -17,6 +17,7 @@ from urllib.parse import urlparse
 
 # Shared utilities
 from suno_utils import parse_duration, extract_song_id, safe_filename, DownloadError
+from suno_stream import stream_to_file
 
 # Configuration (optional, for retry settings)
 try:
@@ -180,9 +181,7 @@ class SunoDownloader:
                         response = self.session.get(url, stream=True, timeout=60)
                         response.raise_for_status()
                         
-                        with open(source_filepath, 'wb') as f:
-                            for chunk in response.iter_content(chunk_size=8192):
-                                f.write(chunk)
+                        stream_to_file(response, source_filepath, hash_name=None)
                         
                         logger.info(f"Downloaded: {source_filename}")
                         break  # Success, exit retry loop
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Suno Fingerprint - Landmark audio fingerprints in an inverted index
+
+Fingerprints follow the Shazam landmark scheme. The first minute of a
+track are decoded at 11 kHz and turned into a magnitude spectrogram. Its
+strongest local maxima (constellation peaks, about ten per second) are
+paired with a few peaks shortly after them, and each pair becomes a 24-bit
+hash of (anchor frequency, target frequency, time gap) stored with the
+anchor's time. Peaks survive re-encoding, volume changes and trimming, but
+two different generations of the same prompt share almost none.
+
+Hashes go into an inverted index (``fingerprint_hashes``, clustered by
+hash) in the library database. A lookup fetches the postings of a track's
+hashes and counts, per candidate track, matches that agree on the time
+offset between the two; unrelated tracks only produce scattered offsets.
+Cost per query depends on the number of matching postings, not the size
+of the library, and tracks are indexed one by one as files arrive.
+
+Usage:
+    from suno_fingerprint import FingerprintIndex, fingerprint_file
+
+    index = FingerprintIndex('suno_library.db')
+    result = fingerprint_file('song.mp3')
+    index.add(result['filepath'], result['hashes'], result['offsets'], result['signature'])
+    for path, score, offset in index.match(result['hashes'], result['offsets']):
+        ...
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+import importlib.util
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# librosa (for decoding) is imported by fingerprint_file only
+LIBROSA_AVAILABLE = importlib.util.find_spec('librosa') is not None
+
+FINGERPRINT_VERSION = 1
+
+SAMPLE_RATE = 11025
+N_FFT = 1024
+HOP_LENGTH = 256             # ~23 ms frames
+FREQ_BINS = 512              # bins 0-511 (9 bits); Nyquist is dropped
+FINGERPRINT_SECONDS = 60     # decoded from the start of each file
+
+PEAK_FREQ_RADIUS = 12        # a peak is the maximum of a 25 x 21 neighbourhood
+PEAK_TIME_RADIUS = 10
+PEAKS_PER_SECOND = 10        # strongest peaks kept per second of audio
+PEAK_FLOOR_DB = 60.0         # ignore peaks this far below the loudest
+
+FAN_OUT = 5                  # targets paired with each anchor
+TARGET_MAX_DT = 63           # frames (6 bits)
+TARGET_MAX_DF = 96           # bins
+
+MIN_MATCHES = 12             # time-aligned hashes needed for any match
+MIN_SCORE = 0.1              # share of aligned hashes; unrelated songs stay around 0.02
+MAX_HASH_TRACKS = 100        # hashes found in more tracks are skipped by lookups
+QUERY_CHUNK = 500            # hashes per IN (...) lookup
+
+
+def _max_filter(values, radius: int, axis: int):
+    """Running maximum over 2*radius+1 cells along one axis"""
+    pad = [(0, 0), (0, 0)]
+    pad[axis] = (radius, radius)
+    padded = np.pad(values, pad, constant_values=-np.inf)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * radius + 1, axis=axis)
+    return windows.max(axis=-1)
+
+
+def find_peaks(spectrogram_db) -> 'np.ndarray':
+    """
+    Constellation peaks of a (freq, time) dB spectrogram
+
+    Returns:
+        (N, 2) int array of (frame, bin), sorted by frame then bin
+    """
+    local_max = _max_filter(_max_filter(spectrogram_db, PEAK_FREQ_RADIUS, 0), PEAK_TIME_RADIUS, 1)
+    floor = spectrogram_db.max() - PEAK_FLOOR_DB
+    bins, frames = np.nonzero((spectrogram_db == local_max) & (spectrogram_db > floor))
+    if not len(frames):
+        return np.zeros((0, 2), dtype=np.int64)
+
+    # Keep the strongest few per second, so loud passages don't crowd out the rest
+    strength = spectrogram_db[bins, frames]
+    frames_per_second = SAMPLE_RATE / HOP_LENGTH
+    second = (frames / frames_per_second).astype(np.int64)
+    order = np.lexsort((-strength, second))
+    second = second[order]
+    starts = np.searchsorted(second, second, side='left')
+    keep = order[np.arange(len(order)) - starts < PEAKS_PER_SECOND]
+
+    peaks = np.stack([frames[keep], bins[keep]], axis=1)
+    return peaks[np.lexsort((peaks[:, 1], peaks[:, 0]))]
+
+
+def landmark_hashes(peaks) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Pair each anchor peak with up to FAN_OUT later peaks
+
+    Returns:
+        (hashes, offsets): uint32 hashes (anchor bin << 15 | target bin << 6
+        | frame gap) and the anchor frame of each, unique pairs only
+    """
+    hashes, offsets = [], []
+    frames, bins = peaks[:, 0], peaks[:, 1]
+    for i in range(len(peaks)):
+        paired = 0
+        for j in range(i + 1, len(peaks)):
+            dt = frames[j] - frames[i]
+            if dt > TARGET_MAX_DT:
+                break
+            if dt < 1 or abs(bins[j] - bins[i]) > TARGET_MAX_DF:
+                continue
+            hashes.append((int(bins[i]) << 15) | (int(bins[j]) << 6) | int(dt))
+            offsets.append(int(frames[i]))
+            paired += 1
+            if paired == FAN_OUT:
+                break
+    pairs = np.unique(np.array([hashes, offsets], dtype=np.int64).reshape(2, -1), axis=1)
+    return pairs[0].astype(np.uint32), pairs[1].astype(np.int32)
+
+
+def fingerprint(y, sr: int = SAMPLE_RATE) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Landmark (hashes, offsets) of mono audio sampled at SAMPLE_RATE"""
+    if sr != SAMPLE_RATE:
+        raise ValueError(f"fingerprint() expects {SAMPLE_RATE} Hz audio, got {sr}")
+    y = np.asarray(y, dtype=np.float32)
+    if len(y) < N_FFT:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int32)
+    frames = np.lib.stride_tricks.sliding_window_view(y, N_FFT)[::HOP_LENGTH]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(N_FFT).astype(np.float32), axis=1))
+    spectrogram_db = 20 * np.log10(spectrum[:, :FREQ_BINS].T + 1e-6)
+    return landmark_hashes(find_peaks(spectrogram_db))
+
+
+def file_signature(filepath: Union[str, Path]) -> str:
+    """Size, mtime and fingerprint version: a changed value means re-index"""
+    stat = os.stat(filepath)
+    return f"{stat.st_size}:{stat.st_mtime_ns}:v{FINGERPRINT_VERSION}"
+
+
+def fingerprint_file(filepath: Union[str, Path], duration: Optional[float] = FINGERPRINT_SECONDS) -> Dict:
+    """
+    Decode the start of a file and fingerprint it (module level so it can
+    run in a worker process)
+
+    Returns:
+        Dict with filepath, hashes, offsets and signature, or filepath and
+        error
+    """
+    filepath = str(filepath)
+    if not (NUMPY_AVAILABLE and LIBROSA_AVAILABLE):
+        return {'filepath': filepath, 'error': 'numpy and librosa required'}
+    import librosa
+    try:
+        signature = file_signature(filepath)
+        y, _ = librosa.load(filepath, sr=SAMPLE_RATE, mono=True, duration=duration)
+        hashes, offsets = fingerprint(y)
+    except Exception as e:
+        logger.error(f"Fingerprinting failed for {filepath}: {e}")
+        return {'filepath': filepath, 'error': str(e)}
+    return {'filepath': filepath, 'hashes': hashes, 'offsets': offsets, 'signature': signature}
+
+
+class FingerprintIndex:
+    """Inverted index of landmark hashes in the library database"""
+
+    def __init__(self, db_path: str = "suno_library.db"):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize fingerprint schema"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS fingerprint_tracks (
+                    track_id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    signature TEXT,
+                    hash_count INTEGER,
+                    hashes BLOB,
+                    offsets BLOB,
+                    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            # Postings clustered by hash: a lookup is one b-tree range
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS fingerprint_hashes (
+                    hash INTEGER NOT NULL,
+                    track_id INTEGER NOT NULL,
+                    offset INTEGER NOT NULL,
+                    PRIMARY KEY (hash, track_id, offset)
+                ) WITHOUT ROWID
+            ''')
+            # Tracks per hash, so lookups can skip hashes common to many
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS fingerprint_hash_tracks (
+                    hash INTEGER PRIMARY KEY,
+                    tracks INTEGER NOT NULL
+                )
+            ''')
+            conn.commit()
+
+    @contextmanager
+    def _get_connection(self):
+        """Get database connection with context manager"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def __len__(self) -> int:
+        with self._get_connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM fingerprint_tracks').fetchone()[0]
+
+    def signatures(self) -> Dict[str, str]:
+        """path -> file_signature() at the time it was indexed"""
+        with self._get_connection() as conn:
+            return {row['path']: row['signature']
+                    for row in conn.execute('SELECT path, signature FROM fingerprint_tracks')}
+
+    @staticmethod
+    def _delete_track(cursor, row) -> None:
+        hashes = np.unique(np.frombuffer(row['hashes'], dtype=np.uint32)).tolist()
+        cursor.executemany('DELETE FROM fingerprint_hashes WHERE hash = ? AND track_id = ?',
+                           [(h, row['track_id']) for h in hashes])
+        cursor.executemany('UPDATE fingerprint_hash_tracks SET tracks = tracks - 1 WHERE hash = ?',
+                           [(h,) for h in hashes])
+        cursor.execute('DELETE FROM fingerprint_tracks WHERE track_id = ?', (row['track_id'],))
+
+    def add(self, path: Union[str, Path], hashes, offsets,
+            signature: Optional[str] = None) -> int:
+        """
+        Index a track's fingerprint, replacing any earlier one for the path
+
+        Returns:
+            The track's id in the index
+        """
+        hashes = np.asarray(hashes, dtype=np.uint32)
+        offsets = np.asarray(offsets, dtype=np.int32)
+        with self._lock, self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT track_id, hashes FROM fingerprint_tracks WHERE path = ?', (str(path),))
+            old = cursor.fetchone()
+            if old:
+                self._delete_track(cursor, old)
+            cursor.execute('''
+                INSERT INTO fingerprint_tracks (path, signature, hash_count, hashes, offsets)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (str(path), signature, len(hashes), hashes.tobytes(), offsets.tobytes()))
+            track_id = cursor.lastrowid
+            cursor.executemany('INSERT OR IGNORE INTO fingerprint_hashes (hash, track_id, offset) VALUES (?, ?, ?)',
+                               zip(hashes.tolist(), [track_id] * len(hashes), offsets.tolist()))
+            cursor.executemany('''
+                INSERT INTO fingerprint_hash_tracks (hash, tracks) VALUES (?, 1)
+                ON CONFLICT(hash) DO UPDATE SET tracks = tracks + 1
+            ''', [(h,) for h in np.unique(hashes).tolist()])
+            conn.commit()
+        return track_id
+
+    def remove(self, path: Union[str, Path]) -> bool:
+        """Drop a track from the index"""
+        with self._lock, self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT track_id, hashes FROM fingerprint_tracks WHERE path = ?', (str(path),))
+            row = cursor.fetchone()
+            if row:
+                self._delete_track(cursor, row)
+                conn.commit()
+        return row is not None
+
+    def prune(self) -> int:
+        """Drop tracks whose files no longer exist"""
+        missing = [path for path in self.signatures() if not os.path.exists(path)]
+        for path in missing:
+            self.remove(path)
+        return len(missing)
+
+    def fingerprint_of(self, path: Union[str, Path]) -> Optional[Tuple['np.ndarray', 'np.ndarray']]:
+        """Stored (hashes, offsets) of an indexed track"""
+        with self._get_connection() as conn:
+            row = conn.execute('SELECT hashes, offsets FROM fingerprint_tracks WHERE path = ?',
+                               (str(path),)).fetchone()
+        if not row:
+            return None
+        return np.frombuffer(row['hashes'], dtype=np.uint32), np.frombuffer(row['offsets'], dtype=np.int32)
+
+    def match(self, hashes, offsets, threshold: float = MIN_SCORE, min_matches: int = MIN_MATCHES,
+              exclude: Iterable[str] = (),
+              max_hash_tracks: int = MAX_HASH_TRACKS) -> List[Tuple[Path, float, float]]:
+        """
+        Indexed tracks that share time-aligned landmarks with a fingerprint
+
+        Args:
+            hashes, offsets: Query fingerprint (see fingerprint())
+            threshold: Minimum score
+            min_matches: Aligned hashes required for a candidate
+            exclude: Paths to leave out (e.g. the query's own)
+            max_hash_tracks: Skip hashes shared by more tracks than this
+                (drum hits, common bass notes); they cost the most postings
+                and say the least about identity
+
+        Returns:
+            (path, score, offset_seconds) by descending score; score is the
+            share of the smaller fingerprint's hashes that line up (the
+            query's too-common hashes are not counted), and offset_seconds
+            is where the query starts within the match
+        """
+        hashes = np.asarray(hashes, dtype=np.int64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if not len(hashes):
+            return []
+        order = np.argsort(hashes, kind='stable')
+        query_hashes, query_offsets = hashes[order], offsets[order]
+        unique_hashes = np.unique(query_hashes).tolist()
+
+        found, common = [], []
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # plain tuples convert to numpy much faster
+            for i in range(0, len(unique_hashes), QUERY_CHUNK):
+                chunk = unique_hashes[i:i + QUERY_CHUNK]
+                common.extend(h for (h,) in cursor.execute(
+                    f"SELECT hash FROM fingerprint_hash_tracks "
+                    f"WHERE hash IN ({','.join('?' * len(chunk))}) AND tracks > ?",
+                    chunk + [max_hash_tracks]))
+                found.extend(cursor.execute(
+                    f"SELECT p.hash, p.track_id, p.offset FROM fingerprint_hash_tracks d "
+                    f"JOIN fingerprint_hashes p ON p.hash = d.hash "
+                    f"WHERE d.hash IN ({','.join('?' * len(chunk))}) AND d.tracks <= ?",
+                    chunk + [max_hash_tracks]).fetchall())
+            if not found:
+                return []
+            posting = np.array(found, dtype=np.int64)
+            # Skipped hashes could not have matched: leave them out of the score
+            usable = len(query_hashes) - int(np.isin(query_hashes, common).sum())
+
+            # Pair every posting with every query occurrence of its hash
+            lo = np.searchsorted(query_hashes, posting[:, 0], side='left')
+            hi = np.searchsorted(query_hashes, posting[:, 0], side='right')
+            repeat = hi - lo
+            query_index = np.repeat(lo - np.cumsum(repeat) + repeat, repeat) + np.arange(repeat.sum())
+            track_ids = np.repeat(posting[:, 1], repeat)
+            deltas = np.repeat(posting[:, 2], repeat) - query_offsets[query_index]
+
+            # Count per (track, offset); two binnings so a +-1 frame jitter
+            # always lands in one bin
+            best: Dict[int, Tuple[int, int]] = {}
+            for shift in (0, 1):
+                keys = (track_ids << 32) | ((deltas + shift) // 2 + (1 << 31))
+                keys, counts = np.unique(keys, return_counts=True)
+                strong = counts >= min_matches
+                for key, count in zip(keys[strong].tolist(), counts[strong].tolist()):
+                    track_id, delta_bin = key >> 32, (key & 0xFFFFFFFF) - (1 << 31)
+                    if count > best.get(track_id, (0, 0))[0]:
+                        best[track_id] = (count, 2 * delta_bin - shift)
+
+            candidates = list(best)
+            rows = {}
+            for i in range(0, len(candidates), QUERY_CHUNK):
+                chunk = candidates[i:i + QUERY_CHUNK]
+                rows.update((row['track_id'], row) for row in conn.execute(
+                    f"SELECT track_id, path, hash_count FROM fingerprint_tracks "
+                    f"WHERE track_id IN ({','.join('?' * len(chunk))})", chunk))
+
+        exclude = {str(p) for p in exclude}
+        matches = []
+        for track_id in candidates:
+            row = rows.get(track_id)
+            if row is None or row['path'] in exclude:
+                continue
+            count, delta = best[track_id]
+            score = min(count / max(min(usable, row['hash_count']), 1), 1.0)
+            if score >= threshold:
+                matches.append((Path(row['path']), score, delta * HOP_LENGTH / SAMPLE_RATE))
+        return sorted(matches, key=lambda m: -m[1])
+
+    def find_duplicates(self, threshold: float = MIN_SCORE, paths: Optional[Iterable[Union[str, Path]]] = None,
+                        min_matches: int = MIN_MATCHES) -> List[Tuple[Path, Path, float]]:
+        """
+        Pairs of indexed tracks whose fingerprints line up
+
+        Args:
+            threshold: Minimum score (see match())
+            paths: Only look for matches of these tracks (e.g. new
+                downloads); None = every indexed track
+            min_matches: Aligned hashes required for a candidate
+
+        Returns:
+            (path_a, path_b, score) with path_a < path_b, by descending score
+        """
+        if paths is None:
+            paths = list(self.signatures())
+        pairs: Dict[Tuple[str, str], float] = {}
+        for path in paths:
+            stored = self.fingerprint_of(path)
+            if stored is None:
+                continue
+            for other, score, _ in self.match(*stored, threshold, min_matches, exclude=[str(path)]):
+                key = tuple(sorted((str(path), str(other))))
+                pairs[key] = max(score, pairs.get(key, 0.0))
+        return sorted(((Path(a), Path(b), score) for (a, b), score in pairs.items()),
+                      key=lambda p: (-p[2], str(p[0])))
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Suno HTTP Cache - Disk-backed response cache for API metadata calls
+
+Responses are keyed by method, URL and query parameters and stored in a
+small SQLite database with an expiry time. Fresh entries are served without
+touching the network; stale entries are revalidated with If-None-Match /
+If-Modified-Since so an unchanged resource costs a 304 instead of a body.
+
+The cache also remembers which of several candidate endpoints answered
+for a given kind of lookup, so callers can try that one first next time.
+
+Usage:
+    from suno_http_cache import get_http_cache
+
+    cache = get_http_cache()
+    response = cache.fetch(send, 'GET', url, params=params, ttl=3600)
+    cache.log_summary()
+"""
+
+import json
+import time
+import sqlite3
+import inspect
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# Configuration (optional, for cache location and TTLs)
+try:
+    from suno_core import get_config
+    CONFIG_AVAILABLE = True
+except ImportError:
+    CONFIG_AVAILABLE = False
+    get_config = None
+
+DEFAULT_CACHE_PATH = ".suno_cache/http_cache.db"
+
+# Only these are replayed from cache; the rest describe the old connection
+_KEPT_HEADERS = ('content-type', 'etag', 'last-modified', 'cache-control')
+
+
+class CachedResponse:
+    """Just enough of requests.Response for callers of a cached GET"""
+
+    from_cache = True
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise IOError(f"{self.status_code} for cached {self.url}")
+
+
+def cache_key(method: str, url: str, params: Optional[Dict] = None,
+              scope: str = '') -> str:
+    """
+    Stable key for a request (parameter order does not matter)
+
+    ``scope`` separates otherwise identical requests made with different
+    credentials, e.g. two accounts' liked feeds.
+    """
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    key = f"{method.upper()} {url}?{query}" if query else f"{method.upper()} {url}"
+    return f"{scope}:{key}" if scope else key
+
+
+class HTTPCache:
+    """SQLite-backed response cache with TTLs and conditional revalidation"""
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, default_ttl: float = 3600.0,
+                 max_body_bytes: int = 2 * 1024 * 1024):
+        """
+        Args:
+            db_path: Cache database file
+            default_ttl: Seconds an entry is served without revalidation
+            max_body_bytes: Larger responses are not cached
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.default_ttl = default_ttl
+        self.max_body_bytes = max_body_bytes
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0}
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize cache schema"""
+        with self._get_connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    url TEXT,
+                    status INTEGER,
+                    headers TEXT,
+                    body BLOB,
+                    stored_at REAL,
+                    expires_at REAL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS endpoint_memo (
+                    kind TEXT PRIMARY KEY,
+                    template TEXT,
+                    updated_at REAL
+                )
+            ''')
+            conn.commit()
+
+    @contextmanager
+    def _get_connection(self):
+        """Get database connection with context manager"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Stored entry for a key (fresh or stale), or None"""
+        with self._get_connection() as conn:
+            row = conn.execute('SELECT * FROM responses WHERE key = ?', (key,)).fetchone()
+        if not row:
+            return None
+        entry = dict(row)
+        entry['headers'] = json.loads(entry['headers'] or '{}')
+        return entry
+
+    def store(self, key: str, response: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Cache a 200 response
+
+        Returns:
+            True if stored (responses marked no-store or too large are not)
+        """
+        if response.status_code != 200:
+            return False
+        cache_control = (response.headers.get('cache-control') or '').lower()
+        if 'no-store' in cache_control or len(response.content) > self.max_body_bytes:
+            return False
+
+        now = time.time()
+        headers = {h: response.headers[h] for h in _KEPT_HEADERS if response.headers.get(h)}
+        with self._get_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO responses (key, url, status, headers, body, stored_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (key, response.url, response.status_code, json.dumps(headers),
+                  response.content, now, now + (self.default_ttl if ttl is None else ttl)))
+            conn.commit()
+        self._count('stored')
+        return True
+
+    def touch(self, key: str, ttl: Optional[float] = None) -> None:
+        """Extend a stale entry's life after a 304"""
+        now = time.time()
+        with self._get_connection() as conn:
+            conn.execute('UPDATE responses SET stored_at = ?, expires_at = ? WHERE key = ?',
+                         (now, now + (self.default_ttl if ttl is None else ttl), key))
+            conn.commit()
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """Drop one entry (or everything when key is None)"""
+        with self._get_connection() as conn:
+            if key is None:
+                cursor = conn.execute('DELETE FROM responses')
+            else:
+                cursor = conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            conn.commit()
+            return cursor.rowcount
+
+    def purge_expired(self, older_than: float = 7 * 86400) -> int:
+        """Delete entries that expired more than ``older_than`` seconds ago"""
+        with self._get_connection() as conn:
+            cursor = conn.execute('DELETE FROM responses WHERE expires_at < ?',
+                                  (time.time() - older_than,))
+            conn.commit()
+            return cursor.rowcount
+
+    @staticmethod
+    def _replay(entry: Dict) -> CachedResponse:
+        return CachedResponse(entry['url'], entry['status'], entry['headers'], entry['body'])
+
+    def fetch(self, send: Callable[..., Any], method: str, url: str,
+              params: Optional[Dict] = None, ttl: Optional[float] = None,
+              scope: str = '', **kwargs) -> Any:
+        """
+        Serve a request from cache, revalidating or fetching as needed
+
+        Args:
+            send: ``send(method, url, params=..., headers=..., **kwargs)``
+                performing the real request (e.g. a rate-limited session call)
+            method: HTTP method (only GET is cached; others pass through)
+            url: Request URL
+            params: Query parameters
+            ttl: Freshness lifetime in seconds (0 = always revalidate)
+            scope: Credential scope for the key (see cache_key)
+
+        Returns:
+            The live response, or a CachedResponse
+        """
+        if method.upper() != 'GET':
+            return send(method, url, params=params, **kwargs)
+
+        key = cache_key(method, url, params, scope)
+        entry = self.get(key)
+        if entry and entry['expires_at'] > time.time():
+            self._count('hits')
+            return self._replay(entry)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry:
+            if entry['headers'].get('etag'):
+                headers['If-None-Match'] = entry['headers']['etag']
+            if entry['headers'].get('last-modified'):
+                headers['If-Modified-Since'] = entry['headers']['last-modified']
+
+        response = send(method, url, params=params, headers=headers or None, **kwargs)
+
+        if entry and response.status_code == 304:
+            self._count('revalidated')
+            self.touch(key, ttl)
+            return self._replay(entry)
+
+        self._count('misses')
+        self.store(key, response, ttl)
+        return response
+
+    # ------------------------------------------------------------------
+    # Endpoint memo
+    # ------------------------------------------------------------------
+
+    def preferred_endpoint(self, kind: str) -> Optional[str]:
+        """Template of the endpoint that last answered for this kind of lookup"""
+        with self._get_connection() as conn:
+            row = conn.execute('SELECT template FROM endpoint_memo WHERE kind = ?', (kind,)).fetchone()
+        return row['template'] if row else None
+
+    def remember_endpoint(self, kind: str, template: str) -> None:
+        """Record which endpoint template answered"""
+        with self._get_connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO endpoint_memo (kind, template, updated_at) VALUES (?, ?, ?)',
+                         (kind, template, time.time()))
+            conn.commit()
+
+    # ------------------------------------------------------------------
+    # Monitoring
+    # ------------------------------------------------------------------
+
+    def hit_rate(self) -> float:
+        """Share of GETs answered without downloading a body (0-1)"""
+        with self._lock:
+            served = self.stats['hits'] + self.stats['revalidated']
+            total = served + self.stats['misses']
+        return served / total if total else 0.0
+
+    def log_summary(self) -> None:
+        """Log cache effectiveness for this process"""
+        with self._lock:
+            stats = dict(self.stats)
+        logger.info(
+            f"HTTP cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+            f"{stats['misses']} misses ({self.hit_rate():.0%} served from cache)"
+        )
+
+
+# Singleton instance
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HTTPCache:
+    """Get the process-wide shared HTTP cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = {}
+            if CONFIG_AVAILABLE and get_config:
+                try:
+                    settings = get_config().get('api_cache', default={}) or {}
+                except Exception:
+                    settings = {}
+            accepted = inspect.signature(HTTPCache).parameters
+            _cache = HTTPCache(**{k: v for k, v in settings.items() if k in accepted})
+        return _cache
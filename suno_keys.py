@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Suno Keys - Batch musical key estimation from chroma vectors
+
+Each song's mean chroma vector is correlated (Pearson) with all 24 rotated
+major and minor key profiles at once. Correlating N songs is one
+(N x 12) @ (12 x 24) matrix product after z-normalising the rows, so
+re-keying a whole library from stored chroma is a single NumPy call.
+
+Two profile sets are available:
+    - krumhansl: Krumhansl-Kessler probe-tone ratings
+    - temperley: Temperley's Kostka-Payne corpus profiles (sharper, tends to
+      do better on tonal pop)
+
+Usage:
+    from suno_keys import detect_keys
+
+    for key in detect_keys(chroma_means):           # (N, 12)
+        print(key['key'], key['camelot'], key['key_confidence'])
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from suno_similarity import camelot_number
+
+PITCH_NAMES = ('C', 'C#/Db', 'D', 'D#/Eb', 'E', 'F', 'F#/Gb', 'G', 'G#/Ab', 'A', 'A#/Bb', 'B')
+
+# (major, minor) profiles, tonic first
+PROFILES = {
+    'krumhansl': (
+        (6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88),
+        (6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17),
+    ),
+    'temperley': (
+        (0.748, 0.060, 0.488, 0.082, 0.670, 0.460, 0.096, 0.715, 0.104, 0.366, 0.057, 0.400),
+        (0.712, 0.084, 0.474, 0.618, 0.049, 0.460, 0.105, 0.747, 0.404, 0.067, 0.133, 0.330),
+    ),
+}
+
+DEFAULT_PROFILE = 'temperley'
+
+_matrices = {}
+
+
+def _zscore_rows(matrix):
+    """Centre each row and scale it to unit length (dot product = Pearson r)"""
+    centred = matrix - matrix.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centred, axis=1, keepdims=True)
+    return centred / np.where(norms > 0, norms, 1.0)
+
+
+def profile_matrix(profile: str = DEFAULT_PROFILE):
+    """
+    (24, 12) z-normalised key templates
+
+    Row k < 12 is the major key with tonic k, row 12 + k the minor key.
+    """
+    if profile not in _matrices:
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown key profile: {profile}")
+        major, minor = (np.asarray(p, dtype=np.float64) for p in PROFILES[profile])
+        rows = [np.roll(major, k) for k in range(12)] + [np.roll(minor, k) for k in range(12)]
+        _matrices[profile] = _zscore_rows(np.stack(rows))
+    return _matrices[profile]
+
+
+def key_scores(chroma, profile: str = DEFAULT_PROFILE):
+    """
+    Correlation of each chroma vector with each of the 24 keys
+
+    Args:
+        chroma: (N, 12) or (12,) mean chroma vectors
+        profile: Key of PROFILES
+
+    Returns:
+        (N, 24) Pearson correlations (rows of silence score 0 everywhere)
+    """
+    chroma = np.atleast_2d(np.asarray(chroma, dtype=np.float64))
+    if chroma.shape[1] != 12:
+        raise ValueError(f"Expected 12 chroma bins, got {chroma.shape[1]}")
+    return _zscore_rows(chroma) @ profile_matrix(profile).T
+
+
+def key_label(index: int) -> Tuple[int, str]:
+    """Key row index -> (tonic pitch class, mode)"""
+    return index % 12, 'major' if index < 12 else 'minor'
+
+
+def detect_keys(chroma, profile: str = DEFAULT_PROFILE) -> List[Dict]:
+    """
+    Best key for each chroma vector
+
+    Returns:
+        One dict per row with 'key' (e.g. 'A minor'), 'mode', 'camelot'
+        (e.g. '8A') and 'key_confidence' (the winning correlation, -1..1)
+    """
+    scores = key_scores(chroma, profile)
+    best = scores.argmax(axis=1)
+    return [describe_key(int(index), float(scores[row, index])) for row, index in enumerate(best)]
+
+
+def describe_key(index: int, confidence: float) -> Dict:
+    """Result dict for key row ``index`` (see detect_keys)"""
+    tonic, mode = key_label(index)
+    return {
+        'key': f"{PITCH_NAMES[tonic]} {mode}",
+        'mode': mode,
+        'camelot': f"{camelot_number(tonic, mode)}{'A' if mode == 'minor' else 'B'}",
+        'key_confidence': confidence,
+    }
+
+
+def detect_key(chroma_mean: Sequence[float], profile: str = DEFAULT_PROFILE) -> Dict:
+    """detect_keys() for a single vector"""
+    return detect_keys([chroma_mean], profile)[0]
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Suno Loudness - EBU R128 measurement and ReplayGain tagging
+
+Integrated loudness follows ITU-R BS.1770-4 / EBU R128: the signal is
+K-weighted (a high-shelf and a high-pass biquad), mean square power is taken
+over 400 ms blocks every 100 ms, and the blocks are gated twice (absolute
+at -70 LUFS, then 10 LU below the loudness of the blocks that passed). True
+peak is the largest absolute value of the signal oversampled 4x.
+
+Instead of re-encoding files to a target level, the measurement is written
+as tags that players apply at playback time:
+    - ReplayGain 2.0 (REPLAYGAIN_TRACK_GAIN/PEAK, -18 LUFS reference) in
+      ID3 (MP3, WAV), Vorbis comments (FLAC, Ogg Vorbis) and MP4 atoms
+    - R128_TRACK_GAIN (Q7.8 dB relative to -23 LUFS) in Ogg Opus, whose
+      spec replaces ReplayGain tags with it
+
+Usage:
+    from suno_loudness import measure_file, playback_gain
+
+    result = measure_file('song.mp3')      # measures and tags in place
+    volume *= playback_gain(result['replaygain_gain'], result['replaygain_peak'])
+"""
+
+import os
+import math
+import logging
+import importlib.util
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    from scipy.signal import lfilter, resample_poly
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# librosa (for decoding) is imported by measure_file only: the players
+# import this module just to read tags and compute gains
+LIBROSA_AVAILABLE = importlib.util.find_spec('librosa') is not None
+
+try:
+    import mutagen
+    from mutagen.id3 import ID3, TXXX
+    from mutagen.mp4 import MP4Tags, MP4FreeForm
+    from mutagen.oggopus import OggOpus
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
+REFERENCE_LUFS = -18.0       # ReplayGain 2.0
+R128_REFERENCE_LUFS = -23.0  # EBU R128 / Opus R128_* tags
+
+BLOCK_SECONDS = 0.4
+BLOCK_STEP_SECONDS = 0.1     # 75% overlap
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+TRUE_PEAK_OVERSAMPLE = 4
+TRUE_PEAK_BLOCK = 1 << 18    # input samples oversampled at a time
+
+TAG_GAIN = 'REPLAYGAIN_TRACK_GAIN'
+TAG_PEAK = 'REPLAYGAIN_TRACK_PEAK'
+TAG_REFERENCE = 'REPLAYGAIN_REFERENCE_LOUDNESS'
+TAG_R128_GAIN = 'R128_TRACK_GAIN'
+MP4_TAG_PREFIX = '----:com.apple.iTunes:'
+
+
+def k_weighting(sr: int):
+    """
+    BS.1770 K-weighting as two (b, a) biquads for sample rate ``sr``
+
+    The filters are specified at 48 kHz; these are the analogue prototypes
+    re-derived through the bilinear transform, so any rate works.
+    """
+    # Stage 1: high shelf (+4 dB above ~1.7 kHz, head diffraction)
+    f0, gain_db, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = math.tan(math.pi * f0 / sr)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = ([(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0],
+             [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0])
+
+    # Stage 2: RLB high-pass (~38 Hz)
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = math.tan(math.pi * f0 / sr)
+    a0 = 1 + k / q + k * k
+    highpass = ([1.0, -2.0, 1.0],
+                [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0])
+    return shelf, highpass
+
+
+def _as_channels(y):
+    """(channels, samples) float64 view of a mono or multichannel signal"""
+    return np.atleast_2d(np.asarray(y, dtype=np.float64))
+
+
+def integrated_loudness(y, sr: int) -> float:
+    """
+    Gated integrated loudness in LUFS
+
+    Args:
+        y: (samples,) mono or (channels, samples) signal, full scale 1.0
+        sr: Sample rate
+
+    Returns:
+        LUFS, or -inf when nothing passes the absolute gate (silence, or
+        shorter than one 400 ms block)
+    """
+    y = _as_channels(y)
+    block, step = int(round(BLOCK_SECONDS * sr)), int(round(BLOCK_STEP_SECONDS * sr))
+    if y.shape[1] < block:
+        return float('-inf')
+
+    (b1, a1), (b2, a2) = k_weighting(sr)
+    weighted = lfilter(b2, a2, lfilter(b1, a1, y, axis=1), axis=1)
+
+    # Per-channel block mean squares from one cumulative sum
+    energy = np.zeros((y.shape[0], y.shape[1] + 1))
+    np.cumsum(weighted ** 2, axis=1, out=energy[:, 1:])
+    starts = np.arange(0, y.shape[1] - block + 1, step)
+    power = ((energy[:, starts + block] - energy[:, starts]) / block).sum(axis=0)
+
+    with np.errstate(divide='ignore'):
+        loudness = -0.691 + 10 * np.log10(power)
+    gated = power[loudness > ABSOLUTE_GATE_LUFS]
+    if not gated.size:
+        return float('-inf')
+    relative_gate = -0.691 + 10 * math.log10(gated.mean()) + RELATIVE_GATE_LU
+    gated = power[(loudness > ABSOLUTE_GATE_LUFS) & (loudness > relative_gate)]
+    return float(-0.691 + 10 * math.log10(gated.mean()))
+
+
+def true_peak(y, sr: int) -> float:
+    """
+    Largest inter-sample peak (linear, 1.0 = full scale)
+
+    Oversamples 4x below 96 kHz (2x at higher rates) in blocks, each padded
+    with enough neighbouring samples that the resampling filter sees the
+    same context it would over the whole signal.
+    """
+    y = _as_channels(y)
+    if not y.size:
+        return 0.0
+    factor = TRUE_PEAK_OVERSAMPLE if sr < 96000 else 2
+    margin = 64
+    peak = float(np.abs(y).max())
+    n = y.shape[1]
+    for start in range(0, n, TRUE_PEAK_BLOCK):
+        lo, hi = max(0, start - margin), min(n, start + TRUE_PEAK_BLOCK + margin)
+        upsampled = resample_poly(y[:, lo:hi], factor, 1, axis=1)
+        keep = upsampled[:, (start - lo) * factor:(min(n, start + TRUE_PEAK_BLOCK) - lo) * factor]
+        peak = max(peak, float(np.abs(keep).max()))
+    return peak
+
+
+def replaygain_gain(loudness_lufs: float, reference: float = REFERENCE_LUFS) -> float:
+    """Track gain in dB that brings ``loudness_lufs`` to the reference"""
+    return reference - loudness_lufs
+
+
+def playback_gain(gain_db: Optional[float], peak: Optional[float] = None,
+                  preamp_db: float = 0.0, prevent_clipping: bool = True) -> float:
+    """
+    Linear volume factor for a track's ReplayGain values
+
+    Untagged tracks (``gain_db`` is None) play at 1.0. With
+    ``prevent_clipping``, the factor is capped so the true peak stays at or
+    below full scale.
+    """
+    if gain_db is None:
+        return 1.0
+    factor = 10 ** ((gain_db + preamp_db) / 20)
+    if prevent_clipping and peak:
+        factor = min(factor, 1.0 / peak)
+    return factor
+
+
+def file_signature(filepath: Union[str, Path]) -> str:
+    """'size:mtime_ns' of a file, recorded after tagging to skip unchanged files"""
+    stat = os.stat(filepath)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _tag_values(gain_db: float, peak: float) -> Dict[str, str]:
+    return {TAG_GAIN: f"{gain_db:+.2f} dB", TAG_PEAK: f"{peak:.6f}",
+            TAG_REFERENCE: f"{REFERENCE_LUFS:.2f} LUFS"}
+
+
+def write_tags(filepath: Union[str, Path], loudness_lufs: float, peak: float) -> bool:
+    """
+    Write ReplayGain (or, for Opus, R128) track tags in place
+
+    Only the tag block is rewritten; the audio stream is untouched.
+    """
+    if not MUTAGEN_AVAILABLE:
+        logger.warning("Mutagen not available - skipping ReplayGain tags")
+        return False
+
+    audio = mutagen.File(str(filepath))
+    if audio is None:
+        logger.debug(f"Unsupported format for tagging: {filepath}")
+        return False
+    if audio.tags is None:
+        audio.add_tags()
+    tags = audio.tags
+
+    if isinstance(audio, OggOpus):
+        q78 = int(round((R128_REFERENCE_LUFS - loudness_lufs) * 256))
+        tags[TAG_R128_GAIN] = [str(max(-32768, min(32767, q78)))]
+    else:
+        for name, value in _tag_values(replaygain_gain(loudness_lufs), peak).items():
+            if isinstance(tags, ID3):
+                tags.delall(f"TXXX:{name}")
+                tags.add(TXXX(encoding=3, desc=name, text=[value]))
+            elif isinstance(tags, MP4Tags):
+                tags[MP4_TAG_PREFIX + name.lower()] = [MP4FreeForm(value.encode('utf-8'))]
+            else:
+                tags[name] = [value]
+    audio.save()
+    return True
+
+
+def _parse_db(value) -> Optional[float]:
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', 'replace')
+    try:
+        return float(str(value).strip().split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def read_tags(filepath: Union[str, Path]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    (gain dB at the -18 LUFS reference, linear peak) from a file's tags
+
+    R128_TRACK_GAIN is converted to the ReplayGain reference. Returns
+    (None, None) for untagged or unreadable files.
+    """
+    if not MUTAGEN_AVAILABLE:
+        return None, None
+    try:
+        audio = mutagen.File(str(filepath))
+    except Exception:
+        return None, None
+    if audio is None or audio.tags is None:
+        return None, None
+
+    values = {}
+    for key, value in audio.tags.items():
+        name = key.upper()
+        if name.startswith('TXXX:'):
+            name = name[5:]
+        elif name.startswith(MP4_TAG_PREFIX.upper()):
+            name = name[len(MP4_TAG_PREFIX):]
+        if isinstance(value, list):
+            value = value[0] if value else None
+        elif hasattr(value, 'text'):
+            value = value.text[0] if value.text else None
+        values[name] = value
+
+    if TAG_GAIN in values:
+        peak = _parse_db(values.get(TAG_PEAK))
+        return _parse_db(values[TAG_GAIN]), peak
+    if TAG_R128_GAIN in values:
+        q78 = _parse_db(values[TAG_R128_GAIN])
+        if q78 is not None:
+            return q78 / 256 + (REFERENCE_LUFS - R128_REFERENCE_LUFS), None
+    return None, None
+
+
+def measure_file(filepath: Union[str, Path], tag: bool = True) -> Dict:
+    """
+    Measure one file and (optionally) tag it
+
+    Module-level so it can run in a process pool.
+
+    Returns:
+        Dict with filepath, loudness_lufs, true_peak_dbtp, replaygain_gain,
+        replaygain_peak, tagged and signature (taken after tagging), or
+        filepath and error
+    """
+    result = {'filepath': str(filepath)}
+    if not (SCIPY_AVAILABLE and LIBROSA_AVAILABLE):
+        result['error'] = 'numpy, scipy and librosa are required for loudness measurement'
+        return result
+
+    try:
+        import librosa
+        y, sr = librosa.load(str(filepath), sr=None, mono=False)
+        loudness = integrated_loudness(y, sr)
+        peak = true_peak(y, sr)
+        del y
+
+        if math.isinf(loudness):
+            result.update(loudness_lufs=None, replaygain_gain=None, tagged=False)
+        else:
+            result.update(loudness_lufs=round(loudness, 2),
+                          replaygain_gain=round(replaygain_gain(loudness), 2),
+                          tagged=write_tags(filepath, loudness, peak) if tag else False)
+        result.update(true_peak_dbtp=round(20 * math.log10(peak), 2) if peak > 0 else None,
+                      replaygain_peak=round(peak, 6),
+                      signature=file_signature(filepath))
+    except Exception as e:
+        logger.error(f"Loudness measurement failed for {filepath}: {e}")
+        result['error'] = str(e)
+    return result
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Suno Download Manifest - Local record of downloaded artifacts
+Lets bulk re-runs decide "already have it" without touching the network
+
+Each artifact (audio, video, cover) is recorded with its clip ID, source
+URL, size, ETag and SHA-256. Paths are stored relative to the library root
+so the library can be moved without invalidating the manifest.
+"""
+
+import re
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".suno_index.db"
+
+# Bulk downloader names files "{clip_id}_{title}{suffix}"
+_CLIP_ID_PREFIX = re.compile(
+    r'^([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})_',
+    re.IGNORECASE
+)
+
+# Files produced locally rather than downloaded
+_DERIVED_SUFFIXES = {'.wav', '.json', '.part', '.tmp'}
+_VIDEO_SUFFIXES = {'.mp4', '.webm', '.mov'}
+
+
+def hash_file(filepath: Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's contents"""
+    hasher = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def artifact_kind(filepath: Path) -> str:
+    """Guess artifact kind (audio/video/cover) from a bulk-downloader filename"""
+    if filepath.stem.endswith('_cover'):
+        return 'cover'
+    if filepath.suffix.lower() in _VIDEO_SUFFIXES:
+        return 'video'
+    return 'audio'
+
+
+class DownloadManifest:
+    """SQLite-backed manifest of downloaded files under a library root"""
+
+    def __init__(self, root_dir: str, db_name: str = MANIFEST_FILENAME):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root_dir / db_name
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize manifest schema"""
+        with self._get_connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    path TEXT PRIMARY KEY,
+                    clip_id TEXT,
+                    kind TEXT,
+                    url TEXT,
+                    size INTEGER,
+                    mtime REAL,
+                    etag TEXT,
+                    sha256 TEXT,
+                    downloaded_at TEXT,
+                    verified_at TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_artifacts_clip ON artifacts(clip_id)')
+            conn.commit()
+
+    @contextmanager
+    def _get_connection(self):
+        """Get database connection with context manager"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _key(self, filepath: Path) -> str:
+        """Manifest key: POSIX path relative to the library root"""
+        filepath = Path(filepath)
+        try:
+            return filepath.resolve().relative_to(self.root_dir.resolve()).as_posix()
+        except ValueError:
+            return filepath.as_posix()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def lookup(self, filepath: Path) -> Optional[Dict]:
+        """Get the manifest entry for a file, if any"""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                'SELECT * FROM artifacts WHERE path = ?', (self._key(filepath),)
+            ).fetchone()
+            return dict(row) if row else None
+
+    def is_current(self, entry: Optional[Dict], filepath: Path, url: str) -> bool:
+        """
+        Check a file against its manifest entry using only local state
+
+        The file must exist with the recorded size and mtime, and the entry
+        must be for the same URL (entries rebuilt from disk have no URL and
+        match any).
+        """
+        if not entry:
+            return False
+        if entry.get('url') and url and entry['url'] != url:
+            return False
+        try:
+            stat = Path(filepath).stat()
+        except OSError:
+            return False
+        if stat.st_size != entry.get('size'):
+            return False
+        return entry.get('mtime') is None or abs(stat.st_mtime - entry['mtime']) < 1.0
+
+    def needs_verification(self, entry: Dict, ttl_days: Optional[float]) -> bool:
+        """
+        True if the entry was never remotely verified or is older than the TTL
+
+        Entries rebuilt from disk by repair() have no verified_at, so each
+        legacy file gets one remote check before it is trusted, even
+        without a TTL (it may be a truncated download from an older run).
+        """
+        stamp = entry.get('verified_at')
+        if not stamp:
+            return True
+        if ttl_days is None:
+            return False
+        try:
+            checked = datetime.fromisoformat(stamp)
+        except ValueError:
+            return True
+        return datetime.now() - checked > timedelta(days=ttl_days)
+
+    def count(self) -> int:
+        """Number of recorded artifacts"""
+        with self._get_connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM artifacts').fetchone()[0]
+
+    def get_clip_ids(self, kind: Optional[str] = None) -> set:
+        """All clip IDs with at least one recorded artifact (of ``kind``, if given)"""
+        query = 'SELECT DISTINCT clip_id FROM artifacts WHERE clip_id IS NOT NULL'
+        params = ()
+        if kind:
+            query += ' AND kind = ?'
+            params = (kind,)
+        with self._get_connection() as conn:
+            return {row[0] for row in conn.execute(query, params)}
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def record(self, filepath: Path, clip_id: str = None, kind: str = None,
+               url: str = None, etag: str = None, sha256: str = None,
+               verified: bool = True) -> None:
+        """Record (or replace) an artifact after it has been written"""
+        filepath = Path(filepath)
+        stat = filepath.stat()
+        now = datetime.now().isoformat()
+        with self._get_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO artifacts
+                (path, clip_id, kind, url, size, mtime, etag, sha256, downloaded_at, verified_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                self._key(filepath),
+                clip_id,
+                kind or artifact_kind(filepath),
+                url,
+                stat.st_size,
+                stat.st_mtime,
+                etag,
+                sha256,
+                now,
+                now if verified else None
+            ))
+            conn.commit()
+
+    def mark_verified(self, filepath: Path, url: str = None, etag: str = None) -> None:
+        """Stamp an entry as remotely verified (and fill in URL/ETag if learned)"""
+        with self._get_connection() as conn:
+            conn.execute('''
+                UPDATE artifacts
+                SET verified_at = ?, url = COALESCE(?, url), etag = COALESCE(?, etag)
+                WHERE path = ?
+            ''', (datetime.now().isoformat(), url, etag, self._key(filepath)))
+            conn.commit()
+
+    def remove(self, filepath: Path) -> None:
+        """Forget an artifact"""
+        self._delete_key(self._key(filepath))
+
+    def repair(self, hash_files: bool = True) -> Dict[str, int]:
+        """
+        Reconcile the manifest with what is actually on disk
+
+        - entries whose file is gone are dropped
+        - entries whose size/mtime changed are re-measured
+        - downloaded files missing from the manifest are added
+
+        Args:
+            hash_files: Compute SHA-256 for added/changed files
+
+        Returns:
+            Counts of 'removed', 'updated' and 'added' entries
+        """
+        counts = {'removed': 0, 'updated': 0, 'added': 0}
+
+        with self._get_connection() as conn:
+            entries = {row['path']: dict(row) for row in conn.execute('SELECT * FROM artifacts')}
+
+        on_disk = {}
+        for filepath in self.root_dir.rglob('*'):
+            if not filepath.is_file() or filepath.name.startswith(MANIFEST_FILENAME):
+                continue
+            if filepath.suffix.lower() in _DERIVED_SUFFIXES:
+                continue
+            match = _CLIP_ID_PREFIX.match(filepath.name)
+            if not match:
+                continue
+            on_disk[self._key(filepath)] = (filepath, match.group(1).lower())
+
+        for key, entry in entries.items():
+            if key not in on_disk:
+                self._delete_key(key)
+                counts['removed'] += 1
+
+        for key, (filepath, clip_id) in on_disk.items():
+            entry = entries.get(key)
+            if entry and self.is_current(entry, filepath, entry.get('url')):
+                continue
+
+            sha256 = hash_file(filepath) if hash_files else None
+            if entry:
+                self.record(filepath, clip_id=entry.get('clip_id') or clip_id,
+                            kind=entry.get('kind'), url=entry.get('url'),
+                            etag=None, sha256=sha256, verified=False)
+                counts['updated'] += 1
+            else:
+                self.record(filepath, clip_id=clip_id, sha256=sha256, verified=False)
+                counts['added'] += 1
+
+        logger.info(f"Manifest repaired: {counts}")
+        return counts
+
+    def _delete_key(self, key: str) -> None:
+        with self._get_connection() as conn:
+            conn.execute('DELETE FROM artifacts WHERE path = ?', (key,))
+            conn.commit()
+
+    def entries(self) -> List[Dict]:
+        """All manifest entries"""
+        with self._get_connection() as conn:
+            return [dict(row) for row in conn.execute('SELECT * FROM artifacts ORDER BY path')]
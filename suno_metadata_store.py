@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Suno Clip Metadata Store - One indexed table instead of per-clip sidecars
+
+Raw clip metadata from the API is stored zlib-compressed in a single SQLite
+table keyed by clip_id. Reading the whole set is one sequential scan;
+``*_metadata.json`` sidecars can still be exported for users who want them.
+
+Usage:
+    from suno_metadata_store import ClipMetadataStore
+
+    store = ClipMetadataStore("suno_library/.suno_index.db")
+    store.put(clip)
+    for clip in store.iter_all():
+        ...
+"""
+
+import json
+import zlib
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = "_metadata.json"
+
+
+def _encode(clip: Dict) -> bytes:
+    """Compact, deterministic JSON (so unchanged clips hash the same)"""
+    return json.dumps(clip, ensure_ascii=False, sort_keys=True,
+                      separators=(',', ':')).encode('utf-8')
+
+
+class ClipMetadataStore:
+    """Compressed clip metadata keyed by clip_id"""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize store schema"""
+        with self._get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS clip_metadata (
+                    clip_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    created_at TEXT,
+                    digest TEXT,
+                    data BLOB,
+                    updated_at TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_clip_metadata_created ON clip_metadata(created_at)')
+            conn.commit()
+
+    @contextmanager
+    def _get_connection(self):
+        """Get database connection with context manager"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def put(self, clip: Dict) -> bool:
+        """
+        Store one clip's metadata
+
+        Returns:
+            True if written, False if missing an ID or unchanged
+        """
+        return self.put_many([clip]) == 1
+
+    def put_many(self, clips: Iterable[Dict]) -> int:
+        """Store many clips in one transaction; returns number written"""
+        rows = []
+        now = datetime.now().isoformat()
+        for clip in clips:
+            clip_id = clip.get('id') if clip else None
+            if not clip_id:
+                continue
+            raw = _encode(clip)
+            rows.append((
+                clip_id,
+                clip.get('title', ''),
+                clip.get('created_at', ''),
+                hashlib.sha1(raw).hexdigest(),
+                zlib.compress(raw, 6),
+                now
+            ))
+
+        if not rows:
+            return 0
+
+        with self._get_connection() as conn:
+            before = conn.total_changes
+            # Skip the write entirely when the stored digest already matches
+            conn.executemany('''
+                INSERT INTO clip_metadata (clip_id, title, created_at, digest, data, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(clip_id) DO UPDATE SET
+                    title = excluded.title,
+                    created_at = excluded.created_at,
+                    digest = excluded.digest,
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+                WHERE clip_metadata.digest != excluded.digest
+            ''', rows)
+            conn.commit()
+            return conn.total_changes - before
+
+    def get(self, clip_id: str) -> Optional[Dict]:
+        """Metadata for one clip, or None"""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                'SELECT data FROM clip_metadata WHERE clip_id = ?', (clip_id,)
+            ).fetchone()
+        return json.loads(zlib.decompress(row['data'])) if row else None
+
+    def iter_all(self) -> Iterator[Dict]:
+        """Stream every stored clip with one sequential table scan"""
+        with self._get_connection() as conn:
+            for row in conn.execute('SELECT data FROM clip_metadata ORDER BY rowid'):
+                yield json.loads(zlib.decompress(row['data']))
+
+    def count(self) -> int:
+        """Number of stored clips"""
+        with self._get_connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM clip_metadata').fetchone()[0]
+
+    def export_sidecars(self, path_for: Callable[[Dict], Optional[Path]],
+                        overwrite: bool = False) -> int:
+        """
+        Write ``*_metadata.json`` sidecars for every stored clip
+
+        Args:
+            path_for: Maps clip metadata to its sidecar path (None to skip)
+            overwrite: Replace existing sidecars
+
+        Returns:
+            Number of sidecars written
+        """
+        written = 0
+        for clip in self.iter_all():
+            path = path_for(clip)
+            if path is None or (path.exists() and not overwrite):
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(clip, f, indent=2, ensure_ascii=False)
+            written += 1
+        logger.info(f"Exported {written} metadata sidecars")
+        return written
+
+    def import_sidecars(self, root_dir: str, delete: bool = False) -> int:
+        """
+        Fold existing ``*_metadata.json`` sidecars into the store
+
+        Args:
+            root_dir: Directory to scan recursively
+            delete: Remove each sidecar once it is stored
+
+        Returns:
+            Number of sidecars imported
+        """
+        imported = 0
+        batch = []
+        paths = []
+        for path in Path(root_dir).rglob(f'*{SIDECAR_SUFFIX}'):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    batch.append(json.load(f))
+                paths.append(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable sidecar {path}: {e}")
+
+        self.put_many(batch)
+        for path, clip in zip(paths, batch):
+            if not clip.get('id'):
+                continue
+            imported += 1
+            if delete:
+                path.unlink()
+
+        logger.info(f"Imported {imported} metadata sidecars from {root_dir}")
+        return imported
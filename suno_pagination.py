@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Suno Pagination - Windowed parallel fetching of offset-paginated feeds
+
+Offset-based feeds (``?page=N&limit=M``) do not need page N-1 to request
+page N, so several pages can be in flight at once. Pages are still handed
+to the caller strictly in order; the first short page marks the end and
+any requests already issued beyond it are cancelled or ignored.
+
+Usage:
+    from suno_pagination import ParallelPaginator
+
+    paginator = ParallelPaginator(fetch_page, window=4)
+    for items in paginator.pages():
+        ...
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# fetch_page(page, limit) -> items, or None if the request failed/was rejected
+FetchPage = Callable[[int, int], Optional[List[Dict]]]
+
+DEFAULT_PAGE_SIZES = (100, 50, 20)
+
+
+def _default_key(item: Dict) -> Optional[str]:
+    return item.get('id') or item.get('clip_id')
+
+
+def tune_page_size(fetch_page: FetchPage,
+                   candidates: Sequence[int] = DEFAULT_PAGE_SIZES) -> Tuple[int, Optional[List[List[Dict]]]]:
+    """
+    Find the largest page size the endpoint honours
+
+    Page 0 is requested with each candidate limit, largest first, until one
+    is accepted. Fewer items than asked means the server caps the limit or
+    the feed is that short; page 1 is then requested at the smaller size,
+    and only if it has items (the feed goes on) is the cap adopted.
+    Otherwise the requested limit is kept, so a short feed never shrinks
+    the page size for later, longer walks.
+
+    Returns:
+        (page_size, leading pages fetched at that size) - pages is None if
+        every size failed
+    """
+    for limit in sorted(candidates, reverse=True):
+        items = fetch_page(0, limit)
+        if items is None:
+            logger.debug(f"Page size {limit} rejected, trying smaller")
+            continue
+        if not 0 < len(items) < limit:
+            return limit, [items]
+        next_items = fetch_page(1, len(items))
+        if next_items is None:
+            # Can't tell; the cap is the safe guess (a smaller size only costs requests)
+            return len(items), [items]
+        if next_items:
+            logger.debug(f"Server caps page size at {len(items)}")
+            return len(items), [items, next_items]
+        return limit, [items]
+    return min(candidates), None
+
+
+class ParallelPaginator:
+    """Fetch pages with a sliding window of concurrent requests"""
+
+    def __init__(self, fetch_page: FetchPage, page_size: Optional[int] = None,
+                 window: int = 4, max_pages: int = 100,
+                 page_sizes: Sequence[int] = DEFAULT_PAGE_SIZES,
+                 key: Callable[[Dict], Optional[str]] = _default_key,
+                 stop_when: Optional[Callable[[List[Dict]], bool]] = None):
+        """
+        Args:
+            fetch_page: Callable returning one page's items
+            page_size: Fixed limit; None auto-tunes from ``page_sizes``
+            window: Pages requested concurrently
+            max_pages: Safety limit on pages fetched
+            page_sizes: Candidate limits for auto-tuning
+            key: Item identity for de-duplication across page boundaries
+            stop_when: Called with each page (before de-duplication); True
+                ends pagination after that page (e.g. "all already known")
+        """
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.window = max(1, window)
+        self.max_pages = max_pages
+        self.page_sizes = page_sizes
+        self.key = key
+        self.stop_when = stop_when
+        self.stats = {'requested': 0, 'used': 0, 'cancelled': 0, 'duplicates': 0}
+
+    def pages(self) -> Iterator[List[Dict]]:
+        """
+        Yield each page's new (not previously seen) items, in page order
+        """
+        seen = set()
+
+        def fresh(items: List[Dict]) -> List[Dict]:
+            out = []
+            for item in items:
+                item_key = self.key(item)
+                if item_key is not None:
+                    if item_key in seen:
+                        self.stats['duplicates'] += 1
+                        continue
+                    seen.add(item_key)
+                out.append(item)
+            return out
+
+        first_pages = None
+        if self.page_size is None:
+            self.page_size, first_pages = tune_page_size(self.fetch_page, self.page_sizes)
+            self.stats['requested'] += len(first_pages or [None])
+            if first_pages is None:
+                logger.warning("Feed request failed for every page size")
+                return
+            logger.debug(f"Using page size {self.page_size}")
+
+        page_size = self.page_size
+        executor = ThreadPoolExecutor(max_workers=self.window)
+        in_flight: Dict[int, Future] = {}
+        next_page = 0
+
+        def fill_window():
+            nonlocal next_page
+            while len(in_flight) < self.window and next_page < self.max_pages:
+                in_flight[next_page] = executor.submit(self.fetch_page, next_page, page_size)
+                self.stats['requested'] += 1
+                next_page += 1
+
+        try:
+            pending = list(first_pages or [])
+            next_page = len(pending)
+
+            page = 0
+            while page < self.max_pages:
+                if pending:
+                    items = pending.pop(0)
+                else:
+                    fill_window()
+                    if page not in in_flight:
+                        break
+                    try:
+                        items = in_flight.pop(page).result()
+                    except Exception as e:
+                        logger.warning(f"Page {page} failed: {e}")
+                        items = None
+                    if items is None:
+                        # Ordering matters for "stop at known", so a hole ends the walk
+                        logger.warning(f"Stopping at page {page}: request failed")
+                        break
+                fill_window()
+
+                if not items:
+                    break
+                self.stats['used'] += 1
+                if self.stop_when and self.stop_when(items):
+                    logger.info(f"Page {page + 1}: stop condition met")
+                    break
+
+                yield fresh(items)
+
+                if len(items) < page_size:
+                    break
+                page += 1
+        finally:
+            for future in in_flight.values():
+                if future.cancel():
+                    self.stats['cancelled'] += 1
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def fetch_all(self) -> List[Dict]:
+        """All unique items across pages"""
+        items = []
+        for page_items in self.pages():
+            items.extend(page_items)
+        return items
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Suno Peaks - Multi-resolution waveform peak data for client-side drawing
+
+Peaks are the min and max sample value in each bucket of
+``samples_per_pixel`` samples, quantised to 8 bits. A peaks file holds
+several zoom levels, finest first. Each level is a complete audiowaveform
+version 2 ``.dat`` record (24-byte little-endian header followed by int8
+min/max pairs), so a single level can be handed to any tool that reads
+audiowaveform output, and a reader walks the file by each header's length.
+
+The finest level is a reshape-and-reduce over the decoded samples; each
+coarser level is reduced from the one before it, so the whole pyramid costs
+little more than one pass over the audio.
+
+Usage:
+    from suno_peaks import build_levels, write_peaks, read_peaks
+
+    write_peaks('song.dat', sr, build_levels(y, sr))
+    levels = read_peaks('song.dat')
+"""
+
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Samples per pixel for each zoom level (each a multiple of the previous one)
+LEVELS = (256, 1024, 4096, 16384)
+
+DAT_VERSION = 2
+FLAG_8BIT = 0x1
+
+# version, flags, sample_rate, samples_per_pixel, length, channels
+_HEADER = struct.Struct('<iIiiIi')
+
+
+def build_levels(y, sample_rate: int,
+                 levels: Sequence[int] = LEVELS) -> List[Tuple[int, 'np.ndarray']]:
+    """
+    Min/max peaks of mono float samples at each zoom level
+
+    Args:
+        y: Mono samples in [-1, 1]
+        sample_rate: Sample rate of y (kept in the headers for time mapping)
+        levels: Increasing samples-per-pixel values, each dividing the next
+
+    Returns:
+        [(samples_per_pixel, int8 array of shape (N, 2)), ...], finest first
+    """
+    levels = sorted(levels)
+    for finer, coarser in zip(levels, levels[1:]):
+        if coarser % finer:
+            raise ValueError(f"Level {coarser} is not a multiple of {finer}")
+
+    y = np.asarray(y, dtype=np.float32)
+    mins, maxs = _reduce(y, y, levels[0])
+    out = [(levels[0], _quantise(mins, maxs))]
+    for finer, coarser in zip(levels, levels[1:]):
+        mins, maxs = _reduce(mins, maxs, coarser // finer)
+        out.append((coarser, _quantise(mins, maxs)))
+    return out
+
+
+def _reduce(mins, maxs, factor: int):
+    """Merge every ``factor`` consecutive buckets (the last may be partial)"""
+    if len(mins) == 0:
+        return mins, maxs
+    n = -(-len(mins) // factor)
+    pad = n * factor - len(mins)
+    if pad:
+        # Repeating the last bucket cannot change its group's min or max
+        mins = np.pad(mins, (0, pad), mode='edge')
+        maxs = np.pad(maxs, (0, pad), mode='edge')
+    return mins.reshape(n, factor).min(axis=1), maxs.reshape(n, factor).max(axis=1)
+
+
+def _quantise(mins, maxs):
+    pairs = np.stack([mins, maxs], axis=1) * 127.0
+    return np.clip(np.round(pairs), -128, 127).astype(np.int8)
+
+
+def encode_dat(sample_rate: int, samples_per_pixel: int, peaks) -> bytes:
+    """One level as an audiowaveform v2 .dat record (8-bit, mono)"""
+    if hasattr(peaks, 'tobytes'):
+        data = peaks.astype('int8').tobytes()
+        length = len(peaks)
+    else:
+        data = array('b', [v for pair in peaks for v in pair]).tobytes()
+        length = len(data) // 2
+    return _HEADER.pack(DAT_VERSION, FLAG_8BIT, sample_rate, samples_per_pixel, length, 1) + data
+
+
+def write_peaks(path: Union[str, Path], sample_rate: int,
+                levels: List[Tuple[int, 'np.ndarray']]) -> Path:
+    """Write all levels to one file (atomically replacing any old one)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        for samples_per_pixel, peaks in levels:
+            f.write(encode_dat(sample_rate, samples_per_pixel, peaks))
+    tmp_path.replace(path)
+    return path
+
+
+def read_peaks(source: Union[str, Path, bytes]) -> List[Dict]:
+    """
+    Parse a peaks file (or a single .dat record)
+
+    Returns:
+        [{'sample_rate', 'samples_per_pixel', 'peaks': [(min, max), ...]}, ...]
+
+    Raises:
+        ValueError: On a truncated or non-8-bit/mono record
+    """
+    data = source if isinstance(source, (bytes, bytearray)) else Path(source).read_bytes()
+    levels, offset = [], 0
+    while offset < len(data):
+        if offset + _HEADER.size > len(data):
+            raise ValueError("Truncated peaks header")
+        version, flags, sample_rate, spp, length, channels = _HEADER.unpack_from(data, offset)
+        if version != DAT_VERSION or not flags & FLAG_8BIT or channels != 1:
+            raise ValueError(f"Unsupported peaks record (version {version}, flags {flags})")
+        offset += _HEADER.size
+        body = array('b', data[offset:offset + length * 2])
+        if len(body) != length * 2:
+            raise ValueError("Truncated peaks data")
+        offset += length * 2
+        levels.append({'sample_rate': sample_rate, 'samples_per_pixel': spp,
+                       'peaks': list(zip(body[0::2], body[1::2]))})
+    return levels
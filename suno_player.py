@@ -15,6 +15,7 @@ import random
 
 # Shared utilities
 from suno_utils import safe_filename, parse_duration
+from suno_loudness import playback_gain, read_tags
 
 # Audio playback libraries
 try:
@@ -205,11 +206,22 @@ class VLCBackend(AudioBackend):
 class SunoPlayer:
     """Main music player for Suno songs"""
     
-    def __init__(self, audio_dir: str = "suno_downloads"):
+    def __init__(self, audio_dir: str = "suno_downloads", replaygain: bool = True,
+                 preamp_db: float = 0.0):
+        """
+        Args:
+            audio_dir: Directory with downloaded songs
+            replaygain: Scale each track by its ReplayGain (from the song
+                dict's replaygain_* fields or the file's tags)
+            preamp_db: Extra gain added to tagged tracks
+        """
         self.audio_dir = Path(audio_dir)
         self.playlist: List[Dict] = []
         self.current_index = 0
         self.volume = 0.7
+        self.replaygain = replaygain
+        self.preamp_db = preamp_db
+        self.track_gain = 1.0
         self.shuffle = False
         self.repeat = False  # False, 'one', 'all'
         self.is_paused = False
@@ -290,12 +302,29 @@ class SunoPlayer:
             return False
         
         if self.backend.load(filepath):
+            self.track_gain = self._track_gain(song, filepath)
+            self.backend.set_volume(self.volume * self.track_gain)
             self.backend.play()
             self.is_paused = False
             return True
         
         return False
     
+    def _track_gain(self, song: Dict, filepath: str) -> float:
+        """
+        Linear ReplayGain factor for a song
+        
+        Backends cannot amplify past full volume, so positive gains only
+        take effect below 100% volume.
+        """
+        if not self.replaygain:
+            return 1.0
+        if song.get('replaygain_gain') is not None:
+            gain_db, peak = song['replaygain_gain'], song.get('replaygain_peak')
+        else:
+            gain_db, peak = read_tags(filepath)
+        return playback_gain(gain_db, peak, self.preamp_db)
+    
     def pause(self):
         """Pause playback"""
         if self.backend:
@@ -338,7 +367,7 @@ class SunoPlayer:
         """Set volume (0.0 to 1.0)"""
         self.volume = max(0.0, min(1.0, volume))
         if self.backend:
-            self.backend.set_volume(self.volume)
+            self.backend.set_volume(self.volume * self.track_gain)
     
     def volume_up(self, step: float = 0.1):
         """Increase volume"""
@@ -519,11 +548,15 @@ def main():
     parser.add_argument('--dir', default='suno_downloads', help='Audio directory')
     parser.add_argument('--json', help='Load playlist from extraction JSON')
     parser.add_argument('--play', type=int, help='Start playing at index')
+    parser.add_argument('--no-replaygain', action='store_true',
+                        help='Play every track at the same volume setting')
+    parser.add_argument('--preamp', type=float, default=0.0,
+                        help='ReplayGain preamp in dB')
     
     args = parser.parse_args()
     
     # Initialize player
-    player = SunoPlayer(args.dir)
+    player = SunoPlayer(args.dir, replaygain=not args.no_replaygain, preamp_db=args.preamp)
     
     if not player.backend:
         print("No audio backend available. Install pygame or python-vlc.")
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Suno Rate Control - Adaptive per-host request pacing
+Shared AIMD controller for studio-api and CDN traffic
+
+Each host gets its own allowed request rate and concurrency. Successful
+responses grow both additively; 429s, 5xx responses and network errors
+shrink them multiplicatively. ``Retry-After`` headers block the host until
+the server says it is ready again.
+
+Usage:
+    from suno_ratelimit import get_rate_controller
+
+    rate = get_rate_controller()
+    response = rate.request(session, 'GET', url, timeout=30)
+
+    # Long transfers hold the slot for the whole body
+    with rate.slot(url) as slot:
+        response = session.get(url, stream=True, timeout=60)
+        slot.record(response)
+        ...
+"""
+
+import time
+import inspect
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Configuration (optional, for controller limits)
+try:
+    from suno_core import get_config
+    CONFIG_AVAILABLE = True
+except ImportError:
+    CONFIG_AVAILABLE = False
+    get_config = None
+
+
+# Status codes that signal an overloaded or throttling server
+THROTTLE_STATUSES = {429}
+SERVER_ERROR_STATUSES = {500, 502, 503, 504}
+RETRY_STATUSES = THROTTLE_STATUSES | SERVER_ERROR_STATUSES
+
+
+def parse_retry_after(value: Optional[str], now: float = None) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header into a delay in seconds.
+
+    Supports both forms allowed by RFC 9110:
+        - delta-seconds (e.g. "120")
+        - HTTP-date (e.g. "Wed, 21 Oct 2015 07:28:00 GMT")
+
+    Args:
+        value: Raw header value
+        now: Current UNIX time (defaults to time.time())
+
+    Returns:
+        Delay in seconds (never negative), or None if missing/invalid
+
+    Examples:
+        >>> parse_retry_after("5")
+        5.0
+        >>> parse_retry_after("soon")
+        None
+    """
+    if not value or not isinstance(value, str):
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+class HostState:
+    """Mutable pacing state and counters for a single host"""
+
+    def __init__(self, rate: float, concurrency: float):
+        self.rate = rate                  # Allowed requests per second
+        self.concurrency = concurrency    # Allowed simultaneous requests
+        self.in_flight = 0
+        self.next_slot = 0.0              # Monotonic time of next allowed start
+        self.blocked_until = 0.0          # Monotonic time set by Retry-After/backoff
+        self.latency_ewma = None          # Seconds
+        self.latency_floor = None         # Best latency seen, used as baseline
+        self.successes_since_increase = 0
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.network_errors = 0
+
+    def to_dict(self, now: float) -> Dict:
+        """Public snapshot for monitoring"""
+        return {
+            'rate': round(self.rate, 3),
+            'concurrency': int(self.concurrency),
+            'in_flight': self.in_flight,
+            'latency_ms': round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            'blocked_for': round(max(0.0, self.blocked_until - now), 2),
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'server_errors': self.server_errors,
+            'network_errors': self.network_errors,
+            'throttle_rate': round(self.throttled / self.requests, 4) if self.requests else 0.0,
+            'error_rate': round((self.server_errors + self.network_errors) / self.requests, 4)
+                          if self.requests else 0.0,
+        }
+
+
+class RequestSlot:
+    """A single acquired request slot; records the outcome on exit"""
+
+    def __init__(self, controller: 'AdaptiveRateController', host: str):
+        self.controller = controller
+        self.host = host
+        self.started = time.monotonic()
+        self.recorded = False
+
+    def record(self, response) -> None:
+        """Record an HTTP response (anything with status_code/headers)"""
+        if self.recorded:
+            return
+        self.recorded = True
+        self.controller._on_response(
+            self.host,
+            getattr(response, 'status_code', None),
+            time.monotonic() - self.started,
+            getattr(response, 'headers', None) or {}
+        )
+
+    def record_error(self) -> None:
+        """Record a network-level failure (timeout, reset, DNS...)"""
+        if self.recorded:
+            return
+        self.recorded = True
+        self.controller._on_error(self.host)
+
+
+class AdaptiveRateController:
+    """
+    Additive-increase/multiplicative-decrease rate controller
+
+    Thread-safe; one instance is meant to be shared by every component
+    talking to Suno so that throttling seen by one is respected by all.
+    """
+
+    def __init__(self,
+                 initial_rate: float = 2.0,
+                 min_rate: float = 0.2,
+                 max_rate: float = 20.0,
+                 rate_step: float = 0.5,
+                 initial_concurrency: int = 2,
+                 min_concurrency: int = 1,
+                 max_concurrency: int = 16,
+                 decrease_factor: float = 0.5,
+                 error_decrease_factor: float = 0.75,
+                 latency_tolerance: float = 3.0,
+                 default_backoff: float = 2.0,
+                 max_backoff: float = 120.0):
+        """
+        Args:
+            initial_rate: Starting requests/second per host
+            min_rate: Lower bound for the request rate
+            max_rate: Upper bound for the request rate
+            rate_step: Additive rate increase per healthy window
+            initial_concurrency: Starting simultaneous requests per host
+            min_concurrency: Lower bound for concurrency
+            max_concurrency: Upper bound for concurrency
+            decrease_factor: Multiplier applied on 429 responses
+            error_decrease_factor: Multiplier applied on 5xx/network errors
+            latency_tolerance: Latency above floor * tolerance stops increases
+            default_backoff: Host block (seconds) on 429 without Retry-After
+            max_backoff: Cap for any host block
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.error_decrease_factor = error_decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.default_backoff = default_backoff
+        self.max_backoff = max_backoff
+
+        self._hosts: Dict[str, HostState] = {}
+        self._cond = threading.Condition()
+
+    # ------------------------------------------------------------------
+    # Acquisition
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def host_for(url: str) -> str:
+        """Key used for per-host state"""
+        return urlparse(url).netloc.lower() or url
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = HostState(self.initial_rate, float(self.initial_concurrency))
+            self._hosts[host] = state
+        return state
+
+    def acquire(self, url: str) -> RequestSlot:
+        """Block until the host allows another request, then take a slot"""
+        host = self.host_for(url)
+        with self._cond:
+            while True:
+                state = self._state(host)
+                now = time.monotonic()
+                start_at = max(state.next_slot, state.blocked_until)
+
+                if state.in_flight < int(state.concurrency) and now >= start_at:
+                    state.in_flight += 1
+                    state.requests += 1
+                    state.next_slot = max(now, state.next_slot) + 1.0 / state.rate
+                    return RequestSlot(self, host)
+
+                # Wake up when pacing allows, or when a slot is released
+                timeout = start_at - now if now < start_at else None
+                self._cond.wait(timeout)
+
+    def release(self, slot: RequestSlot) -> None:
+        """Return a slot; unrecorded slots count as network errors"""
+        if not slot.recorded:
+            slot.record_error()
+        with self._cond:
+            state = self._state(slot.host)
+            state.in_flight = max(0, state.in_flight - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, url: str):
+        """Context manager holding a request slot for ``url``'s host"""
+        request_slot = self.acquire(url)
+        try:
+            yield request_slot
+        finally:
+            self.release(request_slot)
+
+    def request(self, session, method: str, url: str,
+                max_attempts: int = 3, **kwargs):
+        """
+        Send a request through ``session`` with pacing and retries
+
+        Retries 429/5xx responses and network errors; waiting for
+        ``Retry-After`` happens naturally when the next slot is acquired.
+
+        Returns:
+            The last response received
+
+        Raises:
+            The last network exception if no response was ever received
+        """
+        last_error = None
+        response = None
+
+        for attempt in range(max_attempts):
+            with self.slot(url) as request_slot:
+                try:
+                    response = session.request(method, url, **kwargs)
+                except Exception as e:
+                    request_slot.record_error()
+                    last_error = e
+                    logger.debug(f"{method} {url} failed (attempt {attempt + 1}): {e}")
+                    continue
+                request_slot.record(response)
+
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            logger.debug(f"{method} {url} -> {response.status_code} (attempt {attempt + 1})")
+
+        if response is None and last_error is not None:
+            raise last_error
+        return response
+
+    # ------------------------------------------------------------------
+    # Feedback
+    # ------------------------------------------------------------------
+
+    def _on_response(self, host: str, status: Optional[int],
+                     latency: float, headers) -> None:
+        with self._cond:
+            state = self._state(host)
+            now = time.monotonic()
+
+            if status in THROTTLE_STATUSES:
+                state.throttled += 1
+                delay = parse_retry_after(headers.get('Retry-After'))
+                if delay is None:
+                    delay = self.default_backoff
+                self._decrease(state, self.decrease_factor)
+                state.blocked_until = max(state.blocked_until,
+                                          now + min(delay, self.max_backoff))
+                logger.warning(f"Throttled by {host}; backing off {min(delay, self.max_backoff):.1f}s "
+                               f"(rate {state.rate:.2f}/s, concurrency {int(state.concurrency)})")
+
+            elif status in SERVER_ERROR_STATUSES:
+                state.server_errors += 1
+                self._decrease(state, self.error_decrease_factor)
+                delay = parse_retry_after(headers.get('Retry-After'))
+                if delay is not None:
+                    state.blocked_until = max(state.blocked_until,
+                                              now + min(delay, self.max_backoff))
+
+            else:
+                self._observe_latency(state, latency)
+                if self._latency_healthy(state):
+                    self._increase(state)
+
+            self._cond.notify_all()
+
+    def _on_error(self, host: str) -> None:
+        with self._cond:
+            state = self._state(host)
+            state.network_errors += 1
+            self._decrease(state, self.error_decrease_factor)
+            self._cond.notify_all()
+
+    def _observe_latency(self, state: HostState, latency: float) -> None:
+        if state.latency_ewma is None:
+            state.latency_ewma = latency
+        else:
+            state.latency_ewma = 0.8 * state.latency_ewma + 0.2 * latency
+        if state.latency_floor is None or latency < state.latency_floor:
+            state.latency_floor = latency
+
+    def _latency_healthy(self, state: HostState) -> bool:
+        if state.latency_ewma is None or not state.latency_floor:
+            return True
+        return state.latency_ewma <= state.latency_floor * self.latency_tolerance
+
+    def _increase(self, state: HostState) -> None:
+        """Additive increase once per window of successes"""
+        state.successes_since_increase += 1
+        if state.successes_since_increase < max(1, int(state.concurrency)):
+            return
+        state.successes_since_increase = 0
+        state.rate = min(self.max_rate, state.rate + self.rate_step)
+        state.concurrency = min(float(self.max_concurrency), state.concurrency + 1)
+
+    def _decrease(self, state: HostState, factor: float) -> None:
+        """Multiplicative decrease"""
+        state.successes_since_increase = 0
+        state.rate = max(self.min_rate, state.rate * factor)
+        state.concurrency = max(float(self.min_concurrency), state.concurrency * factor)
+        # Don't let a previously granted slot schedule outrun the new rate
+        state.next_slot = max(state.next_slot, time.monotonic() + 1.0 / state.rate)
+
+    # ------------------------------------------------------------------
+    # Monitoring
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current per-host state, suitable for JSON/monitoring output"""
+        with self._cond:
+            now = time.monotonic()
+            return {host: state.to_dict(now) for host, state in self._hosts.items()}
+
+    def log_summary(self) -> None:
+        """Log one line per host with current limits and error rates"""
+        for host, state in sorted(self.snapshot().items()):
+            logger.info(
+                f"{host}: {state['rate']}/s x{state['concurrency']}, "
+                f"{state['requests']} requests, {state['throttled']} throttled, "
+                f"{state['server_errors'] + state['network_errors']} errors, "
+                f"latency {state['latency_ms']}ms"
+            )
+
+
+# Singleton instance
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_rate_controller() -> AdaptiveRateController:
+    """Get the process-wide shared rate controller"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            settings = {}
+            if CONFIG_AVAILABLE and get_config:
+                try:
+                    settings = get_config().get('rate_limit', default={}) or {}
+                except Exception:
+                    settings = {}
+            accepted = inspect.signature(AdaptiveRateController).parameters
+            _controller = AdaptiveRateController(**{
+                k: v for k, v in settings.items() if k in accepted
+            })
+        return _controller
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Suno Similarity Index - Precomputed feature vectors for "more like this"
+
+Every song gets one unit-length float32 vector built from:
+    - tempo (BPM mapped onto a half circle so nearby tempos score high)
+    - key (Camelot wheel position as an angle, plus major/minor)
+    - tags (hashed bag-of-tags embedding)
+    - timbre and harmony (MFCC and chroma means from AudioAnalyzer)
+
+Vectors live as BLOBs in a ``song_features`` table next to ``songs``.
+Similarity is a dot product against the whole matrix with ``argpartition``
+for top-k; very large libraries can add an IVF index (k-means partitions,
+only the nearest few are scanned per query).
+
+Usage:
+    from suno_similarity import SimilarityIndex
+
+    index = SimilarityIndex("suno_library.db")
+    index.rebuild()
+    for song_id, score in index.top_k(song_id, k=10):
+        ...
+"""
+
+import math
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+FEATURE_VERSION = 1
+
+TAG_DIMS = 16
+MFCC_DIMS = 12   # MFCC 1-12; coefficient 0 is loudness, not timbre
+CHROMA_DIMS = 12
+
+# Relative influence of each block on the cosine score
+BLOCK_WEIGHTS = {
+    'tempo': 0.25,
+    'key': 0.2,
+    'tags': 0.3,
+    'mfcc': 0.35,
+    'chroma': 0.15,
+}
+
+VECTOR_DIMS = 2 + 3 + TAG_DIMS + MFCC_DIMS + CHROMA_DIMS
+
+_PITCH_CLASSES = {
+    'C': 0, 'C#': 1, 'DB': 1, 'D': 2, 'D#': 3, 'EB': 3, 'E': 4, 'F': 5,
+    'F#': 6, 'GB': 6, 'G': 7, 'G#': 8, 'AB': 8, 'A': 9, 'A#': 10, 'BB': 10, 'B': 11,
+}
+
+
+def parse_key(musical_key: Optional[str]) -> Optional[Tuple[int, str]]:
+    """'F#/Gb minor' -> (6, 'minor'); None if unparseable"""
+    if not musical_key:
+        return None
+    parts = musical_key.replace('/', ' ').split()
+    if not parts or parts[0].upper() not in _PITCH_CLASSES:
+        return None
+    mode = 'minor' if 'minor' in musical_key.lower() else 'major'
+    return _PITCH_CLASSES[parts[0].upper()], mode
+
+
+def camelot_number(pitch_class: int, mode: str) -> int:
+    """Camelot wheel number (1-12) for a key; C major and A minor are 8"""
+    # Minor keys sit with their relative major (three semitones up)
+    major_pc = (pitch_class + 3) % 12 if mode == 'minor' else pitch_class
+    return (7 * major_pc + 8) % 12 or 12
+
+
+def _unit(block):
+    norm = float(np.linalg.norm(block))
+    return block / norm if norm > 0 else block
+
+
+def _tag_embedding(tags: Iterable[str]):
+    """Signed feature hashing of tags into TAG_DIMS"""
+    vec = np.zeros(TAG_DIMS, dtype=np.float32)
+    for tag in tags:
+        tag = (tag or '').strip().lower()
+        if not tag:
+            continue
+        digest = hashlib.blake2b(tag.encode('utf-8'), digest_size=8).digest()
+        slot = digest[0] % TAG_DIMS
+        vec[slot] += 1.0 if digest[1] & 1 else -1.0
+    return vec
+
+
+def build_vector(bpm: Optional[float] = None, musical_key: Optional[str] = None,
+                 tags: Sequence[str] = (), mfcc_mean: Optional[Sequence[float]] = None,
+                 chroma_mean: Optional[Sequence[float]] = None):
+    """
+    Unit-length float32 feature vector for one song
+
+    Missing inputs leave their block at zero, so songs without audio
+    analysis are still comparable on metadata.
+    """
+    blocks = []
+
+    tempo = np.zeros(2, dtype=np.float32)
+    if bpm:
+        angle = math.pi * min(max((float(bpm) - 60.0) / 140.0, 0.0), 1.0)
+        tempo[:] = (math.cos(angle), math.sin(angle))
+    blocks.append(('tempo', tempo))
+
+    key = np.zeros(3, dtype=np.float32)
+    parsed = parse_key(musical_key)
+    if parsed:
+        angle = 2 * math.pi * camelot_number(*parsed) / 12
+        key[:] = (math.cos(angle), math.sin(angle), 0.5 if parsed[1] == 'major' else -0.5)
+    blocks.append(('key', key))
+
+    blocks.append(('tags', _tag_embedding(tags)))
+
+    mfcc = np.zeros(MFCC_DIMS, dtype=np.float32)
+    if mfcc_mean is not None and len(mfcc_mean) > MFCC_DIMS:
+        mfcc[:] = np.asarray(mfcc_mean, dtype=np.float32)[1:MFCC_DIMS + 1]
+    blocks.append(('mfcc', mfcc))
+
+    chroma = np.zeros(CHROMA_DIMS, dtype=np.float32)
+    if chroma_mean is not None and len(chroma_mean) == CHROMA_DIMS:
+        chroma[:] = np.asarray(chroma_mean, dtype=np.float32)
+        chroma -= chroma.mean()  # A flat chroma carries no harmonic signal
+    blocks.append(('chroma', chroma))
+
+    vector = np.concatenate([
+        _unit(block) * math.sqrt(BLOCK_WEIGHTS[name]) for name, block in blocks
+    ]).astype(np.float32)
+    return _unit(vector)
+
+
+class SimilarityIndex:
+    """Song feature vectors in SQLite with in-memory top-k search"""
+
+    def __init__(self, db_path: str = "suno_library.db", ivf_threshold: int = 20000):
+        """
+        Args:
+            db_path: Library database (the one holding ``songs``)
+            ivf_threshold: Build/use an IVF index from this many songs up
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for the similarity index")
+        self.db_path = Path(db_path)
+        self.ivf_threshold = ivf_threshold
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix = None
+        self._ivf = None
+        self._init_db()
+
+    def _init_db(self):
+        """Initialize feature schema"""
+        with self._get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS song_features (
+                    song_id TEXT PRIMARY KEY,
+                    vector BLOB,
+                    mfcc_mean BLOB,
+                    chroma_mean BLOB,
+                    version INTEGER,
+                    updated_at REAL,
+                    FOREIGN KEY (song_id) REFERENCES songs(id)
+                )
+            ''')
+            conn.commit()
+
+    @contextmanager
+    def _get_connection(self):
+        """Get database connection with context manager"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _blob(values) -> Optional[bytes]:
+        return None if values is None else np.asarray(values, dtype=np.float32).tobytes()
+
+    @staticmethod
+    def _array(blob: Optional[bytes]):
+        return None if blob is None else np.frombuffer(blob, dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def store_audio_features(self, song_id: str, mfcc_mean: Optional[Sequence[float]] = None,
+                             chroma_mean: Optional[Sequence[float]] = None) -> None:
+        """Keep AudioAnalyzer summaries so vectors can be rebuilt without re-analysis"""
+        with self._get_connection() as conn:
+            conn.execute('''
+                INSERT INTO song_features (song_id, mfcc_mean, chroma_mean, version, updated_at)
+                VALUES (?, ?, ?, 0, ?)
+                ON CONFLICT(song_id) DO UPDATE SET
+                    mfcc_mean = COALESCE(excluded.mfcc_mean, song_features.mfcc_mean),
+                    chroma_mean = COALESCE(excluded.chroma_mean, song_features.chroma_mean),
+                    version = 0
+            ''', (song_id, self._blob(mfcc_mean), self._blob(chroma_mean), time.time()))
+            conn.commit()
+
+    def rebuild(self, song_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Recompute vectors from song metadata, tags and stored audio summaries
+
+        Args:
+            song_ids: Only these songs (default: all songs)
+
+        Returns:
+            Number of vectors written
+        """
+        query = '''
+            SELECT s.id, s.bpm, s.musical_key,
+                   (SELECT group_concat(tag, char(31)) FROM tags t WHERE t.song_id = s.id) AS tag_list,
+                   f.mfcc_mean, f.chroma_mean
+            FROM songs s LEFT JOIN song_features f ON f.song_id = s.id
+        '''
+        params: List = []
+        if song_ids is not None:
+            song_ids = list(song_ids)
+            if not song_ids:
+                return 0
+            query += f" WHERE s.id IN ({','.join('?' * len(song_ids))})"
+            params = song_ids
+
+        now = time.time()
+        rows = []
+        with self._get_connection() as conn:
+            for row in conn.execute(query, params):
+                vector = build_vector(
+                    bpm=row['bpm'],
+                    musical_key=row['musical_key'],
+                    tags=(row['tag_list'] or '').split('\x1f'),
+                    mfcc_mean=self._array(row['mfcc_mean']),
+                    chroma_mean=self._array(row['chroma_mean']),
+                )
+                rows.append((row['id'], vector.tobytes(), FEATURE_VERSION, now))
+
+            conn.executemany('''
+                INSERT INTO song_features (song_id, vector, version, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(song_id) DO UPDATE SET
+                    vector = excluded.vector,
+                    version = excluded.version,
+                    updated_at = excluded.updated_at
+            ''', rows)
+            conn.commit()
+
+        logger.info(f"Rebuilt {len(rows)} similarity vectors")
+        self.invalidate()
+        return len(rows)
+
+    def stale_song_ids(self) -> List[str]:
+        """Songs with no vector or one from an older feature version"""
+        with self._get_connection() as conn:
+            return [r[0] for r in conn.execute('''
+                SELECT s.id FROM songs s LEFT JOIN song_features f ON f.song_id = s.id
+                WHERE f.vector IS NULL OR f.version != ?
+            ''', (FEATURE_VERSION,))]
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def invalidate(self) -> None:
+        """Drop the in-memory matrix (reloaded on next query)"""
+        with self._lock:
+            self._matrix = None
+            self._ivf = None
+
+    def _load(self):
+        with self._lock:
+            if self._matrix is not None:
+                return self._matrix
+            ids, vectors = [], []
+            with self._get_connection() as conn:
+                for row in conn.execute(
+                        'SELECT song_id, vector FROM song_features WHERE vector IS NOT NULL AND version = ?',
+                        (FEATURE_VERSION,)):
+                    ids.append(row['song_id'])
+                    vectors.append(np.frombuffer(row['vector'], dtype=np.float32))
+            self._ids = ids
+            self._positions = {song_id: i for i, song_id in enumerate(ids)}
+            self._matrix = np.vstack(vectors) if vectors else np.zeros((0, VECTOR_DIMS), dtype=np.float32)
+            self._ivf = None
+            return self._matrix
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def vector(self, song_id: str):
+        """Stored vector for a song, or None"""
+        matrix = self._load()
+        position = self._positions.get(song_id)
+        return None if position is None else matrix[position]
+
+    def top_k(self, song_id: str, k: int = 10, n_probe: int = 8) -> List[Tuple[str, float]]:
+        """
+        Most similar songs to ``song_id``
+
+        Returns:
+            [(song_id, cosine score)] best first; empty if the song has no vector
+        """
+        query = self.vector(song_id)
+        if query is None:
+            return []
+        return self.search(query, k=k, exclude={song_id}, n_probe=n_probe)
+
+    def search(self, query, k: int = 10, exclude: Iterable[str] = (),
+               n_probe: int = 8) -> List[Tuple[str, float]]:
+        """Top-k songs for an arbitrary query vector"""
+        matrix = self._load()
+        if not len(matrix) or k <= 0:
+            return []
+
+        candidates = None
+        if len(matrix) >= self.ivf_threshold:
+            candidates = self._ivf_candidates(query, n_probe)
+
+        rows = matrix if candidates is None else matrix[candidates]
+        scores = rows @ np.asarray(query, dtype=np.float32)
+        for song_id in exclude:
+            position = self._positions.get(song_id)
+            if position is None:
+                continue
+            if candidates is None:
+                scores[position] = -np.inf
+            else:
+                scores[candidates == position] = -np.inf
+
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        positions = best if candidates is None else candidates[best]
+        return [(self._ids[p], float(scores[b])) for p, b in zip(positions, best)
+                if np.isfinite(scores[b])]
+
+    # ------------------------------------------------------------------
+    # IVF partitioning
+    # ------------------------------------------------------------------
+
+    def build_ivf(self, n_lists: Optional[int] = None, iterations: int = 10, seed: int = 0) -> None:
+        """
+        Partition vectors with spherical k-means (about sqrt(n) lists)
+
+        Queries then scan only the ``n_probe`` lists whose centroids are
+        closest, trading a little recall for far fewer dot products.
+        """
+        matrix = self._load()
+        n = len(matrix)
+        if n == 0:
+            return
+        n_lists = max(1, min(n, n_lists or int(math.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        centroids = matrix[rng.choice(n, n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = np.argmax(matrix @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = matrix[assignment == c]
+                if len(members):
+                    centroids[c] = _unit(members.sum(axis=0))
+
+        assignment = np.argmax(matrix @ centroids.T, axis=1)
+        lists = [np.flatnonzero(assignment == c) for c in range(n_lists)]
+        with self._lock:
+            self._ivf = (centroids, lists)
+        logger.info(f"Built IVF index: {n} vectors in {n_lists} lists")
+
+    def _ivf_candidates(self, query, n_probe: int):
+        if self._ivf is None:
+            self.build_ivf()
+        centroids, lists = self._ivf
+        n_probe = min(n_probe, len(lists))
+        nearest = np.argpartition(-(centroids @ query), n_probe - 1)[:n_probe]
+        return np.concatenate([lists[c] for c in nearest])
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Suno Stream Writer - Fast response-to-disk copying for downloads
+
+``iter_content(8192)`` costs one Python iteration, one bytes allocation and
+one ``write`` call per 8 KB. This module copies a streamed ``requests``
+response straight from the socket into one reusable buffer with
+``readinto``, preallocates the destination when Content-Length is known and
+hashes incrementally as it writes, so nothing is read twice.
+
+The body is written to ``<name>.part`` and only renamed onto the final path
+once it is complete, so an interrupted transfer never leaves a file that
+looks finished (preallocation would otherwise pad it to full size).
+
+Usage:
+    from suno_stream import stream_to_file
+
+    response = session.get(url, stream=True, timeout=60)
+    result = stream_to_file(response, "song.mp3")
+    print(result.bytes_written, result.digest)
+"""
+
+import os
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+class StreamResult(NamedTuple):
+    """Outcome of a stream_to_file() call"""
+    bytes_written: int
+    digest: Optional[str]
+
+
+def expected_length(response: Any) -> Optional[int]:
+    """
+    Decoded body size announced by the server, if it can be trusted
+
+    With a Content-Encoding the header is the compressed size, so it says
+    nothing about how much will land on disk.
+    """
+    headers = getattr(response, 'headers', None) or {}
+    if headers.get('content-encoding', 'identity').lower() not in ('identity', ''):
+        return None
+    try:
+        length = int(headers.get('content-length', ''))
+    except (TypeError, ValueError):
+        return None
+    return length if length > 0 else None
+
+
+def preallocate(fileobj, size: int) -> bool:
+    """
+    Reserve ``size`` bytes for an open file (reduces fragmentation)
+
+    Returns:
+        True if space was reserved; False where unsupported
+    """
+    if not hasattr(os, 'posix_fallocate'):
+        return False
+    try:
+        os.posix_fallocate(fileobj.fileno(), 0, size)
+        return True
+    except OSError:
+        # e.g. filesystems without fallocate support
+        return False
+
+
+def _raw_stream(response: Any):
+    """Underlying readinto()-capable stream, or None"""
+    raw = getattr(response, 'raw', None)
+    if raw is None or not hasattr(raw, 'readinto'):
+        return None
+    # Let urllib3 undo gzip/deflate so the file holds the real body
+    if hasattr(raw, 'decode_content'):
+        raw.decode_content = True
+    return raw
+
+
+def _write_all(f, data) -> None:
+    """Write all of ``data`` to an unbuffered file (write() may be partial)"""
+    view = memoryview(data)
+    while view:
+        n = f.write(view)
+        if not n:
+            raise IOError(f"Write to {f.name} made no progress")
+        view = view[n:]
+
+
+def stream_to_file(response: Any, filepath: Union[str, Path],
+                   hash_name: Optional[str] = 'sha256',
+                   buffer_size: int = DEFAULT_BUFFER_SIZE) -> StreamResult:
+    """
+    Write a streamed HTTP response body to ``filepath``
+
+    Args:
+        response: requests.Response opened with ``stream=True`` (anything
+            with ``raw.readinto`` or ``iter_content`` works)
+        filepath: Destination (parent directories are created)
+        hash_name: hashlib algorithm to compute while writing, or None
+        buffer_size: Size of the reusable read buffer
+
+    Returns:
+        StreamResult with bytes written and hex digest (None if not hashed)
+
+    Raises:
+        IOError: If the body size differs from Content-Length (nothing is
+            left at ``filepath`` or ``<filepath>.part``)
+    """
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    part_path = filepath.with_name(filepath.name + '.part')
+    hasher = hashlib.new(hash_name) if hash_name else None
+    length = expected_length(response)
+    raw = _raw_stream(response)
+    written = 0
+
+    try:
+        with open(part_path, 'wb', buffering=0) as f:
+            if length:
+                preallocate(f, length)
+
+            if raw is not None:
+                buffer = bytearray(buffer_size)
+                view = memoryview(buffer)
+                while True:
+                    n = raw.readinto(buffer)
+                    if not n:
+                        break
+                    chunk = view[:n]
+                    _write_all(f, chunk)
+                    if hasher:
+                        hasher.update(chunk)
+                    written += n
+            else:
+                for chunk in response.iter_content(chunk_size=buffer_size):
+                    if chunk:
+                        _write_all(f, chunk)
+                        if hasher:
+                            hasher.update(chunk)
+                        written += len(chunk)
+
+        if length and written != length:
+            raise IOError(f"Incomplete download: got {written} of {length} bytes for {filepath.name}")
+        os.replace(part_path, filepath)
+    finally:
+        # Only left behind if the transfer failed or was interrupted
+        if part_path.exists():
+            part_path.unlink()
+
+    return StreamResult(written, hasher.hexdigest() if hasher else None)
@@ -12,7 +12,8 @@ Usage:
 
 import re
 import logging
-from typing import Optional, Dict, Any, List
+import threading
+from typing import Optional, Dict, Any, List, Callable, Hashable
 from pathlib import Path
 
 # =============================================================================
@@ -307,6 +308,79 @@ def validate_song_data(song: Dict[str, Any]) -> List[str]:
     return issues
 
 
+# =============================================================================
+# Concurrency
+# =============================================================================
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution.
+    
+    While a call for a key is running, other threads asking for the same
+    key wait for it and receive its result (or exception) instead of
+    repeating the work. Nothing is cached once the call finishes.
+    
+    Usage:
+        flights = SingleFlight()
+        song = flights.do(song_id, lambda: fetch_song(song_id))
+    """
+    
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result: Any = None
+            self.error: Optional[BaseException] = None
+            self.waiters = 0
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, 'SingleFlight._Call'] = {}
+        self.coalesced = 0
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn() for key, or wait for the identical call already in flight.
+        
+        Args:
+            key: Identity of the work (e.g. a song ID)
+            fn: Zero-argument callable performing the work
+            
+        Returns:
+            fn()'s result (shared by all coalesced callers)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = self._Call()
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def in_flight(self) -> int:
+        """Number of keys currently being worked on"""
+        with self._lock:
+            return len(self._calls)
+
+
 # =============================================================================
 # Logging Setup
 # =============================================================================
@@ -394,6 +468,8 @@ __all__ = [
     'generate_unique_path',
     # Validation
     'validate_song_data',
+    # Concurrency
+    'SingleFlight',
     # Logging
     'setup_logging',
 ]
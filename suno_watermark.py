@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Suno Sync Watermark - Persisted "last seen" state for incremental syncs
+
+Feeds such as the liked list are returned newest first, so once a whole
+page consists of clips we have already seen there is nothing new further
+back. The watermark stores, per feed in a small JSON file, the clip IDs
+that have been synced, the newest created_at among them and the IDs still
+pending (queued or failed). The ID sets drive the stop condition: a walk
+keeps paging past known pages until every pending ID has been seen again,
+so a clip that failed on an older page is retried by the next run.
+
+Usage:
+    from suno_watermark import SyncWatermark
+
+    mark = SyncWatermark("suno_library/.sync_state.json", feed="liked")
+    outstanding = set(mark.pending_ids)
+    for page in pages:
+        outstanding -= {clip_id_of(c) for c in page}
+        if mark.page_is_known(page) and not outstanding:
+            break
+        mark.mark_pending(page)
+        ...
+        mark.observe(done)
+    mark.save()
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def clip_id_of(clip: Dict) -> Optional[str]:
+    """Clip ID from raw API clips or normalized song dicts"""
+    return clip.get('id') or clip.get('clip_id') or clip.get('song_id')
+
+
+class SyncWatermark:
+    """Synced and pending clip IDs and newest created_at for one feed, stored as JSON"""
+
+    def __init__(self, path: str, feed: str = 'liked'):
+        """
+        Args:
+            path: JSON state file (shared by all feeds)
+            feed: Feed name within the state file
+        """
+        self.path = Path(path)
+        self.feed = feed
+        self._lock = threading.Lock()
+        self.known_ids: Set[str] = set()
+        self.pending_ids: Set[str] = set()
+        self.newest_created_at: str = ''
+        self.synced_at: str = ''
+        self.load()
+
+    def load(self) -> None:
+        """Load this feed's state (missing/corrupt files start empty)"""
+        state = self._read_all().get('feeds', {}).get(self.feed, {})
+        self.known_ids = set(state.get('known_ids', []))
+        self.pending_ids = set(state.get('pending_ids', []))
+        self.newest_created_at = state.get('newest_created_at', '')
+        self.synced_at = state.get('synced_at', '')
+
+    def _read_all(self) -> Dict:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sync state {self.path}: {e}")
+            return {}
+
+    @property
+    def is_empty(self) -> bool:
+        """True before the first successful sync"""
+        return not self.known_ids
+
+    def is_known(self, clip: Dict) -> bool:
+        return clip_id_of(clip) in self.known_ids
+
+    def page_is_known(self, clips: List[Dict]) -> bool:
+        """True if a non-empty page contains only already-seen clips"""
+        ids = [clip_id_of(c) for c in clips]
+        with self._lock:
+            return bool(ids) and all(i in self.known_ids for i in ids)
+
+    def observe(self, clips: Iterable[Dict]) -> None:
+        """Mark clips as synced (no longer pending) and advance newest_created_at"""
+        with self._lock:
+            for clip in clips:
+                clip_id = clip_id_of(clip)
+                if clip_id:
+                    self.known_ids.add(clip_id)
+                    self.pending_ids.discard(clip_id)
+                created = clip.get('created_at') or ''
+                # ISO-8601 timestamps compare correctly as strings
+                if created > self.newest_created_at:
+                    self.newest_created_at = created
+
+    def mark_pending(self, clips: Iterable[Dict]) -> None:
+        """Mark clips as queued or failed; they stay pending until observed"""
+        with self._lock:
+            for clip in clips:
+                clip_id = clip_id_of(clip)
+                if clip_id:
+                    self.pending_ids.add(clip_id)
+                    self.known_ids.discard(clip_id)
+
+    def drop_pending(self, clip_ids: Iterable[str]) -> None:
+        """Stop waiting for clips (e.g. no longer in the feed)"""
+        with self._lock:
+            self.pending_ids.difference_update(clip_ids)
+
+    def reset(self) -> None:
+        """Forget everything (used by --full runs before re-observing)"""
+        with self._lock:
+            self.known_ids = set()
+            self.pending_ids = set()
+            self.newest_created_at = ''
+
+    def save(self) -> None:
+        """Write state atomically, preserving other feeds"""
+        with self._lock:
+            data = self._read_all()
+            self.synced_at = datetime.now().isoformat()
+            data.setdefault('feeds', {})[self.feed] = {
+                'newest_created_at': self.newest_created_at,
+                'synced_at': self.synced_at,
+                'known_ids': sorted(self.known_ids),
+                'pending_ids': sorted(self.pending_ids),
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, self.path)
+        logger.debug(f"Saved {len(self.known_ids)} known IDs for feed '{self.feed}'")
@@ -34,6 +34,16 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
+
+@app.context_processor
+def inject_player_settings():
+    """ReplayGain settings for the player bar on every page"""
+    config = get_config()
+    return {'replaygain': {
+        'enabled': bool(config.get('player', 'replaygain', default=True)),
+        'preamp_db': float(config.get('player', 'replaygain_preamp_db', default=0.0)),
+    }}
+
 # HTML Templates (embedded for simplicity)
 BASE_TEMPLATE = '''
 <!DOCTYPE html>
@@ -98,9 +108,10 @@ BASE_TEMPLATE = '''
                 </div>
                 <div class="flex items-center space-x-2">
                     <span id="current-time" class="text-xs">0:00</span>
-                    <div class="flex-1 h-1 bg-gray-700 rounded cursor-pointer" onclick="seek(event)">
+                    <div id="progress-track" class="flex-1 h-1 bg-gray-700 rounded cursor-pointer" onclick="seek(event)">
                         <div id="progress" class="progress-bar h-full bg-purple-500 rounded" style="width: 0%"></div>
                     </div>
+                    <canvas id="waveform" class="flex-1 h-8 cursor-pointer hidden" onclick="seek(event)"></canvas>
                     <span id="duration" class="text-xs">0:00</span>
                 </div>
             </div>
@@ -121,6 +132,22 @@ BASE_TEMPLATE = '''
         let isPlaying = false;
         let isShuffle = false;
         let repeatMode = 0; // 0: off, 1: all, 2: one
+        let peakLevels = null;
+        let userVolume = 0.7;
+        let trackGain = 1.0;
+        const replayGain = {{ replaygain | tojson }};
+        
+        // Same rule as suno_loudness.playback_gain; the element cannot go above 1.0
+        function gainFor(song) {
+            if (!replayGain.enabled || song.replaygain_gain == null) return 1.0;
+            let gain = Math.pow(10, (song.replaygain_gain + replayGain.preamp_db) / 20);
+            if (song.replaygain_peak) gain = Math.min(gain, 1.0 / song.replaygain_peak);
+            return gain;
+        }
+        
+        function applyVolume() {
+            audioPlayer.volume = Math.min(1.0, userVolume * trackGain);
+        }
         
         function playSong(song) {
             if (!song.local_audio_path) return;
@@ -134,11 +161,78 @@ BASE_TEMPLATE = '''
             }
             
             audioPlayer.src = '/audio/' + song.id;
+            trackGain = gainFor(song);
+            applyVolume();
             audioPlayer.play();
             isPlaying = true;
             updatePlayButton();
+            loadWaveform(song.id);
+        }
+        
+        // Waveform peaks: audiowaveform v2 .dat records (8-bit, mono), finest level first
+        function parsePeaks(buffer) {
+            const view = new DataView(buffer);
+            const levels = [];
+            let offset = 0;
+            while (offset + 24 <= buffer.byteLength) {
+                const samplesPerPixel = view.getInt32(offset + 12, true);
+                const length = view.getUint32(offset + 16, true);
+                levels.push({samplesPerPixel, length, data: new Int8Array(buffer, offset + 24, length * 2)});
+                offset += 24 + length * 2;
+            }
+            return levels;
+        }
+        
+        function loadWaveform(songId) {
+            peakLevels = null;
+            showWaveform(false);
+            fetch('/peaks/' + songId)
+                .then(r => r.ok ? r.arrayBuffer() : Promise.reject(r.status))
+                .then(buffer => {
+                    peakLevels = parsePeaks(buffer);
+                    showWaveform(peakLevels.length > 0);
+                    drawWaveform();
+                })
+                .catch(() => {});
         }
         
+        function showWaveform(show) {
+            document.getElementById('waveform').classList.toggle('hidden', !show);
+            document.getElementById('progress-track').classList.toggle('hidden', show);
+        }
+        
+        function drawWaveform() {
+            if (!peakLevels) return;
+            const canvas = document.getElementById('waveform');
+            const width = canvas.clientWidth, height = canvas.clientHeight;
+            if (!width || !height) return;
+            canvas.width = width;
+            canvas.height = height;
+            
+            // Coarsest level that still has a bucket for every pixel
+            let level = peakLevels[0];
+            for (const candidate of peakLevels) {
+                if (candidate.length >= width) level = candidate;
+            }
+            
+            const ctx = canvas.getContext('2d');
+            const played = audioPlayer.duration ? audioPlayer.currentTime / audioPlayer.duration * width : 0;
+            const mid = height / 2, scale = mid / 128;
+            for (let x = 0; x < width; x++) {
+                const start = Math.floor(x * level.length / width);
+                const end = Math.max(start + 1, Math.floor((x + 1) * level.length / width));
+                let min = 0, max = 0;
+                for (let i = start; i < end && i < level.length; i++) {
+                    min = Math.min(min, level.data[2 * i]);
+                    max = Math.max(max, level.data[2 * i + 1]);
+                }
+                ctx.fillStyle = x < played ? '#8b5cf6' : '#4b5563';
+                ctx.fillRect(x, mid - max * scale, 1, Math.max(1, (max - min) * scale));
+            }
+        }
+        
+        window.addEventListener('resize', drawWaveform);
+        
         function togglePlay() {
             if (isPlaying) {
                 audioPlayer.pause();
@@ -164,6 +258,7 @@ BASE_TEMPLATE = '''
             const progress = (audioPlayer.currentTime / audioPlayer.duration) * 100;
             document.getElementById('progress').style.width = progress + '%';
             document.getElementById('current-time').textContent = formatTime(audioPlayer.currentTime);
+            drawWaveform();
         });
         
         audioPlayer.addEventListener('loadedmetadata', () => {
@@ -180,13 +275,14 @@ BASE_TEMPLATE = '''
         });
         
         function seek(event) {
-            const bar = event.target.closest('div');
+            const bar = event.currentTarget;
             const percent = event.offsetX / bar.offsetWidth;
             audioPlayer.currentTime = percent * audioPlayer.duration;
         }
         
         function setVolume(value) {
-            audioPlayer.volume = value / 100;
+            userVolume = value / 100;
+            applyVolume();
         }
         
         function prevTrack() {
@@ -566,10 +662,19 @@ SETTINGS_TEMPLATE = '''
                 <i class="fas fa-chart-line mr-1"></i> Analyze
             </button>
         </div>
+        <div class="flex items-center justify-between py-3 border-b border-white/10">
+            <div>
+                <div class="font-semibold">Measure Loudness</div>
+                <div class="text-sm text-gray-400">EBU R128 loudness and ReplayGain tags for new or changed files</div>
+            </div>
+            <button onclick="scanLoudness()" class="px-4 py-2 bg-purple-500 rounded-lg hover:bg-purple-600 transition">
+                <i class="fas fa-volume-up mr-1"></i> Scan
+            </button>
+        </div>
         <div class="flex items-center justify-between py-3">
             <div>
                 <div class="font-semibold">Find Duplicates</div>
-                <div class="text-sm text-gray-400">Detect potential duplicate songs</div>
+                <div class="text-sm text-gray-400">Songs with similar titles (checked as songs are added)</div>
             </div>
             <a href="/duplicates" class="px-4 py-2 bg-red-500 rounded-lg hover:bg-red-600 transition">
                 <i class="fas fa-copy mr-1"></i> Find
@@ -585,6 +690,73 @@ function analyzeAll() {
         .then(r => r.json())
         .then(data => alert('Analyzed ' + data.count + ' songs'));
 }
+
+function scanLoudness() {
+    fetch('/api/scan-loudness', {method: 'POST'})
+        .then(r => r.json())
+        .then(data => alert(data.error ? 'Error: ' + data.error :
+                            'Measured ' + data.count + ' songs (' + data.skipped + ' unchanged)'));
+}
+</script>
+{% endblock %}
+'''
+
+
+DUPLICATES_TEMPLATE = '''
+{% extends "base" %}
+{% block content %}
+<div class="flex items-center justify-between mb-6">
+    <h1 class="text-3xl font-bold">
+        <i class="fas fa-copy mr-2"></i>Possible Duplicates
+        <span class="text-lg font-normal text-gray-400 ml-2">({{ pairs|length }} pairs by title)</span>
+    </h1>
+    <button onclick="rescanDuplicates()" class="px-4 py-2 bg-red-500 rounded-lg hover:bg-red-600 transition">
+        <i class="fas fa-sync mr-1"></i> Rescan
+    </button>
+</div>
+
+<div class="glass rounded-xl overflow-hidden">
+    <table class="w-full">
+        <thead class="bg-white/5">
+            <tr>
+                <th class="px-4 py-3 text-left">Song</th>
+                <th class="px-4 py-3 text-left">Possible Duplicate</th>
+                <th class="px-4 py-3 text-left">Similarity</th>
+            </tr>
+        </thead>
+        <tbody>
+            {% for song1, song2, score in pairs %}
+            <tr class="border-t border-white/5 hover:bg-white/5 transition">
+                {% for song in (song1, song2) %}
+                <td class="px-4 py-3">
+                    <div class="flex items-center space-x-3">
+                        <button onclick='playSong({{ song | tojson }})' class="hover:text-purple-400" title="Play">
+                            <i class="fas fa-play"></i>
+                        </button>
+                        <div>
+                            <div class="font-semibold">{{ song.title or 'Unknown' }}</div>
+                            <div class="text-sm text-gray-400">{{ song.duration or '--:--' }} &middot; {{ song.id[:8] }}</div>
+                        </div>
+                    </div>
+                </td>
+                {% endfor %}
+                <td class="px-4 py-3">{{ (score * 100)|round|int }}%</td>
+            </tr>
+            {% else %}
+            <tr><td colspan="3" class="px-4 py-6 text-center text-gray-400">
+                No duplicates stored. New songs are checked as they are added; Rescan checks the whole library.
+            </td></tr>
+            {% endfor %}
+        </tbody>
+    </table>
+</div>
+
+<script>
+function rescanDuplicates() {
+    fetch('/api/duplicates/rescan', {method: 'POST'})
+        .then(r => r.json())
+        .then(data => data.error ? alert('Error: ' + data.error) : location.reload());
+}
 </script>
 {% endblock %}
 '''
@@ -597,6 +769,7 @@ TEMPLATES = {
     'songs': SONGS_TEMPLATE,
     'stats': STATS_TEMPLATE,
     'settings': SETTINGS_TEMPLATE,
+    'duplicates': DUPLICATES_TEMPLATE,
 }
 
 
@@ -666,6 +839,14 @@ def settings():
     return render('settings', title='Settings')
 
 
+@app.route('/duplicates')
+def duplicates():
+    """Render stored duplicate pairs (computed as songs are added, not per request)."""
+    db = get_database()
+    pairs = db.get_duplicates('title', limit=500)
+    return render('duplicates', title='Duplicates', pairs=pairs)
+
+
 @app.route('/search')
 def search():
     """Search songs by query and render results."""
@@ -800,31 +981,116 @@ def api_import():
 @app.route('/api/analyze-all', methods=['POST'])
 def api_analyze_all():
     try:
-        analyzer = AudioAnalyzer()
         config = get_config()
+        cache_mb = config.get('audio_analysis', 'cache_max_mb', default=128)
+        stream_mb = config.get('audio_analysis', 'stream_threshold_mb', default=32)
+        analyzer = AudioAnalyzer(
+            cache_max_bytes=int(cache_mb * 1024 * 1024),
+            stream_threshold_bytes=None if stream_mb is None else int(stream_mb * 1024 * 1024),
+            analysis_mode=config.get('audio_analysis', 'analysis_mode', default='full')
+        )
         audio_dir = config.get('download', 'output_dir', default='suno_downloads')
         
-        results = analyzer.batch_analyze(audio_dir)
-        
-        # Update database
         db = get_database()
-        for result in results:
-            if result.get('analyzed'):
-                # Extract song ID from filename
-                filename = Path(result['filepath']).stem
-                songs = db.search_songs(filename, ['title'])
-                if songs:
-                    db.update_audio_info(
-                        songs[0]['id'],
-                        bpm=result.get('bpm'),
-                        key=result.get('key')
-                    )
+        index = _similarity_index(db)
+        analyzed_ids = []
+        
+        def save_result(result):
+            """Write each result to the database as soon as it is ready"""
+            # Extract song ID from filename
+            filename = Path(result['filepath']).stem
+            songs = db.search_songs(filename, ['title'])
+            if songs:
+                db.update_audio_info(
+                    songs[0]['id'],
+                    bpm=result.get('bpm'),
+                    key=result.get('key')
+                )
+                if index is not None:
+                    index.store_audio_features(songs[0]['id'],
+                                               result.get('mfcc_mean'),
+                                               result.get('chroma_mean'))
+                analyzed_ids.append(songs[0]['id'])
+        
+        results = analyzer.batch_analyze(
+            audio_dir,
+            max_workers=config.get('audio_analysis', 'workers', default=None) or os.cpu_count() or 1,
+            on_result=save_result
+        )
+        
+        if index is not None:
+            index.rebuild(analyzed_ids)
         
         return jsonify({'success': True, 'count': len(results)})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/scan-loudness', methods=['POST'])
+def api_scan_loudness():
+    """API: Measure loudness and tag files that are new or changed since the last scan"""
+    try:
+        config = get_config()
+        db = get_database()
+        signatures = db.get_loudness_signatures()
+        
+        def save_result(result):
+            song_id = db.get_song_id_by_path(result['filepath'])
+            if song_id:
+                db.update_loudness(song_id, result)
+        
+        results = AudioProcessor().scan_loudness(
+            list(signatures),
+            signatures=signatures,
+            max_workers=config.get('audio_analysis', 'workers', default=None) or os.cpu_count() or 1,
+            on_result=save_result
+        )
+        return jsonify({'success': True, 'count': len(results),
+                        'skipped': len(signatures) - len(results)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/duplicates')
+def api_duplicates():
+    """API: Stored duplicate pairs."""
+    limit = min(int(request.args.get('limit', 500)), 5000)
+    pairs = get_database().get_duplicates(request.args.get('type', 'title'), limit=limit)
+    return jsonify([{'song_1': song1, 'song_2': song2, 'similarity': score}
+                    for song1, song2, score in pairs])
+
+
+@app.route('/api/duplicates/rescan', methods=['POST'])
+def api_rescan_duplicates():
+    """API: Recompute title duplicates for the whole library."""
+    try:
+        count = get_database().refresh_title_duplicates()
+        return jsonify({'success': True, 'count': count})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def _similarity_index(db):
+    """Similarity index over the library database, or None without numpy"""
+    try:
+        from suno_similarity import SimilarityIndex
+        return SimilarityIndex(str(db.db_path))
+    except ImportError:
+        return None
+
+
+@app.route('/api/similar/<song_id>')
+def api_similar(song_id):
+    """API: Songs most similar to one song."""
+    try:
+        from suno_api import SmartPlaylistGenerator
+        limit = min(int(request.args.get('limit', 10)), 100)
+        songs = SmartPlaylistGenerator(get_database()).similar_songs(song_id, limit=limit)
+        return jsonify(songs)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/audio/<song_id>')
 def serve_audio(song_id):
     db = get_database()
@@ -836,6 +1102,31 @@ def serve_audio(song_id):
     return '', 404
 
 
+@app.route('/peaks/<song_id>')
+def serve_peaks(song_id):
+    """Multi-resolution waveform peaks, generated on first request"""
+    db = get_database()
+    song = db.get_song(song_id)
+    
+    if not song or not song.get('local_audio_path'):
+        return '', 404
+    audio_path = Path(song['local_audio_path'])
+    if not audio_path.exists():
+        return '', 404
+    
+    config = get_config()
+    waveform_dir = Path(config.get('audio_analysis', 'waveform_dir', default='suno_waveforms'))
+    peaks_path = (waveform_dir / f"{song['id']}.dat").resolve()
+    
+    if not peaks_path.exists() or peaks_path.stat().st_mtime < audio_path.stat().st_mtime:
+        if AudioAnalyzer(use_cache=False).generate_peaks(audio_path, peaks_path) is None:
+            return '', 404
+    
+    # ETag/Last-Modified revalidation; a new download regenerates the file
+    return send_file(peaks_path, mimetype='application/octet-stream',
+                     conditional=True, etag=True, max_age=86400)
+
+
 @app.route('/cover/<song_id>')
 def serve_cover(song_id):
     db = get_database()
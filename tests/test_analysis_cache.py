@@ -0,0 +1,103 @@
+"""
+Tests for suno_analysis_cache.py - Content-addressed analysis cache
+"""
+
+import os
+
+import pytest
+
+from suno_analysis_cache import AnalysisCache
+from suno_audio import AudioAnalyzer
+
+PARAMS = {'version': 1, 'bpm': True}
+
+
+def result(bpm=120.0, frames=50):
+    return {'filepath': 'ignored', 'filename': 'ignored', 'analyzed': True, 'bpm': bpm,
+            'key': 'A minor', 'beat_frames': list(range(frames)), 'chroma_mean': [0.5] * 12}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnalysisCache(str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def song(tmp_path):
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"audio" * 100)
+    return path
+
+
+class TestAnalysisCache:
+    """Tests for AnalysisCache class"""
+
+    def test_round_trip(self, cache, song):
+        assert cache.get(song, PARAMS) is None
+        assert cache.put(song, PARAMS, result())
+
+        cached = cache.get(song, PARAMS)
+        assert cached['bpm'] == 120.0
+        assert cached['beat_frames'] == list(range(50))
+        assert cached['chroma_mean'] == [0.5] * 12
+        assert cached['filepath'] == str(song)
+        assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+
+    def test_keyed_by_content_not_path(self, cache, song, tmp_path):
+        cache.put(song, PARAMS, result())
+        copy = tmp_path / "renamed.mp3"
+        copy.write_bytes(song.read_bytes())
+
+        cached = cache.get(copy, PARAMS)
+        assert cached['bpm'] == 120.0
+        assert cached['filename'] == "renamed.mp3"
+
+    def test_changed_file_or_params_miss(self, cache, song):
+        cache.put(song, PARAMS, result())
+        assert cache.get(song, {'version': 2, 'bpm': True}) is None
+
+        song.write_bytes(b"different audio")
+        os.utime(song, ns=(0, 0))  # defeat the (size, mtime) memo too
+        assert cache.get(song, PARAMS) is None
+
+    def test_failed_results_not_stored(self, cache, song):
+        assert not cache.put(song, PARAMS, {'analyzed': False})
+        assert not cache.put(song, PARAMS, {'analyzed': True, 'error': 'decode failed'})
+        assert cache.get(song, PARAMS) is None
+
+    def test_eviction_keeps_recently_used(self, cache, tmp_path):
+        songs = []
+        for i in range(3):
+            path = tmp_path / f"song{i}.mp3"
+            path.write_bytes(bytes([i]) * 100)
+            cache.put(path, PARAMS, result(frames=200))
+            songs.append(path)
+        cache.get(songs[0], PARAMS)  # most recently used now
+
+        per_entry = cache.total_bytes() // 3
+        assert cache.evict(max_bytes=per_entry * 2) == 1
+        assert cache.get(songs[1], PARAMS) is None
+        assert cache.get(songs[0], PARAMS) is not None
+        assert cache.get(songs[2], PARAMS) is not None
+
+
+class TestAnalyzerCaching:
+    """Tests for AudioAnalyzer's use of the cache"""
+
+    def test_rerun_only_analyzes_new_files(self, tmp_path, song):
+        analyzer = AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"))
+        analyzer.cache.put(song, analyzer._cache_params(), result(bpm=99.0))
+        new = tmp_path / "new.mp3"
+        new.write_bytes(b"new audio")
+
+        analyzed = []
+        analyzer.analyze_file = lambda path: analyzed.append(path) or {
+            'filepath': path, 'analyzed': True}
+
+        results = list(analyzer.iter_analyze([song, new], max_workers=1, mode='thread'))
+        assert analyzed == [str(new)]
+        assert {r.get('bpm') for r in results} == {99.0, None}
+
+    def test_cache_disabled(self, tmp_path):
+        analyzer = AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"), use_cache=False)
+        assert analyzer.cache is None
@@ -0,0 +1,106 @@
+"""
+Tests for AudioAnalyzer.batch_analyze / iter_analyze scheduling in suno_audio.py
+"""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from suno_audio import AudioAnalyzer, AudioProcessor
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    """Three fake audio files of different sizes"""
+    for name, size in [("small.mp3", 10), ("large.mp3", 3000), ("medium.mp3", 500)]:
+        (tmp_path / name).write_bytes(b"\x00" * size)
+    return tmp_path
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    return AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"))
+
+
+def fake_analysis(order):
+    def analyze_file(filepath):
+        order.append(filepath.rsplit('/', 1)[-1])
+        return {'filepath': filepath, 'analyzed': True, 'bpm': 120.0}
+    return analyze_file
+
+
+class TestBatchAnalyze:
+    """Tests for batch analysis scheduling"""
+
+    def test_largest_first_and_streamed(self, analyzer, audio_dir):
+        order, streamed = [], []
+        analyzer.analyze_file = fake_analysis(order)
+
+        results = analyzer.batch_analyze(str(audio_dir), max_workers=1, mode='thread',
+                                         on_result=streamed.append)
+
+        assert order == ["large.mp3", "medium.mp3", "small.mp3"]
+        assert len(results) == 3
+        assert streamed == results
+
+    def test_cancel_skips_queued_files(self, analyzer, audio_dir):
+        cancel = threading.Event()
+        order = []
+        analyzer.analyze_file = fake_analysis(order)
+
+        results = analyzer.batch_analyze(str(audio_dir), max_workers=1, mode='thread',
+                                         on_result=lambda r: cancel.set(),
+                                         cancel_event=cancel)
+        # Two tasks per worker are queued ahead; the rest are dropped
+        assert len(results) == 2
+        assert "small.mp3" not in order
+
+    def test_cached_excerpts_of_large_files_are_not_rerun(self, tmp_path, audio_dir):
+        analyzer = AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"),
+                                 stream_threshold_bytes=100, analysis_mode='excerpt')
+        # Stored the way analyze_file() stores excerpt results (never streamed)
+        cached = {'filepath': str(audio_dir / "large.mp3"), 'analyzed': True, 'bpm': 90.0}
+        analyzer.cache.put(audio_dir / "large.mp3", analyzer._cache_params(streaming=False), cached)
+        order = []
+        analyzer.analyze_file = fake_analysis(order)
+
+        results = list(analyzer.iter_analyze(sorted(audio_dir.glob("*.mp3")), max_workers=1, mode='thread'))
+        assert results[0]['bpm'] == 90.0
+        assert order == ["medium.mp3", "small.mp3"]
+
+    def test_process_mode_returns_one_result_per_file(self, analyzer, audio_dir):
+        results = list(analyzer.iter_analyze(sorted(audio_dir.glob("*.mp3")), max_workers=2))
+        assert len(results) == 3
+
+    def test_unknown_mode(self, analyzer, audio_dir):
+        with pytest.raises(ValueError):
+            list(analyzer.iter_analyze([audio_dir / "small.mp3"], mode='gpu'))
+
+
+class TestBatchConvert:
+    """Tests for AudioProcessor.batch_convert"""
+
+    def test_shared_stems_get_distinct_outputs(self, tmp_path, monkeypatch):
+        src = tmp_path / 'src'
+        src.mkdir()
+        for name in ['a.mp3', 'a.wav', 'b.mp3', 'c.flac']:
+            (src / name).write_bytes(name.encode())
+
+        def fake_convert(self, filepath, target_format, output_dir=None, bitrate="320k", output_path=None):
+            # Writes where the real one does
+            output_path = Path(output_path or Path(output_dir or self.output_dir) /
+                               f"{Path(filepath).stem}.{target_format}")
+            output_path.write_bytes(Path(filepath).read_bytes())
+            return output_path
+
+        monkeypatch.setattr(AudioProcessor, 'convert_format', fake_convert)
+        out = tmp_path / 'out'
+        processor = AudioProcessor(str(out))
+
+        assert processor.batch_convert(str(src), 'flac', max_workers=1) == 3
+        assert sorted(p.name for p in out.glob('*.flac')) == ['a_mp3.flac', 'a_wav.flac', 'b.flac']
+        assert (out / 'a_wav.flac').read_bytes() == b'a.wav'
+        # Re-run: everything is up to date
+        assert processor.batch_convert(str(src), 'flac', max_workers=1) == 0
+        assert processor.batch_convert(str(src), 'flac', dry_run=True) == 0
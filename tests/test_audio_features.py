@@ -0,0 +1,110 @@
+"""
+Tests for the shared feature-extraction helpers in suno_audio.py
+"""
+
+import pytest
+
+from suno_audio import AudioAnalyzer, NUMPY_AVAILABLE
+
+needs_numpy = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+
+
+@needs_numpy
+class TestWaveformPeaks:
+    """Tests for waveform_peaks()"""
+
+    def test_min_max_per_bucket(self):
+        import numpy as np
+        from suno_audio import waveform_peaks
+
+        y = np.array([0.1, -0.5, 0.3, 0.9, -0.2, 0.0], dtype=np.float32)
+        peaks = waveform_peaks(y, 3)
+        assert peaks.shape == (3, 2)
+        assert peaks.ravel().tolist() == pytest.approx([-0.5, 0.1, 0.3, 0.9, -0.2, 0.0])
+
+    def test_more_buckets_than_samples(self):
+        import numpy as np
+        from suno_audio import waveform_peaks
+
+        assert waveform_peaks(np.ones(4, dtype=np.float32), 800).shape == (4, 2)
+        assert waveform_peaks(np.zeros(0, dtype=np.float32), 800).shape == (0, 2)
+
+
+def test_unknown_feature_rejected(tmp_path):
+    analyzer = AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"))
+    with pytest.raises(ValueError):
+        analyzer.extract_features(tmp_path / "song.mp3", ['bpm', 'lyrics'])
+
+
+def test_streaming_only_above_threshold(tmp_path):
+    analyzer = AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"), stream_threshold_bytes=100)
+    small, large = tmp_path / "small.wav", tmp_path / "large.wav"
+    small.write_bytes(b"\x00" * 100)
+    large.write_bytes(b"\x00" * 101)
+    assert not analyzer._should_stream(small)
+    assert analyzer._should_stream(large)
+
+    analyzer.stream_threshold_bytes = None
+    assert not analyzer._should_stream(large)
+
+
+def test_stream_tempo_on_click_track(tmp_path):
+    pytest.importorskip("librosa")
+    import numpy as np
+    import soundfile
+
+    sr = 22050
+    t = np.arange(40 * sr) / sr
+    clicks = (np.mod(t, 0.5) < 0.01).astype(np.float32)  # 120 BPM
+    path = tmp_path / "clicks.wav"
+    soundfile.write(str(path), clicks * 0.8, sr)
+
+    analyzer = AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"), use_cache=False)
+    streamed = analyzer.analyze_stream(path, block_frames=64)
+    assert streamed['duration'] == pytest.approx(40.0, abs=0.05)
+    assert streamed['bpm'] == pytest.approx(120.0, rel=0.03)
+    assert len(streamed['mfcc_mean']) == 13 and 'key' in streamed
+
+    with pytest.raises(ValueError):
+        analyzer.analyze_stream(path, ['spectrogram'])
+
+
+def test_analysis_mode(tmp_path):
+    with pytest.raises(ValueError):
+        AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"), analysis_mode='preview')
+
+    full = AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"))
+    excerpt = AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"), analysis_mode='excerpt')
+    assert full._cache_params() != excerpt._cache_params()
+    assert excerpt._worker_kwargs()['analysis_mode'] == 'excerpt'
+
+
+@needs_numpy
+def test_merge_tempos_takes_largest_agreeing_group():
+    from suno_audio import _merge_tempos
+
+    bpm, share = _merge_tempos([120.0, 121.0, 60.5, 119.5])
+    assert bpm == pytest.approx(120.17, abs=0.01)
+    assert share == 0.75
+    assert _merge_tempos([0.0, None]) == (0.0, 0.0)
+
+
+def test_excerpt_analysis_on_click_track(tmp_path):
+    pytest.importorskip("librosa")
+    import numpy as np
+    import soundfile
+
+    sr = 22050
+    t = np.arange(90 * sr) / sr
+    clicks = (np.mod(t, 0.5) < 0.01).astype(np.float32)  # 120 BPM
+    path = tmp_path / "clicks.wav"
+    soundfile.write(str(path), clicks * 0.8, sr)
+
+    analyzer = AudioAnalyzer(cache_dir=str(tmp_path / ".audio_cache"), use_cache=False,
+                             analysis_mode='excerpt')
+    result = analyzer.analyze_file(path)
+    assert result['analysis_mode'] == 'excerpt'
+    assert len(result['excerpt_offsets']) == 3
+    assert result['duration'] == pytest.approx(90.0, abs=0.05)
+    assert result['bpm'] == pytest.approx(120.0, rel=0.03)
+    assert result['bpm_confidence'] == 1.0
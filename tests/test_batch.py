@@ -0,0 +1,113 @@
+"""
+Tests for suno_batch.py - Parallel, incremental batch jobs
+"""
+
+import os
+import shutil
+
+import pytest
+
+from suno_batch import (BatchTask, OutputManifest, run_batch, MANIFEST_FILENAME,
+                        DONE, UP_TO_DATE)
+
+
+def copy_upper(source, output, params):
+    """Worker: copies a file, upper-casing it when asked"""
+    with open(source, 'r') as f:
+        text = f.read()
+    with open(output, 'w') as f:
+        f.write(text.upper() if params.get('upper') else text)
+    return True
+
+
+def fail(source, output, params):
+    return False
+
+
+@pytest.fixture
+def sources(tmp_path):
+    src = tmp_path / 'src'
+    src.mkdir()
+    for i in range(4):
+        (src / f'song{i}.txt').write_text(f'song {i}')
+    return sorted(src.iterdir())
+
+
+def tasks_for(sources, out_dir, **params):
+    out_dir.mkdir(exist_ok=True)
+    return [BatchTask(s, out_dir / s.name, params) for s in sources]
+
+
+class TestRunBatch:
+    """Tests for run_batch()"""
+
+    def test_rerun_skips_current_outputs(self, tmp_path, sources):
+        out = tmp_path / 'out'
+        tasks = tasks_for(sources, out, upper=True)
+
+        first = run_batch(tasks, copy_upper, OutputManifest(out / MANIFEST_FILENAME), max_workers=1)
+        assert (first['done'], first['up_to_date']) == (4, 0)
+        assert (out / 'song0.txt').read_text() == 'SONG 0'
+
+        second = run_batch(tasks, copy_upper, OutputManifest(out / MANIFEST_FILENAME), max_workers=1)
+        assert (second['done'], second['up_to_date'], second['pending']) == (0, 4, 0)
+
+    def test_changed_source_params_or_output_are_redone(self, tmp_path, sources):
+        out = tmp_path / 'out'
+        manifest = OutputManifest(out / MANIFEST_FILENAME)
+        run_batch(tasks_for(sources, out, upper=True), copy_upper, manifest, max_workers=1)
+
+        # Newer source
+        stat = sources[0].stat()
+        os.utime(sources[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 10))
+        # Output edited by something else
+        (out / 'song1.txt').write_text('edited')
+
+        report = run_batch(tasks_for(sources, out, upper=True), copy_upper, manifest, max_workers=1)
+        assert (report['done'], report['up_to_date']) == (2, 2)
+
+        report = run_batch(tasks_for(sources, out, upper=False), copy_upper, manifest, max_workers=1)
+        assert report['done'] == 4
+        assert (out / 'song0.txt').read_text() == 'song 0'
+
+    def test_dry_run_plans_without_running(self, tmp_path, sources):
+        out = tmp_path / 'out'
+        tasks = tasks_for(sources, out)
+        manifest = OutputManifest(out / MANIFEST_FILENAME)
+        run_batch(tasks[:1], copy_upper, manifest, max_workers=1)
+
+        report = run_batch(tasks, copy_upper, manifest, dry_run=True)
+        assert (report['pending'], report['up_to_date'], report['done']) == (3, 1, 0)
+        assert report['pending_bytes'] == sum(s.stat().st_size for s in sources[1:])
+        assert not (out / 'song3.txt').exists()
+
+    def test_parallel_run_reports_statuses(self, tmp_path, sources):
+        out = tmp_path / 'out'
+        manifest = OutputManifest(out / MANIFEST_FILENAME)
+        tasks = tasks_for(sources, out)
+        run_batch(tasks[:2], copy_upper, manifest, max_workers=1)
+
+        statuses = {}
+        report = run_batch(tasks, copy_upper, manifest, max_workers=2,
+                           on_result=lambda task, status: statuses.update({task.source.name: status}))
+        assert report['done'] == 2 and report['files_per_sec'] > 0
+        assert statuses == {'song0.txt': UP_TO_DATE, 'song1.txt': UP_TO_DATE,
+                            'song2.txt': DONE, 'song3.txt': DONE}
+        assert OutputManifest(out / MANIFEST_FILENAME).is_current(tasks[3])
+
+    def test_failures_are_not_recorded(self, tmp_path, sources):
+        out = tmp_path / 'out'
+        manifest = OutputManifest(out / MANIFEST_FILENAME)
+        report = run_batch(tasks_for(sources, out), fail, manifest, max_workers=1)
+        assert (report['done'], report['failed']) == (0, 4)
+        assert not manifest.entries
+
+    def test_in_place_outputs(self, tmp_path, sources):
+        # Source and output are the same file (e.g. in-place normalization)
+        tasks = [BatchTask(s, s, {'upper': True}) for s in sources]
+        manifest = OutputManifest(tmp_path / MANIFEST_FILENAME)
+        assert run_batch(tasks, copy_upper, manifest, max_workers=1)['done'] == 4
+        assert run_batch(tasks, copy_upper, manifest, max_workers=1)['done'] == 0
+        shutil.copy(sources[0], sources[0].with_suffix('.bak'))
+        sources[0].write_text('replaced')
+        assert run_batch(tasks, copy_upper, manifest, max_workers=1)['done'] == 1
@@ -136,6 +136,18 @@ class TestSunoDatabase:
         result = temp_db.add_song(song)
         assert result is True
     
+    def test_add_songs_batch(self, temp_db):
+        """Test adding several songs in one call"""
+        songs = [
+            {'title': f'Song {i}', 'url': f'https://suno.com/song/12345678-1234-1234-1234-12345678901{i}'}
+            for i in range(3)
+        ] + [{'title': 'Bad', 'url': 'invalid-url'}]
+        
+        assert temp_db.add_songs(songs) == 3
+        assert temp_db.get_song_ids() == {
+            f'12345678-1234-1234-1234-12345678901{i}' for i in range(3)
+        }
+    
     def test_add_song_invalid_url(self, temp_db):
         """Test that invalid URL returns False"""
         song = {
@@ -284,6 +296,49 @@ class TestSunoDatabase:
         finally:
             os.unlink(json_path)
 
+    def test_loudness_columns_added_to_existing_database(self, tmp_path):
+        """Test that opening an older database adds the new songs columns"""
+        import sqlite3
+        path = tmp_path / 'old.db'
+        with sqlite3.connect(str(path)) as conn:
+            conn.execute('CREATE TABLE songs (id TEXT PRIMARY KEY, title TEXT, artist TEXT, '
+                         'url TEXT UNIQUE, local_audio_path TEXT, bpm REAL, musical_key TEXT)')
+            conn.execute("INSERT INTO songs (id, title, url, local_audio_path) "
+                         "VALUES ('abc', 'Old Song', 'u', '/music/old.mp3')")
+    
+        db = SunoDatabase(str(path))
+        db.update_loudness('abc', {'loudness_lufs': -9.5, 'true_peak_dbtp': -0.3,
+                                   'replaygain_gain': -8.5, 'replaygain_peak': 0.966,
+                                   'signature': '100:200'})
+    
+        song = db.get_song('abc')
+        assert song['title'] == 'Old Song'
+        assert song['replaygain_gain'] == -8.5
+        assert db.get_loudness_signatures() == {'/music/old.mp3': '100:200'}
+        assert db.get_song_id_by_path('/music/old.mp3') == 'abc'
+    
+        SunoDatabase(str(path))  # re-opening is a no-op
+
+    def test_title_duplicates_stored_as_songs_are_added(self, temp_db):
+        """Test that add_songs records similar-title pairs in the duplicates table"""
+        url = 'https://suno.com/song/{0}{0}{0}{0}{0}{0}{0}{0}-1111-1111-1111-111111111111'
+        temp_db.add_songs([
+            {'title': 'Midnight City Lights', 'url': url.format(1)},
+            {'title': 'Morning Coffee', 'url': url.format(2)},
+        ])
+        assert temp_db.get_duplicates() == []
+    
+        temp_db.add_songs([{'title': 'midnight city lights', 'url': url.format(3)}])
+        pairs = temp_db.get_duplicates()
+        assert [(a['title'], b['title'], score) for a, b, score in pairs] == [
+            ('Midnight City Lights', 'midnight city lights', 1.0)]
+    
+        # Renaming a song replaces its pairs
+        temp_db.add_songs([{'title': 'Evening Tea', 'url': url.format(3)}])
+        assert temp_db.get_duplicates() == []
+        temp_db.add_songs([{'title': 'Morning Coffee', 'url': url.format(4)}])
+        assert [(a['id'][0], b['id'][0]) for a, b, _ in temp_db.find_duplicates_by_title()] == [('2', '4')]
+
 
 # =============================================================================
 # Run tests
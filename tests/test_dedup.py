@@ -0,0 +1,126 @@
+"""
+Tests for suno_dedup.py - Duplicate detection for files and titles
+"""
+
+import os
+import itertools
+
+import pytest
+
+from suno_dedup import (EDGE_BYTES, FileHashCache, find_duplicate_files, find_similar_titles,
+                         hash_edges, title_similarity)
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return path
+
+
+@pytest.fixture
+def library(tmp_path):
+    """Large files that differ only in the middle, plus real duplicates"""
+    lib = tmp_path / 'audio'
+    lib.mkdir()
+    big = os.urandom(4 * EDGE_BYTES)
+    middle = bytearray(big)
+    middle[2 * EDGE_BYTES] ^= 0xFF
+    return {
+        'a': write(lib / 'a.wav', big),
+        'a_copy': write(lib / 'a_copy.wav', big),
+        'middle': write(lib / 'middle.wav', bytes(middle)),
+        'small': write(lib / 'small.mp3', b'x' * 1000),
+        'small_copy': write(lib / 'small_copy.mp3', b'x' * 1000),
+        'small_other': write(lib / 'small_other.mp3', b'y' * 1000),
+        'unique': write(lib / 'unique.mp3', b'z' * 1234),
+        'empty': write(lib / 'empty.mp3', b''),
+        'empty2': write(lib / 'empty2.mp3', b''),
+    }
+
+
+class TestFindDuplicateFiles:
+    """Tests for find_duplicate_files()"""
+
+    def test_groups_identical_files(self, library):
+        stats = {}
+        groups = find_duplicate_files(library.values(), stats=stats)
+        assert groups == [[library['a'], library['a_copy']],
+                          [library['small'], library['small_copy']]]
+        # Unique sizes and empty files are never read; small files need no full hash
+        assert stats == {'files': 7, 'edge_hashed': 6, 'full_hashed': 3}
+
+    def test_edges_alone_do_not_decide_large_files(self, library):
+        assert hash_edges(library['a']) == hash_edges(library['middle'])
+        groups = find_duplicate_files([library['a'], library['middle']])
+        assert groups == []
+
+
+class TestFileHashCache:
+    """Tests for FileHashCache"""
+
+    def test_repeat_scan_reads_nothing(self, tmp_path, library, monkeypatch):
+        db_path = tmp_path / 'library.db'
+        first = find_duplicate_files(library.values(), FileHashCache(str(db_path)))
+
+        import suno_dedup
+        monkeypatch.setattr(suno_dedup, 'hash_edges', pytest.fail)
+        monkeypatch.setattr(suno_dedup, 'hash_file', pytest.fail)
+        assert find_duplicate_files(library.values(), FileHashCache(str(db_path))) == first
+
+    def test_changed_file_is_rehashed(self, tmp_path, library):
+        db_path = tmp_path / 'library.db'
+        find_duplicate_files(library.values(), FileHashCache(str(db_path)))
+
+        # Same size, new contents and mtime
+        data = bytearray(library['a_copy'].read_bytes())
+        data[2 * EDGE_BYTES] ^= 0xFF
+        library['a_copy'].write_bytes(bytes(data))
+        stat = library['a_copy'].stat()
+        os.utime(library['a_copy'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        groups = find_duplicate_files(library.values(), FileHashCache(str(db_path)))
+        assert [library['a_copy'], library['middle']] in groups
+        assert [library['a'], library['a_copy']] not in groups
+
+    def test_prune_drops_missing_files(self, tmp_path, library):
+        cache = FileHashCache(str(tmp_path / 'library.db'))
+        find_duplicate_files(library.values(), cache)
+        library['small_copy'].unlink()
+
+        assert cache.prune() == 1
+        with cache._get_connection() as conn:
+            paths = {row['path'] for row in conn.execute('SELECT path FROM file_hashes')}
+        assert str(library['small_copy']) not in paths
+        assert str(library['small']) in paths
+
+
+class TestFindSimilarTitles:
+    """Tests for find_similar_titles()"""
+
+    TITLES = {
+        'a': 'Midnight City Lights',
+        'b': 'midnight city lights',
+        'c': 'Midnight City Lights Remix',
+        'd': 'Morning Coffee',
+        'e': 'Morning Coffee Blues Again',
+        'f': '',
+        'g': 'Love Song',
+        'h': 'Love Song',
+    }
+
+    def test_matches_all_pairs_comparison(self):
+        for threshold in (0.5, 0.75, 0.8, 1.0):
+            expected = {(a, b) for a, b in itertools.combinations(self.TITLES, 2)
+                        if title_similarity(self.TITLES[a], self.TITLES[b]) >= threshold}
+            found = find_similar_titles(self.TITLES, threshold)
+            assert {(a, b) for a, b, _ in found} == expected
+
+    def test_scores_and_order(self):
+        stats = {}
+        found = find_similar_titles(self.TITLES, 0.75, stats=stats)
+        assert found == [('a', 'b', 1.0), ('g', 'h', 1.0), ('a', 'c', 0.75), ('b', 'c', 0.75)]
+        assert stats['titles'] == 7
+        assert stats['candidates'] < 21  # fewer than all pairs of non-empty titles
+
+    def test_only_new_ids(self):
+        found = find_similar_titles(self.TITLES, 0.75, only=['c'])
+        assert [(a, b) for a, b, _ in found] == [('a', 'c'), ('b', 'c')]
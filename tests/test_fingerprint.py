@@ -0,0 +1,113 @@
+"""
+Tests for suno_fingerprint.py - Landmark fingerprints and the hash index
+"""
+
+import pytest
+
+from suno_fingerprint import (NUMPY_AVAILABLE, LIBROSA_AVAILABLE, SAMPLE_RATE, HOP_LENGTH,
+                              FingerprintIndex, fingerprint)
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+
+
+def _song(seed, seconds=40, noise=0.01):
+    """Random plucked melody over a bass line, with a noise snare"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    note_len = int(0.25 * SAMPLE_RATE)
+    t = np.arange(note_len) / SAMPLE_RATE
+    roots = 110 * 2 ** (rng.integers(0, 12, size=seconds) / 12)
+    out = np.zeros(int(seconds * SAMPLE_RATE))
+    for i in range(int(seconds / 0.25)):
+        root = roots[i // 8]
+        note = 2 * root * 2 ** (rng.choice([0, 3, 4, 7, 12, 15, 16, 19]) / 12)
+        out[i * note_len:(i + 1) * note_len] += (
+            sum(np.sin(2 * np.pi * note * h * t) / h for h in range(1, 4)) * np.exp(-6 * t)
+            + 0.5 * np.sin(np.pi * root * t))
+        if i % 2 == 0:
+            out[i * note_len:i * note_len + 800] += rng.normal(0, 0.4, 800) * np.exp(-np.arange(800) / 150)
+    out += np.random.default_rng(seed + 1000).normal(0, noise, len(out))
+    return out / np.abs(out).max() * 0.8
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = FingerprintIndex(str(tmp_path / 'library.db'))
+    for seed in range(4):
+        index.add(f'/music/song{seed}.mp3', *fingerprint(_song(seed)), signature=f'sig{seed}')
+    return index
+
+
+class TestFingerprint:
+    """Tests for landmark extraction"""
+
+    def test_hashes_are_deterministic_and_bounded(self):
+        hashes, offsets = fingerprint(_song(0, seconds=10))
+        again, _ = fingerprint(_song(0, seconds=10))
+        assert len(hashes) == len(offsets) > 200
+        assert (hashes == again).all()
+        assert hashes.max() < 1 << 24
+
+    def test_short_input(self):
+        hashes, offsets = fingerprint([0.0] * 100)
+        assert len(hashes) == len(offsets) == 0
+
+    def test_rejects_other_sample_rates(self):
+        with pytest.raises(ValueError):
+            fingerprint(_song(0, seconds=2), sr=22050)
+
+
+class TestFingerprintIndex:
+    """Tests for FingerprintIndex"""
+
+    def test_trimmed_noisy_copy_matches_with_offset(self, index):
+        trim = 3.3
+        copy = _song(2, noise=0.03)[int(trim * SAMPLE_RATE):] * 0.5
+        matches = index.match(*fingerprint(copy))
+        assert [m[0].name for m in matches] == ['song2.mp3']
+        assert matches[0][1] > 0.3
+        assert matches[0][2] == pytest.approx(trim, abs=2 * HOP_LENGTH / SAMPLE_RATE)
+
+    def test_different_songs_do_not_match(self, index):
+        assert index.match(*fingerprint(_song(99))) == []
+        assert index.find_duplicates() == []
+
+    def test_find_duplicates_and_replace(self, index):
+        index.add('/music/song1_reupload.mp3', *fingerprint(_song(1, noise=0.02)))
+        pairs = index.find_duplicates()
+        assert [(a.name, b.name) for a, b, _ in pairs] == [('song1.mp3', 'song1_reupload.mp3')]
+
+        # Re-indexing a path replaces its postings
+        index.add('/music/song1_reupload.mp3', *fingerprint(_song(7)))
+        assert index.find_duplicates() == []
+        assert len(index) == 5
+
+    def test_remove_and_signatures(self, index):
+        assert index.signatures()['/music/song0.mp3'] == 'sig0'
+        assert index.remove('/music/song0.mp3')
+        assert not index.remove('/music/song0.mp3')
+        assert index.match(*fingerprint(_song(0))) == []
+        # Nothing under /music exists on disk
+        assert index.prune() == 3
+        assert len(index) == 0
+
+
+@pytest.mark.skipif(not LIBROSA_AVAILABLE, reason="librosa not installed")
+class TestDuplicateDetector:
+    """Tests for DuplicateDetector.find_duplicates_by_fingerprint"""
+
+    def test_incremental_scan_finds_reupload(self, tmp_path):
+        soundfile = pytest.importorskip('soundfile')
+        from suno_audio import DuplicateDetector
+
+        audio_dir = tmp_path / 'audio'
+        audio_dir.mkdir()
+        for seed in range(3):
+            soundfile.write(str(audio_dir / f'song{seed}.wav'), _song(seed, seconds=20), SAMPLE_RATE)
+        detector = DuplicateDetector(fingerprint_index=FingerprintIndex(str(tmp_path / 'library.db')))
+        assert detector.find_duplicates_by_fingerprint(str(audio_dir), max_workers=1) == []
+
+        soundfile.write(str(audio_dir / 'reupload.wav'), _song(1, seconds=20)[SAMPLE_RATE:] * 0.7, SAMPLE_RATE)
+        pairs = detector.find_duplicates_by_fingerprint(str(audio_dir), new_only=True, max_workers=1)
+        assert [(a.name, b.name) for a, b, _ in pairs] == [('reupload.wav', 'song1.wav')]
+        assert detector.index_fingerprints(str(audio_dir)) == []
@@ -0,0 +1,95 @@
+"""
+Tests for suno_http_cache.py - Disk-backed HTTP response cache
+"""
+
+import json
+
+import pytest
+
+from suno_http_cache import HTTPCache, cache_key
+
+URL = "https://studio-api.suno.ai/api/song/abc"
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b""
+        self.headers = headers or {}
+        self.url = URL
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeSender:
+    """Records requests and returns queued responses"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, method, url, params=None, headers=None, **kwargs):
+        self.calls.append(headers or {})
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HTTPCache(tmp_path / "http.db", default_ttl=60)
+
+
+class TestHTTPCache:
+    """Tests for HTTPCache class"""
+
+    def test_fresh_entry_served_without_network(self, cache):
+        send = FakeSender([FakeResponse(body={'id': 'abc'})])
+        first = cache.fetch(send, 'GET', URL)
+        second = cache.fetch(send, 'GET', URL)
+
+        assert first.json() == second.json() == {'id': 'abc'}
+        assert second.from_cache
+        assert len(send.calls) == 1
+        assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+
+    def test_stale_entry_revalidates_with_etag(self, cache):
+        send = FakeSender([
+            FakeResponse(body={'id': 'abc'}, headers={'etag': '"v1"'}),
+            FakeResponse(status_code=304),
+        ])
+        cache.fetch(send, 'GET', URL, ttl=0)
+        response = cache.fetch(send, 'GET', URL, ttl=0)
+
+        assert send.calls[1] == {'If-None-Match': '"v1"'}
+        assert response.json() == {'id': 'abc'}
+        assert cache.stats['revalidated'] == 1
+        assert cache.hit_rate() == 0.5
+
+    def test_errors_and_no_store_are_not_cached(self, cache):
+        send = FakeSender([
+            FakeResponse(status_code=404),
+            FakeResponse(body={}, headers={'cache-control': 'no-store'}),
+            FakeResponse(body={}),
+        ])
+        cache.fetch(send, 'GET', URL)
+        cache.fetch(send, 'GET', URL)
+        cache.fetch(send, 'GET', URL)
+        assert len(send.calls) == 3
+
+    def test_non_get_passes_through(self, cache):
+        send = FakeSender([FakeResponse(body={}), FakeResponse(body={})])
+        cache.fetch(send, 'POST', URL)
+        cache.fetch(send, 'POST', URL)
+        assert len(send.calls) == 2
+
+    def test_key_ignores_param_order_and_honours_scope(self):
+        assert cache_key('get', URL, {'a': 1, 'b': 2}) == cache_key('GET', URL, {'b': 2, 'a': 1})
+        assert cache_key('GET', URL, scope='u1') != cache_key('GET', URL, scope='u2')
+
+    def test_endpoint_memo_persists(self, cache, tmp_path):
+        assert cache.preferred_endpoint('song') is None
+        cache.remember_endpoint('song', "{base}/api/clip/{song_id}")
+        reopened = HTTPCache(tmp_path / "http.db")
+        assert reopened.preferred_endpoint('song') == "{base}/api/clip/{song_id}"
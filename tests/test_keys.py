@@ -0,0 +1,56 @@
+"""
+Tests for suno_keys.py - Batch key estimation
+"""
+
+import pytest
+
+from suno_keys import NUMPY_AVAILABLE, PITCH_NAMES, PROFILES
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+
+
+@pytest.fixture
+def np():
+    import numpy
+    return numpy
+
+
+class TestKeyDetection:
+    """Tests for profile correlation"""
+
+    def test_profile_matrix_rows_are_normalised(self, np):
+        from suno_keys import profile_matrix
+
+        matrix = profile_matrix('krumhansl')
+        assert matrix.shape == (24, 12)
+        assert np.allclose(matrix.mean(axis=1), 0)
+        assert np.allclose(np.linalg.norm(matrix, axis=1), 1)
+
+    @pytest.mark.parametrize('profile', sorted(PROFILES))
+    def test_every_rotated_profile_is_recovered_in_one_batch(self, np, profile):
+        from suno_keys import detect_keys
+
+        major, minor = (np.asarray(p) for p in PROFILES[profile])
+        chroma = [np.roll(major, k) for k in range(12)] + [np.roll(minor, k) for k in range(12)]
+        keys = detect_keys(np.stack(chroma), profile)
+
+        expected = [f"{name} major" for name in PITCH_NAMES] + [f"{name} minor" for name in PITCH_NAMES]
+        assert [k['key'] for k in keys] == expected
+        assert all(k['key_confidence'] == pytest.approx(1.0) for k in keys)
+
+    def test_camelot_codes(self, np):
+        from suno_keys import detect_key
+
+        major, minor = (np.asarray(p) for p in PROFILES['temperley'])
+        assert detect_key(major)['camelot'] == '8B'               # C major
+        assert detect_key(np.roll(minor, 9))['camelot'] == '8A'   # A minor
+        assert detect_key(np.roll(major, 1))['camelot'] == '3B'   # C#/Db major
+
+    def test_silence_and_bad_shapes(self, np):
+        from suno_keys import key_scores
+
+        assert not key_scores(np.zeros(12)).any()
+        with pytest.raises(ValueError):
+            key_scores(np.ones(11))
+        with pytest.raises(ValueError):
+            key_scores(np.ones(12), profile='bogus')
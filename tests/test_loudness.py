@@ -0,0 +1,90 @@
+"""
+Tests for suno_loudness.py - EBU R128 measurement and ReplayGain tags
+"""
+
+import math
+
+import pytest
+
+from suno_loudness import SCIPY_AVAILABLE, playback_gain, replaygain_gain
+
+needs_scipy = pytest.mark.skipif(not SCIPY_AVAILABLE, reason="numpy/scipy not installed")
+
+
+def _sine(np, sr, seconds, dbfs, freq=1000.0, channels=2):
+    t = np.arange(int(seconds * sr)) / sr
+    return np.stack([10 ** (dbfs / 20) * np.sin(2 * np.pi * freq * t)] * channels)
+
+
+class TestPlaybackGain:
+    """Tests for gain rules shared by the players"""
+
+    def test_untagged_tracks_play_unchanged(self):
+        assert playback_gain(None) == 1.0
+        assert playback_gain(None, 0.5, preamp_db=6.0) == 1.0
+
+    def test_gain_and_preamp(self):
+        assert playback_gain(-6.0) == pytest.approx(10 ** (-6 / 20))
+        assert playback_gain(-6.0, preamp_db=6.0) == pytest.approx(1.0)
+        assert replaygain_gain(-9.5) == pytest.approx(-8.5)
+
+    def test_clipping_prevention_caps_at_peak(self):
+        assert playback_gain(6.0, peak=0.8) == pytest.approx(1.25)
+        assert playback_gain(6.0, peak=0.8, prevent_clipping=False) == pytest.approx(10 ** (6 / 20))
+
+
+@needs_scipy
+class TestMeasurement:
+    """Tests against the EBU Tech 3341 reference signals"""
+
+    @pytest.mark.parametrize('sr', [44100, 48000])
+    def test_minus_23_dbfs_sine_reads_minus_23_lufs(self, sr):
+        import numpy as np
+        from suno_loudness import integrated_loudness
+
+        assert integrated_loudness(_sine(np, sr, 20, -23.0), sr) == pytest.approx(-23.0, abs=0.1)
+
+    def test_gating_ignores_silence_and_quiet_passages(self):
+        import numpy as np
+        from suno_loudness import integrated_loudness
+
+        sr = 48000
+        loud = _sine(np, sr, 20, -23.0)
+        quiet = _sine(np, sr, 20, -60.0)   # more than 10 LU below: relative gate
+        silence = np.zeros((2, 20 * sr))  # below -70 LUFS: absolute gate
+        gated = integrated_loudness(np.concatenate([loud, quiet, silence], axis=1), sr)
+        assert gated == pytest.approx(-23.0, abs=0.1)
+        assert math.isinf(integrated_loudness(silence, sr))
+
+    def test_true_peak_finds_inter_sample_peaks(self):
+        import numpy as np
+        from suno_loudness import true_peak
+
+        sr = 48000
+        t = np.arange(sr) / sr
+        y = 0.5 * np.sin(2 * np.pi * sr / 4 * t + np.pi / 4)  # samples at +-0.354
+        assert np.abs(y).max() == pytest.approx(0.354, abs=0.001)
+        assert true_peak(y, sr) == pytest.approx(0.5, abs=0.02)
+
+
+@needs_scipy
+def test_measure_and_tag_round_trip(tmp_path):
+    pytest.importorskip("librosa")
+    pytest.importorskip("mutagen")
+    import numpy as np
+    import soundfile
+    from suno_loudness import file_signature, measure_file, read_tags
+
+    sr = 44100
+    for ext in ('flac', 'wav'):
+        path = tmp_path / f"song.{ext}"
+        soundfile.write(str(path), _sine(np, sr, 5, -10.0).T, sr)
+        result = measure_file(path)
+
+        assert result['loudness_lufs'] == pytest.approx(-10.0, abs=0.2)
+        assert result['replaygain_gain'] == pytest.approx(-8.0, abs=0.2)
+        assert result['tagged']
+        assert result['signature'] == file_signature(path)
+        gain_db, peak = read_tags(path)
+        assert gain_db == pytest.approx(result['replaygain_gain'])
+        assert peak == pytest.approx(result['replaygain_peak'])
@@ -0,0 +1,109 @@
+"""
+Tests for suno_manifest.py - Local download manifest
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from suno_manifest import DownloadManifest, artifact_kind, hash_file
+
+CLIP_ID = "11111111-1111-1111-1111-111111111111"
+URL = "https://cdn1.suno.ai/11111111-1111-1111-1111-111111111111.mp3"
+
+
+@pytest.fixture
+def library(tmp_path):
+    """Library root with one downloaded audio file"""
+    folder = tmp_path / "2024-01-15"
+    folder.mkdir()
+    audio = folder / f"{CLIP_ID}_Summer Vibes.mp3"
+    audio.write_bytes(b"ID3" + b"\x00" * 1000)
+    return tmp_path, audio
+
+
+class TestDownloadManifest:
+    """Tests for DownloadManifest class"""
+
+    def test_record_and_lookup(self, library):
+        root, audio = library
+        manifest = DownloadManifest(root)
+        manifest.record(audio, clip_id=CLIP_ID, url=URL, etag='"abc"',
+                        sha256=hash_file(audio))
+
+        entry = manifest.lookup(audio)
+        assert entry['clip_id'] == CLIP_ID
+        assert entry['kind'] == 'audio'
+        assert entry['size'] == 1003
+        assert entry['path'] == f"2024-01-15/{CLIP_ID}_Summer Vibes.mp3"
+        assert manifest.is_current(entry, audio, URL)
+
+    def test_changed_file_is_not_current(self, library):
+        root, audio = library
+        manifest = DownloadManifest(root)
+        manifest.record(audio, clip_id=CLIP_ID, url=URL)
+
+        audio.write_bytes(b"truncated")
+        assert not manifest.is_current(manifest.lookup(audio), audio, URL)
+
+    def test_different_url_is_not_current(self, library):
+        root, audio = library
+        manifest = DownloadManifest(root)
+        manifest.record(audio, clip_id=CLIP_ID, url=URL)
+        entry = manifest.lookup(audio)
+        assert not manifest.is_current(entry, audio, URL.replace('.mp3', '.m4a'))
+
+    def test_needs_verification_respects_ttl(self, library):
+        root, audio = library
+        manifest = DownloadManifest(root)
+        manifest.record(audio, clip_id=CLIP_ID, url=URL)
+        entry = manifest.lookup(audio)
+
+        assert not manifest.needs_verification(entry, None)
+        assert not manifest.needs_verification(entry, 7)
+        entry['verified_at'] = (datetime.now() - timedelta(days=8)).isoformat()
+        assert manifest.needs_verification(entry, 7)
+
+    def test_repaired_entry_needs_one_verification(self, library):
+        root, audio = library
+        manifest = DownloadManifest(root)
+        manifest.repair()
+        entry = manifest.lookup(audio)
+
+        # Matches any URL locally, but is not trusted until checked remotely
+        assert manifest.is_current(entry, audio, URL)
+        assert manifest.needs_verification(entry, None)
+        assert manifest.needs_verification(entry, 7)
+
+        manifest.mark_verified(audio, url=URL)
+        assert not manifest.needs_verification(manifest.lookup(audio), None)
+
+    def test_repair_adds_and_removes(self, library):
+        root, audio = library
+        cover = audio.with_name(f"{CLIP_ID}_Summer Vibes_cover.jpg")
+        cover.write_bytes(b"\xff\xd8" * 50)
+        audio.with_suffix('.wav').write_bytes(b"RIFF")  # Derived, not tracked
+        (root / "notes.txt").write_text("not a clip")
+
+        manifest = DownloadManifest(root)
+        ghost = root / "2024-01-15" / f"{CLIP_ID}_Gone.mp3"
+        ghost.write_bytes(b"x")
+        manifest.record(ghost, clip_id=CLIP_ID)
+        os.unlink(ghost)
+
+        counts = manifest.repair()
+        assert counts == {'removed': 1, 'updated': 0, 'added': 2}
+        assert manifest.get_clip_ids() == {CLIP_ID}
+        assert manifest.get_clip_ids(kind='audio') == {CLIP_ID}
+        assert manifest.get_clip_ids(kind='video') == set()
+        assert manifest.lookup(cover)['kind'] == 'cover'
+        assert manifest.lookup(audio)['sha256'] == hash_file(audio)
+
+        # Entries rebuilt from disk have no URL and match any
+        assert manifest.is_current(manifest.lookup(audio), audio, URL)
+
+    def test_artifact_kind(self, tmp_path):
+        assert artifact_kind(tmp_path / "x_cover.jpg") == 'cover'
+        assert artifact_kind(tmp_path / "x.mp4") == 'video'
+        assert artifact_kind(tmp_path / "x.mp3") == 'audio'
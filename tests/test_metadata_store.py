@@ -0,0 +1,60 @@
+"""
+Tests for suno_metadata_store.py - Consolidated clip metadata
+"""
+
+import json
+
+import pytest
+
+from suno_metadata_store import ClipMetadataStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ClipMetadataStore(tmp_path / "index.db")
+
+
+def clip(n, title="Song"):
+    return {'id': f"clip-{n}", 'title': f"{title} {n}",
+            'created_at': f"2024-01-0{n}T00:00:00Z", 'tags': ['pop']}
+
+
+class TestClipMetadataStore:
+    """Tests for ClipMetadataStore class"""
+
+    def test_put_and_get_roundtrip(self, store):
+        assert store.put(clip(1))
+        assert store.get("clip-1") == clip(1)
+        assert store.get("missing") is None
+
+    def test_unchanged_clip_is_not_rewritten(self, store):
+        assert store.put(clip(1))
+        assert not store.put(clip(1))
+        assert store.put(clip(1, title="Renamed"))
+        assert store.get("clip-1")['title'] == "Renamed 1"
+
+    def test_put_many_and_iter_all(self, store):
+        assert store.put_many([clip(1), clip(2), {'title': 'no id'}]) == 2
+        assert store.count() == 2
+        assert [c['id'] for c in store.iter_all()] == ["clip-1", "clip-2"]
+
+    def test_export_sidecars(self, store, tmp_path):
+        store.put_many([clip(1), clip(2)])
+        out = tmp_path / "lib"
+
+        written = store.export_sidecars(lambda c: out / f"{c['id']}_metadata.json")
+        assert written == 2
+        assert json.loads((out / "clip-1_metadata.json").read_text()) == clip(1)
+        # Existing sidecars are left alone unless overwrite=True
+        assert store.export_sidecars(lambda c: out / f"{c['id']}_metadata.json") == 0
+
+    def test_import_sidecars(self, store, tmp_path):
+        lib = tmp_path / "lib" / "2024-01-01"
+        lib.mkdir(parents=True)
+        sidecar = lib / "clip-3_Song_metadata.json"
+        sidecar.write_text(json.dumps(clip(3)))
+        (lib / "broken_metadata.json").write_text("{oops")
+
+        assert store.import_sidecars(tmp_path / "lib", delete=True) == 1
+        assert store.get("clip-3") == clip(3)
+        assert not sidecar.exists()
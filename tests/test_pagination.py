@@ -0,0 +1,102 @@
+"""
+Tests for suno_pagination.py - Parallel offset pagination
+"""
+
+import threading
+
+from suno_pagination import ParallelPaginator, tune_page_size
+
+
+class FakeFeed:
+    """Offset-paginated feed of ``total`` items with a server-side limit cap"""
+
+    def __init__(self, total, max_limit=50, reject_above=None):
+        self.items = [{'id': f"clip-{i}"} for i in range(total)]
+        self.max_limit = max_limit
+        self.reject_above = reject_above
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, page, limit):
+        with self._lock:
+            self.requests.append((page, limit))
+        if self.reject_above and limit > self.reject_above:
+            return None
+        limit = min(limit, self.max_limit)
+        return self.items[page * limit:(page + 1) * limit]
+
+
+class TestTunePageSize:
+    """Tests for tune_page_size()"""
+
+    def test_uses_server_cap(self):
+        size, pages = tune_page_size(FakeFeed(500, max_limit=50), (100, 50, 20))
+        assert size == 50
+        assert [len(p) for p in pages] == [50, 50]
+
+    def test_short_feed_keeps_requested_size(self):
+        feed = FakeFeed(6, max_limit=100)
+        size, pages = tune_page_size(feed, (100, 50, 20))
+        assert size == 100
+        assert pages == [feed.items]
+
+    def test_skips_rejected_sizes(self):
+        feed = FakeFeed(500, max_limit=100, reject_above=50)
+        size, _ = tune_page_size(feed, (100, 50, 20))
+        assert size == 50
+        assert feed.requests == [(0, 100), (0, 50)]
+
+
+class TestParallelPaginator:
+    """Tests for ParallelPaginator class"""
+
+    def test_fetches_everything_in_order(self):
+        feed = FakeFeed(230)
+        items = ParallelPaginator(feed, page_size=50, window=4).fetch_all()
+        assert [i['id'] for i in items] == [f"clip-{n}" for n in range(230)]
+
+    def test_auto_tuned_walk(self):
+        feed = FakeFeed(230, max_limit=50)
+        paginator = ParallelPaginator(feed, window=3)
+        assert len(paginator.fetch_all()) == 230
+        assert paginator.page_size == 50
+
+    def test_stops_at_last_page_within_max_pages(self):
+        feed = FakeFeed(120)
+        paginator = ParallelPaginator(feed, page_size=50, window=8, max_pages=20)
+        assert len(paginator.fetch_all()) == 120
+        # Never requests beyond the window after the short page
+        assert max(page for page, _ in feed.requests) < 3 + 8
+
+    def test_deduplicates_across_pages(self):
+        feed = FakeFeed(100)
+        # Simulate a new like shifting the feed: page 1 repeats the last item
+        feed.items.insert(50, dict(feed.items[49]))
+        items = ParallelPaginator(feed, page_size=50, window=2).fetch_all()
+        assert len(items) == 100
+
+    def test_stop_when(self):
+        feed = FakeFeed(500)
+        known = {f"clip-{n}" for n in range(100, 500)}
+        paginator = ParallelPaginator(feed, page_size=50, window=4,
+                                      stop_when=lambda page: all(i['id'] in known for i in page))
+        assert len(paginator.fetch_all()) == 100
+
+    def test_short_feed_walk(self):
+        feed = FakeFeed(6, max_limit=100)
+        paginator = ParallelPaginator(feed, window=4)
+        assert len(paginator.fetch_all()) == 6
+        assert paginator.page_size == 100
+        assert paginator.stats['used'] == 1
+
+    def test_empty_final_page_is_not_used(self):
+        feed = FakeFeed(100)
+        paginator = ParallelPaginator(feed, page_size=50, window=1)
+        assert len(paginator.fetch_all()) == 100
+        assert paginator.stats['used'] == 2
+
+    def test_failed_page_ends_walk(self):
+        def fetch(page, limit):
+            return None if page == 2 else [{'id': f"{page}-{n}"} for n in range(limit)]
+        items = ParallelPaginator(fetch, page_size=10, window=4).fetch_all()
+        assert len(items) == 20
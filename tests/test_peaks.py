@@ -0,0 +1,66 @@
+"""
+Tests for suno_peaks.py - Multi-resolution waveform peaks
+"""
+
+import struct
+
+import pytest
+
+from suno_peaks import NUMPY_AVAILABLE, encode_dat, read_peaks
+
+needs_numpy = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+
+
+class TestDatFormat:
+    """Tests for the .dat record encoding"""
+
+    def test_header_matches_audiowaveform_v2(self):
+        record = encode_dat(22050, 256, [(-10, 20), (-127, 127)])
+        assert struct.unpack('<iIiiIi', record[:24]) == (2, 1, 22050, 256, 2, 1)
+        assert len(record) == 24 + 4
+
+    def test_round_trip_multiple_levels(self):
+        data = encode_dat(44100, 256, [(-1, 1), (-2, 2)]) + encode_dat(44100, 1024, [(-2, 2)])
+        levels = read_peaks(data)
+        assert [lvl['samples_per_pixel'] for lvl in levels] == [256, 1024]
+        assert levels[0]['peaks'] == [(-1, 1), (-2, 2)]
+        assert levels[1]['sample_rate'] == 44100
+
+    def test_truncated_record_rejected(self):
+        with pytest.raises(ValueError):
+            read_peaks(encode_dat(22050, 256, [(-1, 1), (-2, 2)])[:-1])
+
+
+@needs_numpy
+class TestBuildLevels:
+    """Tests for build_levels()"""
+
+    def test_levels_reduce_consistently(self, tmp_path):
+        import numpy as np
+        from suno_peaks import build_levels, write_peaks
+
+        y = np.sin(np.linspace(0, 200 * np.pi, 10000)).astype(np.float32) * 0.5
+        y[5000] = -1.0
+        levels = build_levels(y, 22050, levels=(100, 400))
+
+        fine, coarse = levels[0][1], levels[1][1]
+        assert fine.shape == (100, 2) and coarse.shape == (25, 2)
+        assert coarse[:, 0].min() == fine[:, 0].min() == -127
+        assert coarse[12, 0] == fine[48:52, 0].min()
+
+        path = write_peaks(tmp_path / "song.dat", 22050, levels)
+        assert [len(lvl['peaks']) for lvl in read_peaks(path)] == [100, 25]
+
+    def test_partial_last_bucket(self):
+        import numpy as np
+        from suno_peaks import build_levels
+
+        levels = build_levels(np.full(250, 0.25, dtype=np.float32), 22050, levels=(100, 200))
+        assert [len(peaks) for _, peaks in levels] == [3, 2]
+
+    def test_levels_must_nest(self):
+        import numpy as np
+        from suno_peaks import build_levels
+
+        with pytest.raises(ValueError):
+            build_levels(np.zeros(10, dtype=np.float32), 22050, levels=(100, 250))
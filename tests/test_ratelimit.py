@@ -0,0 +1,140 @@
+"""
+Tests for suno_ratelimit.py - Adaptive AIMD rate controller
+"""
+
+import time
+from email.utils import formatdate
+
+import pytest
+
+from suno_ratelimit import AdaptiveRateController, parse_retry_after
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """Returns queued responses (or raises queued exceptions) in order"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+URL = "https://studio-api.suno.ai/api/feed/liked"
+
+
+def fast_controller(**kwargs):
+    """Controller with a high rate so tests don't sleep"""
+    defaults = dict(initial_rate=1000.0, max_rate=2000.0, min_rate=100.0,
+                    default_backoff=0.0)
+    defaults.update(kwargs)
+    return AdaptiveRateController(**defaults)
+
+
+# =============================================================================
+# Retry-After Parsing Tests
+# =============================================================================
+
+class TestParseRetryAfter:
+    """Tests for parse_retry_after function"""
+
+    def test_delta_seconds(self):
+        assert parse_retry_after("5") == 5.0
+        assert parse_retry_after(" 0 ") == 0.0
+
+    def test_http_date(self):
+        now = time.time()
+        header = formatdate(now + 30, usegmt=True)
+        assert parse_retry_after(header, now=now) == pytest.approx(30, abs=1)
+
+    def test_past_date_is_zero(self):
+        now = time.time()
+        assert parse_retry_after(formatdate(now - 60, usegmt=True), now=now) == 0.0
+
+    def test_invalid_returns_none(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("") is None
+        assert parse_retry_after("soon") is None
+
+
+# =============================================================================
+# Controller Tests
+# =============================================================================
+
+class TestAdaptiveRateController:
+    """Tests for AdaptiveRateController"""
+
+    def test_success_increases_additively(self):
+        rate = fast_controller(initial_concurrency=1, rate_step=10.0)
+        with rate.slot(URL) as slot:
+            slot.record(FakeResponse(200))
+        state = rate.snapshot()['studio-api.suno.ai']
+        assert state['rate'] == 1010.0
+        assert state['concurrency'] == 2
+
+    def test_throttle_decreases_multiplicatively(self):
+        rate = fast_controller(initial_concurrency=8)
+        with rate.slot(URL) as slot:
+            slot.record(FakeResponse(429))
+        state = rate.snapshot()['studio-api.suno.ai']
+        assert state['rate'] == 500.0
+        assert state['concurrency'] == 4
+        assert state['throttled'] == 1
+
+    def test_retry_after_blocks_host(self):
+        rate = fast_controller()
+        with rate.slot(URL) as slot:
+            slot.record(FakeResponse(429, {'Retry-After': '30'}))
+        assert rate.snapshot()['studio-api.suno.ai']['blocked_for'] > 25
+
+    def test_hosts_are_independent(self):
+        rate = fast_controller()
+        with rate.slot(URL) as slot:
+            slot.record(FakeResponse(503))
+        snapshot = rate.snapshot()
+        assert snapshot['studio-api.suno.ai']['server_errors'] == 1
+        assert 'cdn1.suno.ai' not in snapshot
+        with rate.slot("https://cdn1.suno.ai/x.mp3") as slot:
+            slot.record(FakeResponse(200))
+        assert rate.snapshot()['cdn1.suno.ai']['server_errors'] == 0
+
+    def test_unrecorded_slot_counts_as_error(self):
+        rate = fast_controller()
+        with pytest.raises(RuntimeError):
+            with rate.slot(URL):
+                raise RuntimeError("connection reset")
+        state = rate.snapshot()['studio-api.suno.ai']
+        assert state['network_errors'] == 1
+        assert state['in_flight'] == 0
+
+    def test_request_retries_server_errors(self):
+        rate = fast_controller()
+        session = FakeSession([FakeResponse(502), FakeResponse(200)])
+        response = rate.request(session, 'GET', URL)
+        assert response.status_code == 200
+        assert len(session.calls) == 2
+
+    def test_request_does_not_retry_client_errors(self):
+        rate = fast_controller()
+        session = FakeSession([FakeResponse(404)])
+        assert rate.request(session, 'GET', URL).status_code == 404
+        assert len(session.calls) == 1
+
+    def test_request_raises_after_network_failures(self):
+        rate = fast_controller()
+        session = FakeSession([ConnectionError("down")] * 2)
+        with pytest.raises(ConnectionError):
+            rate.request(session, 'GET', URL, max_attempts=2)
@@ -0,0 +1,76 @@
+"""
+Tests for suno_similarity.py - Feature-vector similarity index
+"""
+
+import pytest
+
+from suno_core import SunoDatabase
+from suno_similarity import NUMPY_AVAILABLE, camelot_number, parse_key
+
+needs_numpy = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+
+
+def song_id(n):
+    return f"12345678-1234-1234-1234-{n:012d}"
+
+
+class TestKeyParsing:
+    """Tests for key helpers"""
+
+    def test_parse_key(self):
+        assert parse_key("F#/Gb minor") == (6, 'minor')
+        assert parse_key("C major") == (0, 'major')
+        assert parse_key("Unknown") is None
+        assert parse_key(None) is None
+
+    def test_camelot_number(self):
+        assert camelot_number(0, 'major') == 8   # C major = 8B
+        assert camelot_number(9, 'minor') == 8   # A minor = 8A
+        assert camelot_number(7, 'major') == 9   # G major = 9B
+        assert camelot_number(11, 'major') == 1  # B major = 1B
+
+
+@needs_numpy
+class TestSimilarityIndex:
+    """Tests for SimilarityIndex class"""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        from suno_similarity import SimilarityIndex
+
+        db = SunoDatabase(str(tmp_path / "library.db"))
+        songs = [
+            ('Fast Rock', ['rock', 'energetic'], 150, 'E minor'),
+            ('Fast Rock 2', ['rock', 'energetic'], 148, 'E minor'),
+            ('Slow Ambient', ['ambient', 'chill'], 70, 'C major'),
+            ('Slow Ambient 2', ['ambient', 'chill', 'lofi'], 72, 'C major'),
+        ]
+        for n, (title, tags, bpm, key) in enumerate(songs):
+            db.add_song({'title': title, 'url': f"https://suno.com/song/{song_id(n)}", 'tags': tags})
+            db.update_audio_info(song_id(n), bpm=bpm, key=key)
+
+        index = SimilarityIndex(str(tmp_path / "library.db"), ivf_threshold=10 ** 9)
+        assert index.rebuild() == 4
+        return index
+
+    def test_nearest_neighbour(self, index):
+        assert index.top_k(song_id(0), k=1)[0][0] == song_id(1)
+        assert index.top_k(song_id(2), k=1)[0][0] == song_id(3)
+
+    def test_excludes_self_and_sorts(self, index):
+        results = index.top_k(song_id(0), k=10)
+        assert song_id(0) not in [r[0] for r in results]
+        scores = [score for _, score in results]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_ivf_matches_exact_search(self, index):
+        exact = index.top_k(song_id(0), k=1)
+        index.ivf_threshold = 1
+        index.build_ivf(n_lists=2)
+        assert index.top_k(song_id(0), k=1, n_probe=2) == exact
+
+    def test_audio_features_change_vector(self, index):
+        before = index.vector(song_id(2)).copy()
+        index.store_audio_features(song_id(2), mfcc_mean=list(range(13)), chroma_mean=[1.0] + [0.0] * 11)
+        index.rebuild([song_id(2)])
+        assert not (index.vector(song_id(2)) == before).all()
@@ -0,0 +1,63 @@
+"""
+Tests for SmartPlaylistGenerator in suno_api.py - SQL-backed playlists
+"""
+
+import pytest
+
+from suno_core import SunoDatabase
+
+suno_api = pytest.importorskip("suno_api")  # needs requests
+
+
+def song_id(n):
+    return f"12345678-1234-1234-1234-{n:012d}"
+
+
+@pytest.fixture
+def generator(tmp_path):
+    db = SunoDatabase(str(tmp_path / "library.db"))
+    library = [
+        ('Anthem', ['rock', 'Heavy'], 150, 'E minor', 200),
+        ('Club', ['dance'], 125, 'A major', 180),
+        ('Drift', ['ambient'], 80, 'C major', 240),
+        ('Tears', ['ballad'], 90, 'D minor', 210),
+        ('Unanalysed', ['pop'], None, None, 150),
+    ]
+    for n, (title, tags, bpm, key, seconds) in enumerate(library):
+        db.add_song({'title': title, 'url': f"https://suno.com/song/{song_id(n)}",
+                     'tags': tags, 'duration': f"{seconds // 60}:{seconds % 60:02d}"})
+        db.update_audio_info(song_id(n), bpm=bpm, key=key)
+    return suno_api.SmartPlaylistGenerator(db)
+
+
+def titles(songs):
+    return [s['title'] for s in songs]
+
+
+class TestSmartPlaylistGenerator:
+    """Tests for SmartPlaylistGenerator class"""
+
+    def test_by_bpm_range_sorted(self, generator):
+        assert titles(generator.by_bpm_range(80, 130)) == ['Drift', 'Tears', 'Club']
+
+    def test_by_key_substring(self, generator):
+        assert titles(generator.by_key('minor')) == ['Anthem', 'Tears']
+        assert titles(generator.by_key('A major')) == ['Club']
+        assert generator.by_key('F# minor') == []
+
+    def test_moods(self, generator):
+        assert titles(generator.by_mood('aggressive')) == ['Anthem']
+        assert titles(generator.by_mood('energetic')) == ['Anthem', 'Club']
+        assert titles(generator.by_mood('chill')) == ['Drift', 'Tears']
+        assert titles(generator.by_mood('melancholic')) == ['Anthem', 'Tears']
+        assert len(generator.by_mood('unknown')) == 5
+
+    def test_custom_mood_definition(self, generator):
+        generator.moods['poppy'] = {'tags': ['pop']}
+        assert titles(generator.by_mood('poppy')) == ['Unanalysed']
+
+    def test_workout_playlist_has_no_duplicates(self, generator):
+        playlist = generator.workout_playlist(duration_minutes=30)
+        ids = [s['id'] for s in playlist]
+        assert len(ids) == len(set(ids))
+        assert playlist[0]['title'] == 'Club'  # Warmup starts in the 120-130 range
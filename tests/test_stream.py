@@ -0,0 +1,105 @@
+"""
+Tests for suno_stream.py - Streaming response writer
+"""
+
+import io
+import hashlib
+
+import pytest
+
+from suno_stream import expected_length, stream_to_file
+
+BODY = bytes(range(256)) * 5000  # ~1.2 MB, spans several buffers
+
+
+class FakeResponse:
+    """requests.Response stand-in with a readinto()-capable raw stream"""
+
+    def __init__(self, body, headers=None, raw=True):
+        self.headers = headers if headers is not None else {'content-length': str(len(body))}
+        self.raw = io.BytesIO(body) if raw else None
+        self._body = body
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self._body), chunk_size):
+            yield self._body[i:i + chunk_size]
+
+
+class InterruptedStream(io.BytesIO):
+    """Raw stream that raises KeyboardInterrupt part way through"""
+
+    def __init__(self, body, after):
+        super().__init__(body)
+        self.after = after
+
+    def readinto(self, buffer):
+        if self.tell() >= self.after:
+            raise KeyboardInterrupt
+        return super().readinto(buffer)
+
+
+class TestStreamToFile:
+    """Tests for stream_to_file()"""
+
+    def test_writes_and_hashes(self, tmp_path):
+        out = tmp_path / "sub" / "song.mp3"
+        result = stream_to_file(FakeResponse(BODY), out, buffer_size=64 * 1024)
+
+        assert out.read_bytes() == BODY
+        assert result.bytes_written == len(BODY)
+        assert result.digest == hashlib.sha256(BODY).hexdigest()
+
+    def test_iter_content_fallback(self, tmp_path):
+        out = tmp_path / "song.mp3"
+        result = stream_to_file(FakeResponse(BODY, raw=False), out, hash_name=None)
+
+        assert out.read_bytes() == BODY
+        assert result.digest is None
+
+    def test_unknown_length(self, tmp_path):
+        out = tmp_path / "song.mp3"
+        result = stream_to_file(FakeResponse(BODY, headers={}), out)
+        assert result.bytes_written == len(BODY)
+
+    def test_short_body_raises_and_leaves_nothing(self, tmp_path):
+        out = tmp_path / "song.mp3"
+        response = FakeResponse(BODY[:1000], headers={'content-length': str(len(BODY))})
+
+        with pytest.raises(IOError):
+            stream_to_file(response, out)
+        # No zero-padded file that later looks like a finished download
+        assert list(tmp_path.iterdir()) == []
+
+    def test_interrupted_transfer_keeps_existing_file(self, tmp_path):
+        out = tmp_path / "song.mp3"
+        out.write_bytes(b"old")
+        response = FakeResponse(BODY)
+        response.raw = InterruptedStream(BODY, after=300 * 1024)
+
+        with pytest.raises(KeyboardInterrupt):
+            stream_to_file(response, out, buffer_size=64 * 1024)
+        assert out.read_bytes() == b"old"
+        assert list(tmp_path.iterdir()) == [out]
+
+    def test_partial_writes_are_completed(self, tmp_path, monkeypatch):
+        import suno_stream
+        real_open = open
+
+        class ShortWriter(io.FileIO):
+            def write(self, data):
+                return super().write(bytes(data[:1000]))
+
+        def short_open(path, mode='r', buffering=-1):
+            return ShortWriter(path, mode) if mode == 'wb' and buffering == 0 else real_open(path, mode, buffering)
+
+        monkeypatch.setattr(suno_stream, 'open', short_open, raising=False)
+        out = tmp_path / "song.mp3"
+        result = stream_to_file(FakeResponse(BODY), out)
+        assert out.read_bytes() == BODY
+        assert result.bytes_written == len(BODY)
+
+    def test_expected_length(self):
+        assert expected_length(FakeResponse(b"", headers={'content-length': '42'})) == 42
+        assert expected_length(FakeResponse(b"", headers={'content-length': 'x'})) is None
+        assert expected_length(FakeResponse(b"", headers={
+            'content-length': '42', 'content-encoding': 'gzip'})) is None
@@ -6,6 +6,8 @@ import pytest
 from pathlib import Path
 import tempfile
 import os
+import threading
+import time
 
 # Import functions to test
 from suno_utils import (
@@ -16,6 +18,7 @@ from suno_utils import (
     safe_filename,
     generate_unique_path,
     validate_song_data,
+    SingleFlight,
     SunoError,
     ExtractionError,
     DownloadError,
@@ -299,6 +302,54 @@ class TestCustomExceptions:
             assert str(e) == "Invalid configuration"
 
 
+# =============================================================================
+# SingleFlight Tests
+# =============================================================================
+
+class TestSingleFlight:
+    """Tests for SingleFlight class"""
+    
+    def test_concurrent_calls_are_coalesced(self):
+        """Test that simultaneous callers share one execution"""
+        flights = SingleFlight()
+        calls = []
+        release = threading.Event()
+        
+        def fetch():
+            calls.append(1)
+            release.wait(2)
+            return "song"
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do("id-1", fetch)))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        while flights.coalesced < 4:
+            time.sleep(0.01)
+        release.set()
+        for t in threads:
+            t.join()
+        
+        assert results == ["song"] * 5
+        assert len(calls) == 1
+        assert flights.in_flight() == 0
+    
+    def test_sequential_calls_are_not_cached(self):
+        """Test that a finished call is not reused"""
+        flights = SingleFlight()
+        counter = iter(range(10))
+        assert flights.do("k", lambda: next(counter)) == 0
+        assert flights.do("k", lambda: next(counter)) == 1
+    
+    def test_exception_propagates(self):
+        """Test that errors reach the caller and clear the key"""
+        flights = SingleFlight()
+        with pytest.raises(ValueError):
+            flights.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+        assert flights.in_flight() == 0
+
+
 # =============================================================================
 # Run tests
 # =============================================================================
@@ -0,0 +1,76 @@
+"""
+Tests for suno_watermark.py - Incremental sync watermark
+"""
+
+import json
+
+from suno_watermark import SyncWatermark
+
+
+def clip(n, created_at="2024-01-01T00:00:00Z"):
+    return {'id': f"clip-{n}", 'created_at': created_at}
+
+
+class TestSyncWatermark:
+    """Tests for SyncWatermark class"""
+
+    def test_starts_empty(self, tmp_path):
+        mark = SyncWatermark(tmp_path / "state.json")
+        assert mark.is_empty
+        assert not mark.page_is_known([clip(1)])
+
+    def test_observe_and_page_is_known(self, tmp_path):
+        mark = SyncWatermark(tmp_path / "state.json")
+        mark.observe([clip(1), clip(2)])
+
+        assert mark.page_is_known([clip(1), clip(2)])
+        assert not mark.page_is_known([clip(1), clip(3)])
+        assert not mark.page_is_known([])
+
+    def test_pending_until_observed(self, tmp_path):
+        mark = SyncWatermark(tmp_path / "state.json")
+        mark.observe([clip(1), clip(2)])
+        mark.mark_pending([clip(2), clip(3)])
+
+        assert mark.pending_ids == {"clip-2", "clip-3"}
+        assert not mark.is_known(clip(2))
+        mark.observe([clip(3)])
+        assert mark.pending_ids == {"clip-2"}
+        mark.drop_pending(["clip-2"])
+        assert not mark.pending_ids
+
+    def test_newest_created_at_advances(self, tmp_path):
+        mark = SyncWatermark(tmp_path / "state.json")
+        mark.observe([clip(1, "2024-03-01T00:00:00Z"), clip(2, "2024-01-01T00:00:00Z")])
+        assert mark.newest_created_at == "2024-03-01T00:00:00Z"
+
+    def test_save_and_reload(self, tmp_path):
+        path = tmp_path / "state.json"
+        mark = SyncWatermark(path, feed='liked')
+        mark.observe([clip(1)])
+        mark.mark_pending([clip(2)])
+        mark.save()
+
+        reloaded = SyncWatermark(path, feed='liked')
+        assert reloaded.known_ids == {"clip-1"}
+        assert reloaded.pending_ids == {"clip-2"}
+        assert reloaded.newest_created_at == "2024-01-01T00:00:00Z"
+        assert reloaded.synced_at
+
+    def test_feeds_are_independent(self, tmp_path):
+        path = tmp_path / "state.json"
+        liked = SyncWatermark(path, feed='liked')
+        liked.observe([clip(1)])
+        liked.save()
+        creations = SyncWatermark(path, feed='creations')
+        creations.observe([clip(2)])
+        creations.save()
+
+        data = json.loads(path.read_text())
+        assert set(data['feeds']) == {'liked', 'creations'}
+        assert SyncWatermark(path, feed='liked').known_ids == {"clip-1"}
+
+    def test_corrupt_file_starts_empty(self, tmp_path):
+        path = tmp_path / "state.json"
+        path.write_text("{not json")
+        assert SyncWatermark(path).is_empty
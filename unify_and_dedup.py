@@ -3,7 +3,11 @@
 Move all files from suno_downloads/ into suno_library/audio/.
 Since downloads/ files have no song ID suffixes, they won't collide
 with audio/ files that do have suffixes. Then rename everything
-consistently and deduplicate by song ID.
+consistently, deduplicate by song ID and finally delete byte-identical
+copies (compared by size, edge hash, then full hash; hashes are cached in
+suno_library.db so re-runs only stat the files). Identical files named
+for different songs are all kept; songs whose local_audio_path pointed at
+a deleted copy are repointed to the file that was kept.
 """
 
 import os
@@ -13,14 +17,21 @@ import sqlite3
 from pathlib import Path
 from collections import defaultdict
 
+from suno_dedup import FileHashCache, find_duplicate_files
+
 AUDIO_DIR = Path("suno_library/audio")
 DOWNLOADS_DIR = Path("suno_downloads")
+AUDIO_EXTENSIONS = {'.mp3', '.m4a', '.wav', '.flac', '.ogg'}
 
 def safe_filename(title: str, max_len: int = 200) -> str:
     safe = re.sub(r'[<>:"/\\|?*]', '', str(title))
     safe = safe.strip('. ')
     return safe[:max_len] if safe else "untitled"
 
+def song_id_suffix(f: Path):
+    match = re.search(r'_([0-9a-fA-F]{8})$', f.stem)
+    return match.group(1).lower() if match else None
+
 def main():
     print("=== Step 1: Move downloads/ files to audio/ ===")
     
@@ -106,6 +117,51 @@ def main():
     print(f"Duplicate song IDs found: {duplicates_found}")
     print(f"Extra files deleted: {deleted}")
     
+    print("\n=== Step 4: Delete byte-identical copies ===")
+    
+    cache = FileHashCache('suno_library.db')
+    audio_files = (f for f in AUDIO_DIR.iterdir() if f.suffix.lower() in AUDIO_EXTENSIONS)
+    groups = find_duplicate_files(audio_files, cache)
+    identical_deleted = 0
+    freed = 0
+    replaced = {}  # deleted copy -> file kept in its place
+    for group in groups:
+        # Keep a file named with its song ID if there is one
+        group = sorted(group, key=lambda f: (song_id_suffix(f) is None, f.name))
+        song_ids = {song_id_suffix(f) for f in group} - {None}
+        keep = group[0]
+        for f in group[1:]:
+            # Same audio under two song IDs: each song keeps its own file
+            if len(song_ids) > 1 and song_id_suffix(f) is not None:
+                continue
+            try:
+                size = f.stat().st_size
+                path = f.resolve()
+                f.unlink()
+                identical_deleted += 1
+                freed += size
+                replaced[path] = keep
+            except (PermissionError, OSError) as e:
+                print(f"  Warning: could not delete {f.name}: {e}")
+    cache.prune()
+    
+    repointed = 0
+    if replaced:
+        conn = sqlite3.connect('suno_library.db')
+        c = conn.cursor()
+        c.execute("SELECT id, local_audio_path FROM songs WHERE local_audio_path IS NOT NULL AND local_audio_path != ''")
+        for song_id, path in c.fetchall():
+            keep = replaced.get(Path(path).resolve())
+            if keep is not None:
+                c.execute("UPDATE songs SET local_audio_path = ? WHERE id = ?", (str(keep), song_id))
+                repointed += 1
+        conn.commit()
+        conn.close()
+    
+    print(f"Identical groups found: {len(groups)}")
+    print(f"Identical copies deleted: {identical_deleted} ({freed / 1024 / 1024:.1f} MB freed)")
+    print(f"Songs repointed to the kept copy: {repointed}")
+    
     final_count = sum(1 for _ in AUDIO_DIR.iterdir() if _.is_file())
     print(f"\nFinal audio/ file count: {final_count}")
 